@@ -1,9 +1,7 @@
 import os
 import sys
-import ast
-from constants import APP_REPO_FILE_SAMPLE, APP_REPO_FULLPATH_SAMPLE, APP_REPO_OUTPUT, APP_REPO_PATH, APP_REPO_STRUCTURE, APP_REPO_URL
+from constants import APP_BATCH_TOKEN_BUDGET, APP_STREAM_TOKENS, APP_CHUNKED_REVIEW, APP_INCREMENTAL_REVIEW, APP_INJECT_FILE_CONTENTS, APP_MAX_CONCURRENCY, APP_PATH_AGENT_FALLBACK, APP_SNAPSHOT_MODE, APP_TRIAGE, APP_DEDUP, APP_STATIC_ANALYSIS, APP_STATIC_ONLY, APP_DIFF_OUTPUT, APP_PULL_REQUEST, APP_MODEL_ROUTING, APP_REPO_FILE_SAMPLE, APP_REPO_FULLPATH_SAMPLE, APP_REPO_OUTPUT, APP_REPO_PATH, APP_REPO_STRUCTURE, APP_REPO_URL
 import streamlit as st
-from datetime import datetime
 import logging
 import warnings
 from dotenv import load_dotenv
@@ -14,10 +12,20 @@ load_dotenv()
 # Ensure PYTHONPATH includes src directory
 sys.path.append(os.getenv('PYTHONPATH'))
 
-from src.agents import Agents, StreamToExpander
-from src.github_helper import get_file_tree
-from src.review_crew import ReviewCrew
-from src.tasks import Tasks
+from src.stream_to_expander import StreamToExpander
+
+
+@st.cache_resource(show_spinner="Loading the review agents...")
+def load_review_pipeline():
+    """
+    Import the review pipeline (crewai, langchain) when the first review starts instead of on every script run,
+    and keep it, with its pooled LLM client, across reruns and sessions.
+    """
+    from src.review_pipeline import ReviewPipeline, parse_source
+    from llm_client import get_http_client
+
+    get_http_client()
+    return ReviewPipeline, parse_source
 
 
 class App:
@@ -30,6 +38,21 @@ class App:
 
         self.repo_file_sample = APP_REPO_FILE_SAMPLE 
         self.repo_fullpath_sample = APP_REPO_FULLPATH_SAMPLE
+        self.path_agent_fallback = APP_PATH_AGENT_FALLBACK
+        self.max_concurrency = APP_MAX_CONCURRENCY
+        self.inject_file_contents = APP_INJECT_FILE_CONTENTS
+        self.snapshot_mode = APP_SNAPSHOT_MODE
+        self.incremental_review = APP_INCREMENTAL_REVIEW
+        self.chunked_review = APP_CHUNKED_REVIEW
+        self.batch_token_budget = APP_BATCH_TOKEN_BUDGET
+        self.stream_tokens = APP_STREAM_TOKENS
+        self.triage = APP_TRIAGE
+        self.dedup = APP_DEDUP
+        self.static_analysis = APP_STATIC_ANALYSIS
+        self.static_only = APP_STATIC_ONLY
+        self.diff_output = APP_DIFF_OUTPUT
+        self.pull_request = APP_PULL_REQUEST
+        self.model_routing = APP_MODEL_ROUTING
 
         self.setup_session_state()
         self.setup_logging()
@@ -53,60 +76,129 @@ class App:
         """Display the main header of the app."""
         st.subheader("GitHub Repository Directory Review", divider="rainbow", anchor=False)
 
-    def fetch_repo_tree(self):
+    def create_pipeline(self, owner, repo, local_path=None):
+        """Create the review pipeline of the repository (or local checkout) with the sidebar options."""
+        ReviewPipeline, _ = load_review_pipeline()
+        return ReviewPipeline(
+            owner=owner, repo=repo,
+            max_concurrency=self.max_concurrency,
+            inject_content=self.inject_file_contents,
+            snapshot_mode=self.snapshot_mode,
+            chunked=self.chunked_review,
+            batch_token_budget=self.batch_token_budget,
+            stream_tokens=self.stream_tokens,
+            incremental=self.incremental_review,
+            path_agent_fallback=self.path_agent_fallback,
+            triage=self.triage,
+            dedup=self.dedup,
+            local_path=local_path,
+            static_analysis=self.static_analysis,
+            static_only=self.static_only,
+            diff_output=self.diff_output,
+            pull_request=self.pull_request.strip() or None,
+            model_routing=self.model_routing
+        )
+
+    def fetch_repo_tree(self, pipeline):
         """Fetch the tree structure of the GitHub repository."""
         try:
-            split_url = self.github_url.split('/')
-            owner = split_url[3]
-            repo = split_url[4]
-            
-            repo_tree = get_file_tree(owner=owner, repo=repo)
+            repo_tree = pipeline.fetch_tree()
             
             st.code(repo_tree, language="bash")
             
-            return owner, repo, repo_tree
+            return repo_tree
         except Exception as e:
             st.error(f"Error: Unable to retrieve the repository tree. {str(e)}")
-            return None, None, None
-
-    def run_path_task(self, repo_tree):
-        """Execute the path task to get file paths."""
-        path_agent = Agents().path_agent()
-        path_task = Tasks().get_file_path_task(
-            agent=path_agent, file_tree=repo_tree, 
-            repo_directory=self.repo_directory, 
-            repo_structure=self.repo_structure, 
-            repo_file_sample=self.repo_file_sample, 
-            repo_fullpath_sample=self.repo_fullpath_sample,
-            repo_output_sample=self.repo_output_sample
-        )
+            return None
+
+    def run_path_task(self, pipeline):
+        """Resolve the repo directory into file paths, falling back to the path agent for fuzzy input."""
         try:
-            task_output = path_task.execute_sync()
-            paths_str = str(task_output)
-            paths = ast.literal_eval(paths_str)
+            paths = pipeline.resolve_paths(
+                self.repo_directory,
+                repo_structure=self.repo_structure,
+                repo_file_sample=self.repo_file_sample,
+                repo_fullpath_sample=self.repo_fullpath_sample,
+                repo_output_sample=self.repo_output_sample
+            )
+
+            if pipeline.pull_request is not None:
+                st.info(f"Pull request {pipeline.pull_request.label}: {len(pipeline.changes)} files changed, reviewing the changed hunks of {len(paths)}.")
+
+            if pipeline.skipped:
+                st.caption(f"Triage skipped {len(pipeline.skipped)} files.")
+                st.dataframe([{'path': path, 'reason': reason} for path, reason in pipeline.skipped.items()], hide_index=True)
+                if not paths:
+                    st.warning("Every matching file was skipped by triage (generated, vendored, binary or lock files).")
+
             return paths
-        except (ValueError, SyntaxError):
-            st.error("Error: Unable to parse the paths string.")
-            return None
         except Exception as e:
             st.error(f"Error: {str(e)}")
             return None
 
-    def review_files(self, owner, repo, paths):
+    def review_files(self, pipeline, paths):
         """Review the files at the given paths."""
-        output_placeholder = ""
-        output = f"{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.md"
-        
-        for path in paths:
-            review_crew = ReviewCrew(owner=owner, repo=repo, path=path, output=output)
-            result = review_crew.run()
-            
-            output_placeholder += "\n\n" + result + "\n\n---"
-            
+        # Crews (and their placeholders) are created on the script thread, in path order
+        review_crews = pipeline.create_crews(paths, placeholder_factory=st.empty)
+        if pipeline.base_sha:
+            st.info(f"Incremental review since {pipeline.base_sha[:7]}: {len(paths) - len(pipeline.carried_results)} of {len(paths)} files changed.")
+        if pipeline.duplicate_count:
+            st.info(f"{pipeline.duplicate_count} files are identical to another file of the run and link to its review.")
+        if pipeline.routes:
+            strong_count = sum(1 for decision in pipeline.routes.values() if decision['tier'] == 'strong')
+            st.caption(f"Model routing: {len(pipeline.routes) - strong_count} files to the fast model, {strong_count} to the strong model.")
+            st.dataframe([{'path': path, **decision} for path, decision in pipeline.routes.items()], hide_index=True)
+        if pipeline.resumed_count:
+            st.info(f"Resuming the previous run: {pipeline.resumed_count} of {len(paths)} files already reviewed.")
+
+        rendered_versions = {}
+
+        def render_progress(running_crews):
+            # Render the crew logs written by the worker threads
+            if isinstance(sys.stdout, StreamToExpander):
+                sys.stdout.drain()
+
+            # Render the tokens streamed so far by the reviews still running
+            for review_crew in running_crews:
+                token_stream = review_crew.token_stream
+                if token_stream is None or rendered_versions.get(review_crew.path) == token_stream.version:
+                    continue
+                rendered_versions[review_crew.path] = token_stream.version
+                review_crew.output_placeholder.code(token_stream.text(), language='markdown')
+
+        for review_crew, result in pipeline.run(review_crews, on_poll=render_progress):
+            if result is None:
+                review_crew.output_placeholder.empty()
+                st.error(f"Error: The review of {review_crew.path} failed. {review_crew.error or ''}")
+                continue
+
             st.markdown(f"\n\n{result}\n\n")
 
-        return output_placeholder
-    
+        self.display_run_summary(pipeline.summary)
+
+        # The output is rendered from the review store instead of being concatenated while reviewing
+        return "".join(f"\n\n{record['result']}\n\n---" for record in pipeline.store.report_records(pipeline.output))
+
+    def display_run_summary(self, summary):
+        """Show where the time, HTTP traffic, tokens and cost of the run went."""
+        if not summary:
+            return
+
+        stages = summary['stages']
+
+        # Nested spans (kickoff, fetch_contents) are already included in the top-level ones
+        top_level = [stage for name, stage in stages.items() if name in ('fetch_tree', 'resolve_paths', 'static_analysis', 'review')]
+        tokens = sum(stage['prompt_tokens'] + stage['completion_tokens'] for stage in top_level)
+        cost = sum(stage['cost'] for stage in top_level)
+        http_requests = sum(stage['http_requests'] for stage in top_level)
+        llm_calls = sum(stage['llm_calls'] for stage in top_level)
+        llm_throttles = sum(stage['llm_throttles'] for stage in top_level)
+
+        st.caption(f"Run took {summary['seconds']:.1f}s, {http_requests} GitHub requests, {llm_calls} LLM calls ({llm_throttles} rate limited), {tokens} tokens, ~${cost:.4f}")
+        st.dataframe([{'stage': name, **stage} for name, stage in stages.items()], hide_index=True)
+        if summary['files']:
+            st.dataframe(summary['files'][:20], hide_index=True)
+
     def handle_submit(self):
         st.session_state.form_submitted = True
 
@@ -118,15 +210,30 @@ class App:
         with form_container:
             with st.sidebar:
                 with st.form(key='settings_form'):
-                    self.github_url = st.text_input("GitHub URL", self.github_url.strip())
+                    self.github_url = st.text_input("GitHub URL", self.github_url.strip(), help="A GitHub repository URL, or the path of a local checkout to review without any GitHub request.")
                     
                     self.repo_directory = st.text_input("Repo Directory", self.repo_directory.strip())
+                    self.pull_request = st.text_input("Pull Request", self.pull_request.strip(), help="A pull request number or URL, or a base...head ref pair (base.. diffs a local checkout against its working tree). Only the changed hunks are reviewed; Repo Directory narrows the changed files down, leave it empty for all of them.")
                     self.repo_structure = st.text_area("Repo Structure Sample", self.repo_structure.strip(), height=125)
                     
                     self.repo_file_sample = st.text_input("File Sample", self.repo_file_sample.strip())
                     self.repo_fullpath_sample = st.text_input("Full Path Sample", self.repo_fullpath_sample.strip())
                     
                     self.repo_output_sample = st.text_input("Array Output Sample", self.repo_output_sample.strip())
+                    self.max_concurrency = st.number_input("Max Concurrency", min_value=1, max_value=32, value=self.max_concurrency, help="Number of files reviewed in parallel.")
+                    self.inject_file_contents = st.checkbox("Inject File Contents", self.inject_file_contents, help="Fetch each file directly and review it with a single LLM call, without the content agent.")
+                    self.stream_tokens = st.checkbox("Stream Tokens", self.stream_tokens, help="Show each review as the model writes it.")
+                    self.batch_token_budget = st.number_input("Batch Token Budget", min_value=0, max_value=100000, value=self.batch_token_budget, step=500, help="Small files are reviewed together up to this many tokens per request. 0 disables batching.")
+                    self.chunked_review = st.checkbox("Chunked Review", self.chunked_review, help="Review files over the line count limit in chunks instead of skipping them (requires Inject File Contents).")
+                    self.diff_output = st.checkbox("Diff Output", self.diff_output, help="The model returns its changes as a unified diff, applied here to render the updated file: far fewer output tokens (requires Inject File Contents).")
+                    self.snapshot_mode = st.checkbox("Snapshot Mode", self.snapshot_mode, help="Download the repository once as a tarball and read every file locally.")
+                    self.incremental_review = st.checkbox("Incremental Review", self.incremental_review, help="Only review files changed since the last report and carry the other sections forward.")
+                    self.triage = st.checkbox("Triage", self.triage, help="Skip generated, vendored, binary and lock files (see .gitattributes and .reviewignore) before fetching them.")
+                    self.dedup = st.checkbox("Deduplicate", self.dedup, help="Review identical files once and reuse the reviews of near-duplicate files reviewed before (near-duplicates require Inject File Contents).")
+                    self.static_analysis = st.checkbox("Static Analysis", self.static_analysis, help="Analyze Python files (complexity, function length, broad excepts, lint) first and give the findings to the review agent.")
+                    self.static_only = st.checkbox("Static Only", self.static_only, help="Report the static analysis alone, without any LLM call.")
+                    self.model_routing = st.checkbox("Model Routing", self.model_routing, help="Review low-risk files (small, simple, docs and config) with FAST_MODEL_NAME and complex or security-sensitive files with the strong model.")
+                    self.path_agent_fallback = st.checkbox("Path Agent Fallback", self.path_agent_fallback, help="Ask the path agent when the repo directory is not an exact file, folder or glob.")
 
                     st.form_submit_button(label="Submit", on_click=self.handle_submit, disabled=st.session_state.form_submitted)
 
@@ -140,27 +247,30 @@ class App:
                 with st.container(height=360):
                     sys.stdout = StreamToExpander(st)
 
-                    # Extract owner and repository name from GitHub URL
-                    split_url = self.github_url.split('/')
-                    owner = split_url[3]
-                    repo = split_url[4]
-
                     try:
+                        # Extract owner and repository name from GitHub URL
+                        _, parse_source = load_review_pipeline()
+                        owner, repo, local_path = parse_source(self.github_url)
+                        pipeline = self.create_pipeline(owner, repo, local_path)
+
                         # Get the tree structure of the GitHub repository
-                        owner, repo, repo_tree = self.fetch_repo_tree()
+                        repo_tree = self.fetch_repo_tree(pipeline)
                         if not repo_tree:
                             return
 
                         # Get array of full paths of given files
-                        paths = self.run_path_task(repo_tree)
+                        paths = self.run_path_task(pipeline)
                         if not paths:
                             return
 
-                        output_placeholder = self.review_files(owner, repo, paths)
+                        output_placeholder = self.review_files(pipeline, paths)
+
+                        # Render the last crew log lines still in the buffer
+                        sys.stdout.flush()
 
-                    except (ValueError, SyntaxError):
-                        st.error("Error: Unable to parse the paths string.")
                     except Exception as e:
+                        # parse_paths handles malformed path agent output itself, so these are invalid sources,
+                        # refs or pull requests
                         st.error(f"Error: {str(e)}")
 
                 status.update(label="✅ Code Review Ready!", state="complete", expanded=False)
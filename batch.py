@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Headless runs import the src modules directly, the same way they import each other
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from constants import (
+    APP_BATCH_TOKEN_BUDGET, APP_CHUNKED_REVIEW, APP_INJECT_FILE_CONTENTS,
+    APP_MAX_CONCURRENCY, APP_PATH_AGENT_FALLBACK, APP_REPO_PATH, APP_TRIAGE, APP_DEDUP, APP_STATIC_ANALYSIS, APP_DIFF_OUTPUT,
+    APP_PULL_REQUEST, APP_MODEL_ROUTING
+)
+
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 2))  # Repositories reviewed in parallel, one process each
+
+
+def read_jobs(jobs_file, default_directory=APP_REPO_PATH):
+    """
+    Reads the review jobs, one "<github_url or local folder> [repo_directory]" per line. Blank lines and # comments are ignored.
+
+    Parameters:
+        jobs_file (str): The path of the jobs file, or - for stdin.
+        default_directory (str): The repo directory of the lines without one.
+
+    Returns:
+        list: The (github_url, repo_directory) of every job.
+    """
+    file = sys.stdin if jobs_file == '-' else open(jobs_file)
+    try:
+        jobs = []
+        for line in file:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            github_url, _, repo_directory = line.partition(' ')
+            jobs.append((github_url, repo_directory.strip() or default_directory))
+        return jobs
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def run_job(github_url, repo_directory, options):
+    """
+    Reviews one repository end to end in a worker process, writing the usual report, named
+    <owner>/<repo>/<timestamp>_<pid>_<random>.md.
+
+    Parameters:
+        github_url (str): The URL of the repository, or the path of a local checkout.
+        repo_directory (str): The file, folder or glob to review.
+        options (dict): The ReviewPipeline options.
+
+    Returns:
+        dict: The summary of the job.
+    """
+    # Imported here so every worker process builds its own HTTP session and LLM clients
+    from review_pipeline import ReviewPipeline, parse_source
+
+    started = time.monotonic()
+    summary = {'url': github_url, 'directory': repo_directory, 'files': 0, 'skipped': 0, 'reviewed': 0, 'report': None, 'error': None}
+
+    try:
+        owner, repo, local_path = parse_source(github_url)
+        pipeline = ReviewPipeline(owner=owner, repo=repo, local_path=local_path, **options)
+        pipeline.fetch_tree()
+
+        paths = pipeline.resolve_paths(repo_directory)
+        summary['files'] = len(paths)
+        summary['skipped'] = len(pipeline.skipped)
+        if paths:
+            review_crews = pipeline.create_crews(paths)
+            summary['reviewed'] = sum(1 for _, result in pipeline.run(review_crews) if result is not None)
+            summary['report'] = os.path.join(owner, repo, pipeline.output)
+    except Exception as e:
+        logging.error(f"Error reviewing {github_url}: {e}")
+        summary['error'] = str(e)
+
+    summary['seconds'] = round(time.monotonic() - started, 1)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Review many GitHub repositories without the Streamlit UI.")
+    parser.add_argument('jobs', help='File with one "<github_url or local folder> [repo_directory]" per line, or - for stdin.')
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help='Repositories reviewed in parallel, one process each.')
+    parser.add_argument('--max-concurrency', type=int, default=APP_MAX_CONCURRENCY, help='Files reviewed in parallel per repository.')
+    parser.add_argument('--batch-token-budget', type=int, default=APP_BATCH_TOKEN_BUDGET, help='Token budget of the batches of small files, 0 disables batching.')
+    parser.add_argument('--snapshot', action='store_true', help='Download each repository once as a tarball and read every file locally.')
+    parser.add_argument('--incremental', action='store_true', help='Only review files changed since the last report.')
+    parser.add_argument('--inject', dest='inject_content', action='store_true', default=APP_INJECT_FILE_CONTENTS, help='Fetch each file directly and review it with a single LLM call, without the content agent.')
+    parser.add_argument('--chunked', action='store_true', default=APP_CHUNKED_REVIEW, help='Review files over the line count limit in chunks instead of skipping them.')
+    parser.add_argument('--no-path-agent-fallback', dest='path_agent_fallback', action='store_false', default=APP_PATH_AGENT_FALLBACK, help='Do not ask the path agent when the directory is not an exact file, folder or glob.')
+    parser.add_argument('--static-analysis', action='store_true', default=APP_STATIC_ANALYSIS, help='Give static analysis findings to the review agent.')
+    parser.add_argument('--static-only', action='store_true', help='Report the static analysis alone, without any LLM call.')
+    parser.add_argument('--diff-output', action='store_true', default=APP_DIFF_OUTPUT, help='Have the model return unified diffs instead of entire updated files.')
+    parser.add_argument('--pull-request', default=APP_PULL_REQUEST, help='Review only the changed hunks of this pull request number or base...head ref pair; jobs without a repo directory review every changed file.')
+    parser.add_argument('--model-routing', action='store_true', default=APP_MODEL_ROUTING, help='Review low-risk files with FAST_MODEL_NAME and complex or sensitive files with the strong model.')
+    parser.add_argument('--dedup', action='store_true', default=APP_DEDUP, help='Review identical files once and reuse the reviews of near-duplicate files.')
+    parser.add_argument('--triage', action='store_true', default=APP_TRIAGE, help='Skip generated, vendored, binary and lock files before fetching them.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(processName)s %(levelname)s %(message)s')
+
+    jobs = read_jobs(args.jobs, default_directory='' if args.pull_request else APP_REPO_PATH)
+    if not jobs:
+        logging.error("No jobs to run.")
+        return 1
+
+    options = {
+        'max_concurrency': args.max_concurrency,
+        'inject_content': args.inject_content,
+        'snapshot_mode': args.snapshot,
+        'chunked': args.chunked,
+        'batch_token_budget': args.batch_token_budget,
+        'incremental': args.incremental,
+        'path_agent_fallback': args.path_agent_fallback,
+        'triage': args.triage,
+        'dedup': args.dedup,
+        'static_analysis': args.static_analysis,
+        'static_only': args.static_only,
+        'diff_output': args.diff_output,
+        'pull_request': args.pull_request or None,
+        'model_routing': args.model_routing,
+    }
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(jobs)))) as executor:
+        futures = [executor.submit(run_job, github_url, repo_directory, options) for github_url, repo_directory in jobs]
+        for future in as_completed(futures):
+            summary = future.result()
+            if summary['error']:
+                failed += 1
+                print(f"FAILED  {summary['url']} ({summary['seconds']}s): {summary['error']}")
+            else:
+                print(f"OK      {summary['url']} {summary['reviewed']}/{summary['files']} files, {summary['skipped']} skipped ({summary['seconds']}s) -> {summary['report']}")
+
+    print(f"{len(jobs) - failed} of {len(jobs)} repositories reviewed.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
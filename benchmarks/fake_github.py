@@ -0,0 +1,165 @@
+import re
+import json
+import time
+import base64
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from synthetic_repo import SyntheticRepo
+
+# Same limit as GitHub: larger recursive listings are truncated
+TREE_TRUNCATE_ENTRIES = 100000
+
+COMMIT_PATTERN = re.compile(r'^/repos/([^/]+)/([^/]+)/commits/([^/]+)$')
+TREE_PATTERN = re.compile(r'^/repos/([^/]+)/([^/]+)/git/trees/([^/]+)$')
+CONTENTS_PATTERN = re.compile(r'^/repos/([^/]+)/([^/]+)/contents/(.+)$')
+TARBALL_PATTERN = re.compile(r'^/repos/([^/]+)/([^/]+)/tarball/([^/]+)$')
+
+
+class FakeGitHub:
+    """
+    Serves synthetic repositories through the subset of the GitHub REST API the reviewer uses:
+    commits, Git Trees (recursive, truncated and per-folder), Contents and tarballs.
+
+    Repositories are named repo-<file count> under any owner, e.g. /repos/bench/repo-1000.
+    """
+
+    def __init__(self, latency=0.0, truncate_entries=TREE_TRUNCATE_ENTRIES, seed=0):
+        """
+        Parameters:
+            latency (float): Delay added to every response, in seconds.
+            truncate_entries (int): Recursive trees with more entries are returned truncated.
+            seed (int): The seed of the synthetic repositories.
+        """
+        self.latency = latency
+        self.truncate_entries = truncate_entries
+        self.seed = seed
+        self.repos = {}
+        self.tarballs = {}
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.server = None
+
+    def repo(self, name):
+        match = re.fullmatch(r'repo-(\d+)', name)
+        if match is None:
+            return None
+        with self.lock:
+            if name not in self.repos:
+                self.repos[name] = SyntheticRepo(int(match.group(1)), seed=self.seed)
+            return self.repos[name]
+
+    def warm(self, name):
+        """
+        Generates a repository and the blob SHAs of its files up front, so their cost is not measured as API latency.
+        """
+        self.repo(name).tree(recursive=True)
+
+    def tarball(self, repo):
+        with self.lock:
+            if repo.name not in self.tarballs:
+                self.tarballs[repo.name] = repo.tarball()
+            return self.tarballs[repo.name]
+
+    def handle(self, path, query):
+        """
+        Routes a request.
+
+        Returns:
+            tuple: The status code, the content type and the body.
+        """
+        with self.lock:
+            self.request_count += 1
+
+        match = COMMIT_PATTERN.match(path)
+        if match and self.repo(match.group(2)):
+            return 200, 'application/json', {'sha': self.repo(match.group(2)).commit_sha}
+
+        match = TREE_PATTERN.match(path)
+        if match and self.repo(match.group(2)):
+            repo = self.repo(match.group(2))
+            sha = match.group(3)
+            directory = '' if sha == repo.commit_sha else repo.directory_by_sha().get(sha)
+            if directory is None:
+                return 404, 'application/json', {'message': 'Not Found'}
+
+            if query.get('recursive'):
+                entries = repo.tree(directory, recursive=True)
+                if len(entries) > self.truncate_entries:
+                    return 200, 'application/json', {'sha': sha, 'tree': entries[:self.truncate_entries], 'truncated': True}
+                return 200, 'application/json', {'sha': sha, 'tree': entries, 'truncated': False}
+            return 200, 'application/json', {'sha': sha, 'tree': repo.tree(directory), 'truncated': False}
+
+        match = CONTENTS_PATTERN.match(path)
+        if match and self.repo(match.group(2)):
+            repo = self.repo(match.group(2))
+            file_path = match.group(3)
+            if file_path not in repo.path_set:
+                return 404, 'application/json', {'message': 'Not Found'}
+            data = repo.content(file_path)
+            sha, size = repo.blob(file_path)
+            return 200, 'application/json', {
+                'type': 'file', 'encoding': 'base64', 'path': file_path, 'sha': sha, 'size': size,
+                'content': base64.encodebytes(data).decode('ascii'),
+            }
+
+        match = TARBALL_PATTERN.match(path)
+        if match and self.repo(match.group(2)):
+            return 200, 'application/x-gzip', self.tarball(self.repo(match.group(2)))
+
+        return 404, 'application/json', {'message': 'Not Found'}
+
+    def start(self, host='127.0.0.1', port=0):
+        """
+        Starts the server on a background thread.
+
+        Returns:
+            str: The base URL of the API.
+        """
+        fake_github = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately: without this, delayed ACKs add ~40ms per keep-alive request
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if fake_github.latency:
+                    time.sleep(fake_github.latency)
+
+                url = urlparse(self.path)
+                status, content_type, body = fake_github.handle(url.path, {key: values[-1] for key, values in parse_qs(url.query).items()})
+                if not isinstance(body, bytes):
+                    body = json.dumps(body).encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('X-RateLimit-Remaining', '5000')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic repositories through a fake GitHub API.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay added to every response, in seconds.')
+    args = parser.parse_args()
+
+    base_url = FakeGitHub(latency=args.latency).start(port=args.port)
+    print(f"Fake GitHub API on {base_url}, e.g. GITHUB_API_URL={base_url} and https://github.com/bench/repo-1000")
+    threading.Event().wait()
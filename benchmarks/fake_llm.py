@@ -0,0 +1,175 @@
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARS_PER_TOKEN = 4
+
+PROJECT_PATTERN = re.compile(r'Project Name: (\S+)')
+PATH_PATTERN = re.compile(r'^\s*Path: (.+)$', re.MULTILINE)
+BATCH_PATTERN = re.compile(r'small files of the same repository: (.+?)\.\n')
+CONTENTS_PATTERN = re.compile(r'```\n(.*?)\n\s*```', re.DOTALL)
+
+
+class FakeLLM:
+    """
+    Deterministic OpenAI-compatible chat completions endpoint with a configurable latency.
+
+    Replies are built from the prompt (project, path, batch paths, file contents) in the format the review tasks
+    ask for, wrapped in the "Final Answer:" the crewai agents expect, so the whole review pipeline runs unchanged.
+    """
+
+    def __init__(self, latency=0.5, token_latency=0.0, review_words=150):
+        """
+        Parameters:
+            latency (float): Delay before the first token of every completion, in seconds.
+            token_latency (float): Delay per completion token, in seconds.
+            review_words (int): Length of the generated code review, in words.
+        """
+        self.latency = latency
+        self.token_latency = token_latency
+        self.review_words = review_words
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.server = None
+
+    def review(self, repo, path, contents):
+        """
+        Returns the markdown review of one file.
+        """
+        digest = hashlib.sha256(f"{path}\0{contents}".encode('utf-8')).hexdigest()
+        words = ' '.join(f"finding-{digest[index % 60:index % 60 + 4]}" for index in range(self.review_words))
+        updated_code = '\n'.join(contents.split('\n')[:20])
+        return (
+            f"## Project Name\n{repo}\n\n## Path\n{path}\n\n"
+            f"## Explain This\nSynthetic explanation of {path}.\n\n"
+            f"## Code Review\n{words}\n\n"
+            f"## Updated Code\n```\n{updated_code}\n```"
+        )
+
+    def answer(self, prompt):
+        """
+        Returns the agent answer to a prompt.
+        """
+        repo = (PROJECT_PATTERN.search(prompt) or [None, 'repo'])[1]
+        batch = BATCH_PATTERN.search(prompt)
+        contents = CONTENTS_PATTERN.findall(prompt)
+
+        if batch:
+            paths = batch.group(1).split(', ')
+            output = '\n\n'.join(
+                f"# {path}\n\n{self.review(repo, path, contents[index] if index < len(contents) else '')}"
+                for index, path in enumerate(paths)
+            )
+        elif PATH_PATTERN.search(prompt):
+            output = self.review(repo, PATH_PATTERN.search(prompt).group(1).strip(), contents[-1] if contents else '')
+        else:
+            output = "[]"
+
+        return f"Thought: I now can give a great answer\nFinal Answer: ```markdown\n{output}\n```"
+
+    def complete(self, request):
+        """
+        Returns the completion text and the token usage of a chat completions request.
+        """
+        prompt = '\n'.join(str(message.get('content', '')) for message in request.get('messages', []))
+        text = self.answer(prompt)
+        usage = {
+            'prompt_tokens': len(prompt) // CHARS_PER_TOKEN + 1,
+            'completion_tokens': len(text) // CHARS_PER_TOKEN + 1,
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+
+        with self.lock:
+            self.request_count += 1
+            self.prompt_tokens += usage['prompt_tokens']
+            self.completion_tokens += usage['completion_tokens']
+
+        return text, usage
+
+    def start(self, host='127.0.0.1', port=0):
+        """
+        Starts the server on a background thread.
+
+        Returns:
+            str: The base URL to use as OPENAI_API_BASE.
+        """
+        fake_llm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately: without this, delayed ACKs add ~40ms per keep-alive request
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                text, usage = fake_llm.complete(request)
+                model = request.get('model', 'fake')
+
+                time.sleep(fake_llm.latency)
+                if request.get('stream'):
+                    self.stream(text, model)
+                else:
+                    time.sleep(fake_llm.token_latency * usage['completion_tokens'])
+                    self.send_json({
+                        'id': 'chatcmpl-fake', 'object': 'chat.completion', 'created': int(time.time()), 'model': model,
+                        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                        'usage': usage,
+                    })
+
+            def stream(self, text, model):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+
+                tokens = re.findall(r'\S+\s*|\s+', text)
+                for token in tokens + [None]:
+                    delta = {'content': token} if token is not None else {}
+                    chunk = {
+                        'id': 'chatcmpl-fake', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                        'choices': [{'index': 0, 'delta': delta, 'finish_reason': None if token is not None else 'stop'}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    if token is not None and fake_llm.token_latency:
+                        time.sleep(fake_llm.token_latency)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def send_json(self, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}/v1"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a deterministic fake OpenAI chat completions API.")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.5, help='Delay before the first token, in seconds.')
+    parser.add_argument('--token-latency', type=float, default=0.0, help='Delay per completion token, in seconds.')
+    args = parser.parse_args()
+
+    base_url = FakeLLM(latency=args.latency, token_latency=args.token_latency).start(port=args.port)
+    print(f"Fake LLM on {base_url}, e.g. OPENAI_API_BASE={base_url} OPENAI_API_KEY=sk-fake")
+    threading.Event().wait()
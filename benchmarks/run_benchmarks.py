@@ -0,0 +1,264 @@
+import io
+import os
+import sys
+import json
+import time
+import logging
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from fake_github import FakeGitHub
+from fake_llm import FakeLLM
+
+OWNER = 'bench'
+PATH_QUERIES = ('src', 'src/pkg_1', '**/*.py', 'src/**/module_7.py', 'module_11.js')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def timings(name, durations, total_seconds=None, **extra):
+    """
+    Summarizes the latencies of one benchmark.
+
+    Parameters:
+        name (str): The benchmark name.
+        durations (list): The latency of every operation, in seconds.
+        total_seconds (float): The wall time of all operations, when they ran concurrently.
+
+    Returns:
+        dict: The count, throughput and latency percentiles.
+    """
+    total_seconds = total_seconds if total_seconds is not None else sum(durations)
+    return {
+        'name': name,
+        'count': len(durations),
+        'seconds': round(total_seconds, 4),
+        'per_second': round(len(durations) / total_seconds, 2) if total_seconds else None,
+        'p50_ms': round(statistics.median(durations) * 1000, 3),
+        'p95_ms': round(percentile(durations, 0.95) * 1000, 3),
+        'max_ms': round(max(durations) * 1000, 3),
+        **extra,
+    }
+
+
+def measure(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_file_tree(repo, repeat):
+    from github_helper import get_file_tree
+
+    durations = [measure(get_file_tree, OWNER, repo)[0] for _ in range(repeat)]
+    return timings('get_file_tree', durations)
+
+
+def bench_path_resolution(repo, repeat):
+    from github_helper import IGNORE_DIRS, get_tree_entries
+    from path_resolver import PathIndex
+
+    _, entries = get_tree_entries(OWNER, repo)
+    build_seconds, path_index = measure(PathIndex, entries, ignore_dirs=IGNORE_DIRS)
+
+    durations = []
+    for _ in range(repeat):
+        for query in PATH_QUERIES:
+            durations.append(measure(path_index.resolve, query)[0])
+    return timings('path_resolution', durations, index_build_ms=round(build_seconds * 1000, 3))
+
+
+def bench_file_contents(repo, paths, concurrency):
+    from tools import fetch_file_contents
+
+    def fetch(path):
+        duration, contents = measure(fetch_file_contents, path, OWNER, repo, enforce_line_limit=False)
+        if contents.startswith('Error:'):
+            raise RuntimeError(contents)
+        return duration
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        durations = list(executor.map(fetch, paths))
+    return timings('get_file_contents', durations, total_seconds=time.perf_counter() - start, concurrency=concurrency)
+
+
+def bench_review_crew(repo, paths):
+    from review_crew import ReviewCrew
+
+    durations = []
+    for path in paths:
+        review_crew = ReviewCrew(owner=OWNER, repo=repo, path=path, output='bench.md', inject_content=True, chunked=True)
+        duration, result = measure(review_crew.run)
+        if result is None:
+            raise RuntimeError(f"ReviewCrew.run failed for {path}")
+        durations.append(duration)
+    return timings('review_crew_run', durations)
+
+
+def bench_pipeline(repo, file_count, concurrency, batch_token_budget):
+    from review_pipeline import ReviewPipeline
+
+    pipeline = ReviewPipeline(owner=OWNER, repo=repo, max_concurrency=concurrency, batch_token_budget=batch_token_budget, path_agent_fallback=False)
+    start = time.perf_counter()
+    pipeline.fetch_tree()
+    paths = pipeline.resolve_paths('src')[:file_count]
+    review_crews = pipeline.create_crews(paths)
+
+    failed = sum(result is None for _, result in pipeline.run(review_crews))
+
+    # Per-file latencies come from the review spans of the run
+    durations = [span['seconds'] for span in pipeline.summary['files']]
+    return timings(
+        'pipeline', durations, total_seconds=time.perf_counter() - start,
+        concurrency=concurrency, batch_token_budget=batch_token_budget, failed=failed
+    )
+
+
+def run_size(fake_github, file_count, args):
+    """
+    Runs every benchmark against the synthetic repository of the given size, in a fresh working directory.
+    """
+    repo = f"repo-{file_count}"
+    results = []
+    fake_github.warm(repo)
+
+    work_dir = tempfile.mkdtemp(prefix=f"bench-{file_count}-")
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        results.append(bench_file_tree(repo, args.repeat))
+        results.append(bench_path_resolution(repo, args.repeat))
+
+        from github_helper import get_tree_entries
+        _, entries = get_tree_entries(OWNER, repo)
+        sample = [item['path'] for item in entries if item['type'] == 'blob'][:args.contents_files]
+        results.append(bench_file_contents(repo, sample, args.concurrency))
+
+        # crewai prints every step of the agents
+        with redirect_stdout(io.StringIO()):
+            results.append(bench_review_crew(repo, sample[:args.crew_files]))
+            results.append(bench_pipeline(repo, args.review_files, args.concurrency, args.batch_token_budget))
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for result in results:
+        result['files'] = file_count
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    """
+    Prints the results as a table, with the change of every throughput against the baseline run.
+    """
+    baseline_by_key = {(result['files'], result['name']): result for result in (baseline or {}).get('results', [])}
+
+    print(f"{'files':>6} {'benchmark':<18} {'count':>6} {'seconds':>9} {'per_sec':>9} {'p50_ms':>9} {'p95_ms':>9}  change")
+    for result in results:
+        change = ''
+        previous = baseline_by_key.get((result['files'], result['name']))
+        if previous and previous.get('per_second') and result.get('per_second'):
+            change = f"{(result['per_second'] / previous['per_second'] - 1) * 100:+.1f}%"
+        print(
+            f"{result['files']:>6} {result['name']:<18} {result['count']:>6} {result['seconds']:>9.3f} "
+            f"{result['per_second'] or 0:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f}  {change}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the review pipeline against a fake GitHub API and a fake LLM.")
+    parser.add_argument('--sizes', default='10,100,1000,10000', help='Comma-separated file counts of the synthetic repositories.')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions of the tree and path resolution benchmarks.')
+    parser.add_argument('--contents-files', type=int, default=200, help='Files fetched by the contents benchmark.')
+    parser.add_argument('--crew-files', type=int, default=3, help='Files reviewed one by one with ReviewCrew.run.')
+    parser.add_argument('--review-files', type=int, default=20, help='Files reviewed by the end-to-end pipeline benchmark.')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent fetches and reviews.')
+    parser.add_argument('--batch-token-budget', type=int, default=0, help='Batch token budget of the pipeline benchmark, 0 disables batching.')
+    parser.add_argument('--github-latency', type=float, default=0.0, help='Delay of every fake GitHub response, in seconds.')
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='Delay of every fake LLM completion, in seconds.')
+    parser.add_argument('--llm-token-latency', type=float, default=0.0, help='Delay per fake LLM completion token, in seconds.')
+    parser.add_argument('--output', help='Where to write the results, defaults to benchmarks/results/<timestamp>.json.')
+    parser.add_argument('--compare', help='A previous results file to compare the throughputs against.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    fake_github = FakeGitHub(latency=args.github_latency)
+    fake_llm = FakeLLM(latency=args.llm_latency, token_latency=args.llm_token_latency)
+
+    # The reviewer reads its endpoints and settings at import time, so they are set before importing it
+    os.environ.update({
+        'GITHUB_API_URL': fake_github.start(),
+        'GITHUB_KEY': 'fake',
+        'OPENAI_API_BASE': fake_llm.start(),
+        'OPENAI_API_KEY': 'sk-fake',
+        'OPENAI_MODEL_NAME': 'gpt-4o',
+        'OTEL_SDK_DISABLED': 'true',
+    })
+    sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    results = []
+    for file_count in [int(size) for size in args.sizes.split(',')]:
+        print(f"Benchmarking a {file_count}-file repository...", file=sys.stderr)
+        results.extend(run_size(fake_github, file_count, args))
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': vars(args),
+        'llm': {'requests': fake_llm.request_count, 'prompt_tokens': fake_llm.prompt_tokens, 'completion_tokens': fake_llm.completion_tokens},
+        'github_requests': fake_github.request_count,
+        'results': results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+    print_results(results, baseline)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    fake_github.stop()
+    fake_llm.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# Runs in a fresh interpreter, so the first script run pays for every import like a new Streamlit server does
+PROBE = """
+import json, time
+from streamlit.testing.v1 import AppTest
+
+timings = {}
+app_test = AppTest.from_file('app.py', default_timeout=120)
+
+start = time.perf_counter()
+app_test.run()
+timings['cold_run_ms'] = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+app_test.run()
+timings['warm_rerun_ms'] = (time.perf_counter() - start) * 1000
+
+# What the first review pays once, and every later review and rerun reuses
+start = time.perf_counter()
+import review_pipeline, llm_client
+llm_client.get_http_client()
+timings['pipeline_import_ms'] = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+from agents import Agents
+Agents().review_agent()
+timings['first_agent_ms'] = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+for _ in range(10):
+    Agents().review_agent()
+timings['next_agent_ms'] = (time.perf_counter() - start) * 100
+
+print(json.dumps({'errors': [str(error.value) for error in app_test.exception], **timings}))
+"""
+
+
+def probe():
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.path.join(ROOT_DIR, 'src'),
+        GITHUB_KEY=os.getenv('GITHUB_KEY', 'fake'),
+        OPENAI_API_KEY=os.getenv('OPENAI_API_KEY', 'sk-fake'),
+        OTEL_SDK_DISABLED='true',
+    )
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cold and warm start time of the Streamlit app.")
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh interpreters to measure.')
+    args = parser.parse_args(argv)
+
+    runs = [probe() for _ in range(args.repeat)]
+    errors = [error for run in runs for error in run.pop('errors')]
+    if errors:
+        print(f"The app raised: {errors[0]}", file=sys.stderr)
+        return 1
+
+    for key in runs[0]:
+        values = [run[key] for run in runs]
+        print(f"{key:<20} median {statistics.median(values):9.1f}  min {min(values):9.1f}  max {max(values):9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
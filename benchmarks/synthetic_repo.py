@@ -0,0 +1,170 @@
+import io
+import os
+import gzip
+import random
+import hashlib
+import tarfile
+from functools import lru_cache
+
+# Files per folder and folders per parent, so 10,000 files span a realistic, nested tree
+FILES_PER_DIR = 12
+DIRS_PER_DIR = 8
+
+EXTENSIONS = ('.py', '.py', '.py', '.js', '.ts', '.md', '.json')
+
+
+def git_sha(kind, data):
+    """
+    Returns the git object SHA of the given data, e.g. the blob SHA of a file.
+    """
+    return hashlib.sha1(f"{kind} {len(data)}\0".encode() + data).hexdigest()
+
+
+class SyntheticRepo:
+    """
+    A deterministic, generated repository: the same file count and seed always produce the same paths and contents.
+
+    Contents are generated on demand, so 10,000-file repositories do not have to be held in memory.
+    """
+
+    def __init__(self, file_count, seed=0, min_lines=20, max_lines=400):
+        """
+        Parameters:
+            file_count (int): The number of files of the repository.
+            seed (int): The seed of the generator.
+            min_lines (int): The minimum number of lines per file.
+            max_lines (int): The maximum number of lines per file.
+        """
+        self.file_count = file_count
+        self.seed = seed
+        self.min_lines = min_lines
+        self.max_lines = max_lines
+        self.name = f"repo-{file_count}"
+        self.paths = [self.make_path(index) for index in range(file_count)]
+        self.path_set = set(self.paths)
+        self.commit_sha = hashlib.sha1(f"commit {self.name} {seed}".encode()).hexdigest()
+        self.blobs = {}
+
+    def make_path(self, index):
+        """
+        Places file number index in a nested folder structure, e.g. src/pkg_3/module_37.py.
+        """
+        directory = index // FILES_PER_DIR
+        parts = []
+        while directory:
+            parts.append(f"pkg_{directory % DIRS_PER_DIR}")
+            directory //= DIRS_PER_DIR
+        extension = EXTENSIONS[index % len(EXTENSIONS)]
+        return '/'.join(['src', *reversed(parts), f"module_{index}{extension}"])
+
+    @lru_cache(maxsize=4096)
+    def content(self, path):
+        """
+        Returns the content of a file, as bytes.
+        """
+        generator = random.Random(f"{self.seed}:{path}")
+        line_count = generator.randint(self.min_lines, self.max_lines)
+        name = os.path.splitext(os.path.basename(path))[0]
+
+        if path.endswith('.py'):
+            lines = [f'"""Synthetic module {name}."""', 'import os', 'import json', '']
+            while len(lines) < line_count:
+                function = f"function_{len(lines)}"
+                lines.extend([
+                    f"def {function}(value, items=[]):",
+                    f'    """Returns the {function} of value."""',
+                    *[f"    value = value * {generator.randint(1, 9)} + {generator.randint(0, 99)}" for _ in range(generator.randint(2, 12))],
+                    "    items.append(value)",
+                    "    return value",
+                    "",
+                ])
+        elif path.endswith(('.js', '.ts')):
+            lines = ["const fs = require('fs');", '']
+            while len(lines) < line_count:
+                lines.extend([
+                    f"function fn{len(lines)}(value) {{",
+                    *[f"  value = value * {generator.randint(1, 9)} + {generator.randint(0, 99)};" for _ in range(generator.randint(2, 12))],
+                    "  return value;",
+                    "}",
+                    "",
+                ])
+        elif path.endswith('.json'):
+            lines = ['{'] + [f'  "key_{line}": {generator.randint(0, 9999)},' for line in range(line_count)] + ['  "end": true', '}']
+        else:
+            lines = [f"# {name}", ''] + [f"Paragraph {line} of the synthetic documentation." for line in range(line_count)]
+
+        return ('\n'.join(lines[:max(line_count, 2)]) + '\n').encode('utf-8')
+
+    def blob(self, path):
+        """
+        Returns the blob SHA and the size of a file, computed once.
+        """
+        if path not in self.blobs:
+            data = self.content(path)
+            self.blobs[path] = (git_sha('blob', data), len(data))
+        return self.blobs[path]
+
+    @lru_cache(maxsize=1)
+    def directories(self):
+        """
+        Returns every folder of the repository, with its direct children (files and folders).
+        """
+        children = {'': set()}
+        for path in self.paths:
+            parts = path.split('/')
+            for depth in range(len(parts)):
+                parent = '/'.join(parts[:depth])
+                child = '/'.join(parts[:depth + 1])
+                children.setdefault(parent, set()).add(child)
+                if depth < len(parts) - 1:
+                    children.setdefault(child, set())
+        return {directory: sorted(entries) for directory, entries in children.items()}
+
+    def tree_sha(self, directory):
+        """
+        Returns a stable SHA for a folder (not a real git tree SHA, which the client never checks).
+        """
+        return hashlib.sha1(f"tree {self.name} {self.seed} {directory}".encode()).hexdigest()
+
+    @lru_cache(maxsize=1)
+    def directory_by_sha(self):
+        return {self.tree_sha(directory): directory for directory in self.directories()}
+
+    def entry(self, path, prefix=''):
+        """
+        Returns the Git Trees API entry of a file or folder, relative to prefix.
+        """
+        relative_path = path[len(prefix):]
+        if path in self.directories():
+            return {'path': relative_path, 'mode': '040000', 'type': 'tree', 'sha': self.tree_sha(path)}
+        sha, size = self.blob(path)
+        return {'path': relative_path, 'mode': '100644', 'type': 'blob', 'sha': sha, 'size': size}
+
+    def tree(self, directory='', recursive=False):
+        """
+        Returns the entries of a folder, or of the whole subtree when recursive.
+        """
+        prefix = f"{directory}/" if directory else ''
+        if not recursive:
+            return [self.entry(path, prefix) for path in self.directories()[directory]]
+
+        paths = sorted(
+            [path for path in self.directories() if path and path.startswith(prefix)] +
+            [path for path in self.paths if path.startswith(prefix)]
+        )
+        return [self.entry(path, prefix) for path in paths]
+
+    def tarball(self):
+        """
+        Returns the repository as a gzipped tarball, with the single top-level folder GitHub adds.
+        """
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=1) as compressed:
+            with tarfile.open(fileobj=compressed, mode='w') as archive:
+                root = f"bench-{self.name}-{self.commit_sha[:7]}"
+                for path in self.paths:
+                    data = self.content(path)
+                    info = tarfile.TarInfo(f"{root}/{path}")
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+        return buffer.getvalue()
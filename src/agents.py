@@ -1,7 +1,8 @@
-import re
 import logging
+import threading
 from crewai import Agent
-import streamlit as st
+from langchain_core.callbacks import BaseCallbackHandler
+from llm_client import create_llm
 from tools import Tools
 
 # Set up logging configuration
@@ -24,20 +25,30 @@ class Agents:
     CONTENT_AGENT_GOAL = "Get the content of given file using GitHub API"
     CONTENT_AGENT_BACKSTORY = "You're a GitHub API expert who has extracted many file contents using GitHub's API"
 
-    def review_agent(self):
+    def review_agent(self, token_stream=None, model=None):
         """
         Creates a review agent for code reviews.
 
+        Parameters:
+            token_stream (TokenStream): Stream the review tokens to this buffer as they are generated.
+            model (str): The model reviewing the code, defaults to OPENAI_MODEL_NAME.
+
         Returns:
             Agent: Configured agent for performing code reviews.
         """
         try:
+            options = {}
+            if token_stream is not None:
+                options = {'streaming': True, 'callbacks': [TokenStreamHandler(token_stream)]}
+
             return Agent(
                 role=self.REVIEW_AGENT_ROLE,
                 goal=self.REVIEW_AGENT_GOAL,
                 backstory=self.REVIEW_AGENT_BACKSTORY,
                 allow_delegation=False,
                 verbose=True,
+                max_retry_limit=0,
+                llm=create_llm(model=model, **options),
             )
         except Exception as e:
             logging.error("Error creating review agent", exc_info=True)
@@ -57,15 +68,21 @@ class Agents:
                 backstory=self.PATH_AGENT_BACKSTORY,
                 allow_delegation=False,
                 verbose=True,
+                max_retry_limit=0,
+                llm=create_llm(),
             )
         except Exception as e:
             logging.error("Error creating path agent", exc_info=True)
             return None
 
-    def content_agent(self):
+    def content_agent(self, snapshot=None, ref=None):
         """
         Creates a content agent for fetching file content using GitHub API.
 
+        Parameters:
+            snapshot (RepoSnapshot): Read the files from this snapshot instead of the Contents API.
+            ref (str): The commit to read the files at, defaults to the default branch.
+
         Returns:
             Agent: Configured agent for fetching file content using GitHub API.
         """
@@ -76,46 +93,58 @@ class Agents:
                 backstory=self.CONTENT_AGENT_BACKSTORY,
                 verbose=True,
                 allow_delegation=False,
-                tools=[Tools.get_file_contents],
+                tools=[Tools.file_contents_tool(snapshot=snapshot, ref=ref)],
+                max_retry_limit=0,
+                llm=create_llm(),
             )
         except Exception as e:
             logging.error("Error creating content agent", exc_info=True)
             return None
 
-class StreamToExpander:
-    def __init__(self, expander):
-        self.expander = expander
-        self.buffer = []
+class TokenStream:
+    """
+    Thread-safe buffer of the tokens streamed by the LLM for one review, read by the script thread to render them.
+    """
 
-    def write(self, data):
-        # Filter out ANSI escape codes using a regular expression
-        cleaned_data = re.sub(r'\x1B\[[0-9;]*[mK]', '', str(data))
+    FINAL_ANSWER_MARKER = "Final Answer:"
 
-        # Check if the data contains 'task' information
-        task_match_object = re.search(r'\"task\"\s*:\s*\"(.*?)\"', cleaned_data, re.IGNORECASE)
-        task_match_input = re.search(r'task\s*:\s*([^\n]*)', cleaned_data, re.IGNORECASE)
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = []
+        self.version = 0
 
-        task_value = None
+    def start(self):
+        """Starts a new LLM generation; the agent may call the LLM more than once per task."""
+        with self.lock:
+            self.tokens = []
+            self.version += 1
 
-        if task_match_object:
-            task_value = task_match_object.group(1)
-        elif task_match_input:
-            task_value = task_match_input.group(1).strip()
+    def append(self, token):
+        with self.lock:
+            self.tokens.append(token)
+            self.version += 1
 
-        if task_value:
-            st.toast(":robot_face: " + task_value)
+    def text(self):
+        """Returns the streamed review so far, without the agent's thoughts once the final answer starts."""
+        with self.lock:
+            text = ''.join(self.tokens)
+        _, marker, answer = text.partition(self.FINAL_ANSWER_MARKER)
+        return answer.strip() if marker else text
+
+
+class TokenStreamHandler(BaseCallbackHandler):
+    """
+    LangChain callback that forwards the LLM tokens to a TokenStream.
+    """
 
-        self.buffer.append(cleaned_data)
+    def __init__(self, token_stream):
+        self.token_stream = token_stream
 
-        if "\n" in data:
-            self.expander.code(''.join(self.buffer), language='bash')
-            self.buffer = []
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.token_stream.start()
 
-    def flush(self):
-        if self.buffer:
-            self.expander.code(''.join(self.buffer), language='bash')
-            self.clear_buffer()
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.token_stream.start()
 
-    def clear_buffer(self):
-        """Clears the buffer to free memory."""
-        self.buffer = []
\ No newline at end of file
+    def on_llm_new_token(self, token, **kwargs):
+        self.token_stream.append(token)
@@ -0,0 +1,72 @@
+import os
+from constants import APP_BATCH_TOKEN_BUDGET
+
+try:
+    import tiktoken
+    ENCODING = tiktoken.get_encoding('cl100k_base')
+except Exception:
+    # tiktoken is optional: fall back to the usual ~4 characters per token estimate
+    ENCODING = None
+
+# Configurable batching thresholds, in tokens
+BATCH_SMALL_FILE_TOKENS = int(os.getenv('BATCH_SMALL_FILE_TOKENS', 1500))
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', 8))
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimates the number of tokens of a text.
+
+    Parameters:
+        text (str): The text.
+
+    Returns:
+        int: The estimated token count.
+    """
+    if ENCODING is not None:
+        return len(ENCODING.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_tokens_from_size(size):
+    """
+    Estimates the number of tokens of a file from its size in bytes, before it is fetched.
+
+    Parameters:
+        size (int): The file size in bytes.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return size // CHARS_PER_TOKEN + 1
+
+
+def pack_files(file_tokens, budget=APP_BATCH_TOKEN_BUDGET, small_file_tokens=BATCH_SMALL_FILE_TOKENS, max_files=BATCH_MAX_FILES):
+    """
+    Groups small files into batches that fit a token budget (first-fit decreasing bin packing).
+
+    Parameters:
+        file_tokens (dict): The estimated token count of every candidate path, in review order.
+        budget (int): The maximum number of file tokens per batch.
+        small_file_tokens (int): Files above this size are always reviewed on their own.
+        max_files (int): The maximum number of files per batch.
+
+    Returns:
+        list: The batches with more than one file, each a list of paths in review order.
+    """
+    order = {path: index for index, path in enumerate(file_tokens)}
+    small_files = [path for path, tokens in file_tokens.items() if tokens <= min(small_file_tokens, budget)]
+
+    bins = []
+    for path in sorted(small_files, key=lambda path: file_tokens[path], reverse=True):
+        for batch in bins:
+            if batch['tokens'] + file_tokens[path] <= budget and len(batch['paths']) < max_files:
+                batch['paths'].append(path)
+                batch['tokens'] += file_tokens[path]
+                break
+        else:
+            bins.append({'paths': [path], 'tokens': file_tokens[path]})
+
+    return [sorted(batch['paths'], key=order.get) for batch in bins if len(batch['paths']) > 1]
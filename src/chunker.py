@@ -0,0 +1,117 @@
+import os
+import re
+import ast
+
+# Configurable chunk size for files over the line count limit
+CHUNK_MAX_LINES = int(os.getenv('CHUNK_MAX_LINES', 300))  # 300 lines
+HEADER_MAX_LINES = int(os.getenv('CHUNK_HEADER_MAX_LINES', 60))  # 60 lines
+CHUNK_REVIEW_WORKERS = int(os.getenv('CHUNK_REVIEW_WORKERS', 4))
+
+# Import-like lines of common languages, used as header context when the file is not Python
+HEADER_LINE_PATTERN = re.compile(r'^\s*((import|from|#include|using|require|package|use)\b|const .*= require\()')
+
+
+class FileChunk:
+    """
+    A contiguous range of lines of a file, reviewed on its own.
+    """
+
+    def __init__(self, index, start, end, text):
+        """
+        Parameters:
+            index (int): The position of the chunk in the file, starting at 1.
+            start (int): The first line of the chunk, starting at 1.
+            end (int): The last line of the chunk, inclusive.
+            text (str): The content of the chunk.
+        """
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+
+
+def python_header(tree, lines):
+    """
+    Returns the top-level imports of a Python module and the start of its docstring.
+    """
+    header_lines = []
+
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        header_lines.extend(f"# {line}" for line in docstring.split('\n')[:10])
+
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            header_lines.extend(lines[node.lineno - 1:node.end_lineno])
+
+    return '\n'.join(header_lines[:HEADER_MAX_LINES])
+
+
+def python_boundaries(tree, line_count, max_lines):
+    """
+    Returns the lines where a top-level statement starts (decorators included), so chunks never split a definition.
+    """
+    boundaries = [1]
+    for node in tree.body:
+        start = min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])])
+        boundaries.append(start)
+
+        # Large classes may also be split between their methods
+        if isinstance(node, ast.ClassDef) and node.end_lineno - start + 1 > max_lines:
+            for child in node.body:
+                boundaries.append(min([child.lineno] + [decorator.lineno for decorator in getattr(child, 'decorator_list', [])]))
+
+    return sorted({boundary for boundary in boundaries if 1 <= boundary <= line_count})
+
+
+def split_into_chunks(path, content, max_lines=CHUNK_MAX_LINES):
+    """
+    Splits an oversized file along class and function boundaries, with a line-window fallback.
+
+    Python files are split on top-level statements (and methods of large classes) found with ast.
+    Other languages, or Python that does not parse, are split into fixed line windows.
+
+    Parameters:
+        path (str): The file path, used to pick the splitting strategy.
+        content (str): The content of the file.
+        max_lines (int): The maximum number of lines per chunk, unless a single definition is longer.
+
+    Returns:
+        tuple: The shared header context (imports, module docstring) and the list of FileChunk covering the file.
+    """
+    lines = content.split('\n')
+    line_count = len(lines)
+
+    header = ""
+    boundaries = None
+
+    if path.endswith('.py'):
+        try:
+            tree = ast.parse(content)
+            header = python_header(tree, lines)
+            boundaries = python_boundaries(tree, line_count, max_lines)
+        except (SyntaxError, ValueError):
+            boundaries = None
+
+    if boundaries is None:
+        header = '\n'.join([line for line in lines[:HEADER_MAX_LINES * 2] if HEADER_LINE_PATTERN.match(line)][:HEADER_MAX_LINES])
+        boundaries = list(range(1, line_count + 1, max_lines))
+
+    # Greedily merge consecutive segments while they fit in max_lines
+    segments = [(start, end - 1) for start, end in zip(boundaries, boundaries[1:] + [line_count + 1])]
+    ranges = []
+    for start, end in segments:
+        if ranges and end - ranges[-1][0] + 1 <= max_lines:
+            ranges[-1] = (ranges[-1][0], end)
+        elif end - start + 1 > max_lines:
+            # A single definition longer than max_lines is split into line windows
+            ranges.extend((window, min(window + max_lines - 1, end)) for window in range(start, end + 1, max_lines))
+        else:
+            ranges.append((start, end))
+
+    chunks = [
+        FileChunk(index=index, start=start, end=end, text='\n'.join(lines[start - 1:end]))
+        for index, (start, end) in enumerate(ranges, start=1)
+    ]
+
+    return header, chunks
@@ -1,8 +1,25 @@
+import os
+
 # Constants related to the application repository
 APP_REPO_URL = "https://github.com/josoroma/code_challenge_reviewer"
 APP_REPO_PATH = "src/agents.py"
 APP_REPO_FILE_SAMPLE = "agents.py"
 APP_REPO_FULLPATH_SAMPLE = "src/agents.py"
+APP_PATH_AGENT_FALLBACK = True
+APP_MAX_CONCURRENCY = int(os.getenv('MAX_REVIEW_CONCURRENCY', 4))
+APP_INJECT_FILE_CONTENTS = os.getenv('INJECT_FILE_CONTENTS', 'false').lower() == 'true'
+APP_SNAPSHOT_MODE = os.getenv('SNAPSHOT_MODE', 'false').lower() == 'true'
+APP_CHUNKED_REVIEW = os.getenv('CHUNKED_REVIEW', 'false').lower() == 'true'
+APP_BATCH_TOKEN_BUDGET = int(os.getenv('BATCH_TOKEN_BUDGET', 0))
+APP_STREAM_TOKENS = os.getenv('STREAM_TOKENS', 'false').lower() == 'true'
+APP_INCREMENTAL_REVIEW = os.getenv('INCREMENTAL_REVIEW', 'false').lower() == 'true'
+APP_TRIAGE = os.getenv('TRIAGE', 'false').lower() == 'true'
+APP_DEDUP = os.getenv('DEDUP', 'false').lower() == 'true'
+APP_STATIC_ANALYSIS = os.getenv('STATIC_ANALYSIS', 'false').lower() == 'true'
+APP_STATIC_ONLY = os.getenv('STATIC_ONLY', 'false').lower() == 'true'
+APP_DIFF_OUTPUT = os.getenv('DIFF_OUTPUT', 'false').lower() == 'true'
+APP_PULL_REQUEST = os.getenv('PULL_REQUEST', '')
+APP_MODEL_ROUTING = os.getenv('MODEL_ROUTING', 'false').lower() == 'true'
 APP_REPO_OUTPUT = "['src/agents.py', 'src/main.py', 'tools.py']"
 APP_REPO_STRUCTURE = """
 - src
@@ -0,0 +1,244 @@
+import os
+import re
+import time
+import zlib
+import random
+import sqlite3
+import hashlib
+import logging
+from array import array
+from contextlib import contextmanager
+from review_cache import hash_text, model_settings
+
+# Configurable near-duplicate detection
+DEDUP_INDEX_PATH = os.getenv('DEDUP_INDEX_PATH', os.path.join('.cache', 'dedup.sqlite3'))
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.85))  # Estimated Jaccard similarity of near-duplicates
+DEDUP_DELTA_REVIEW = os.getenv('DEDUP_DELTA_REVIEW', 'false').lower() == 'true'  # Review the differences of near-duplicates
+DEDUP_MAX_AGE_DAYS = int(os.getenv('DEDUP_MAX_AGE_DAYS', 30))  # 30 days
+
+# MinHash over shingles of normalized tokens, split into LSH bands: 16 bands of 4 rows turn pairs above ~50%
+# similarity into candidates, which are then checked against DEDUP_THRESHOLD
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 5
+MIN_SHINGLES = 20  # Smaller files are too short to tell near-duplicates apart
+
+MERSENNE_PRIME = (1 << 61) - 1
+_random = random.Random(20240801)
+PERMUTATIONS = [(_random.randrange(1, MERSENNE_PRIME), _random.randrange(0, MERSENNE_PRIME)) for _ in range(MINHASH_PERMUTATIONS)]
+
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+COMMENT_PATTERN = re.compile(r'^\s*(#|//|/\*|\*|--|<!--)')
+
+
+def git_blob_sha(contents):
+    """
+    Returns the git blob SHA of file contents, the same SHA the Git Trees API reports.
+    """
+    data = contents.encode('utf-8')
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def normalize_tokens(contents):
+    """
+    Tokenizes file contents, ignoring case, whitespace and comment lines.
+
+    Returns:
+        list: The tokens.
+    """
+    tokens = []
+    for line in contents.lower().splitlines():
+        if not COMMENT_PATTERN.match(line):
+            tokens.extend(TOKEN_PATTERN.findall(line))
+    return tokens
+
+
+def minhash(contents):
+    """
+    Computes the MinHash signature of file contents over shingles of SHINGLE_SIZE normalized tokens.
+
+    Returns:
+        list: MINHASH_PERMUTATIONS integers, or None when the file is too short.
+    """
+    tokens = normalize_tokens(contents)
+    shingles = {' '.join(tokens[index:index + SHINGLE_SIZE]) for index in range(len(tokens) - SHINGLE_SIZE + 1)}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little') for shingle in shingles]
+    return [min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in PERMUTATIONS]
+
+
+def similarity(signature, other):
+    """
+    Estimates the Jaccard similarity of two files from their signatures.
+    """
+    return sum(1 for a, b in zip(signature, other) if a == b) / len(signature)
+
+
+def lsh_buckets(signature):
+    """
+    Returns the (band, bucket) of every LSH band of a signature.
+    """
+    rows = len(signature) // LSH_BANDS
+    buckets = []
+    for band in range(LSH_BANDS):
+        data = array('Q', signature[band * rows:(band + 1) * rows]).tobytes()
+        buckets.append((band, int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little', signed=True)))
+    return buckets
+
+
+def settings_key(prompt_version, model=None):
+    """
+    Hashes the prompts and model settings, so only reviews made the same way (and by the same model) are reused.
+    """
+    return hash_text(prompt_version, *sorted(f"{name}={value}" for name, value in model_settings(model).items()))
+
+
+class DedupIndex:
+    """
+    Persistent MinHash/LSH index on SQLite of the files reviewed so far, across runs and repositories.
+    """
+
+    def __init__(self, path=DEDUP_INDEX_PATH, threshold=DEDUP_THRESHOLD, max_age_days=DEDUP_MAX_AGE_DAYS):
+        """
+        Opens (and creates if needed) the index database and drops expired entries.
+
+        Parameters:
+            path (str): The SQLite database file.
+            threshold (float): Minimum estimated similarity of a near-duplicate.
+            max_age_days (int): Age after which an indexed review is dropped.
+        """
+        self.path = path
+        self.threshold = threshold
+        self.max_age = max_age_days * 24 * 60 * 60
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self.connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    key TEXT PRIMARY KEY,
+                    blob_sha TEXT NOT NULL,
+                    settings TEXT NOT NULL,
+                    owner TEXT,
+                    repo TEXT,
+                    path TEXT,
+                    signature BLOB NOT NULL,
+                    contents BLOB NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, key)
+                ) WITHOUT ROWID
+            """)
+            self.prune(connection)
+
+    @contextmanager
+    def connect(self):
+        """
+        Opens a new connection for one transaction. One connection per call keeps the index safe to use from worker threads.
+        """
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def prune(self, connection):
+        """
+        Drops the reviews older than max_age_days and their bands.
+        """
+        stale = connection.execute('SELECT key FROM files WHERE created_at < ?', (time.time() - self.max_age,)).fetchall()
+        if stale:
+            connection.executemany('DELETE FROM bands WHERE key = ?', stale)
+            connection.executemany('DELETE FROM files WHERE key = ?', stale)
+
+    def find(self, contents, settings, owner=None, repo=None, path=None):
+        """
+        Finds the most similar file already reviewed with the same settings.
+
+        The earlier versions of the file itself are never a match: an edited file must be reviewed again.
+
+        Parameters:
+            contents (str): The contents of the file about to be reviewed.
+            settings (str): The settings_key of the review.
+            owner (str): The owner of the repository of the file.
+            repo (str): The name of the repository of the file.
+            path (str): The path of the file.
+
+        Returns:
+            dict: The owner, repo, path, blob_sha, contents and result of the match, with its similarity, or None.
+        """
+        signature = minhash(contents)
+        if signature is None:
+            return None
+
+        buckets = lsh_buckets(signature)
+        try:
+            with self.connect() as connection:
+                keys = connection.execute(
+                    'SELECT DISTINCT key FROM bands WHERE ' + ' OR '.join(['(band = ? AND bucket = ?)'] * len(buckets)),
+                    [value for bucket in buckets for value in bucket]
+                ).fetchall()
+
+                best = None
+                for (key,) in keys:
+                    row = connection.execute(
+                        'SELECT owner, repo, path, blob_sha, signature, contents, result FROM files '
+                        'WHERE key = ? AND settings = ? AND created_at >= ? AND NOT (owner IS ? AND repo IS ? AND path IS ?)',
+                        (key, settings, time.time() - self.max_age, owner, repo, path)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    score = similarity(signature, array('Q', row[4]).tolist())
+                    if score >= self.threshold and (best is None or score > best['similarity']):
+                        best = {
+                            'owner': row[0], 'repo': row[1], 'path': row[2], 'blob_sha': row[3],
+                            'contents': zlib.decompress(row[5]).decode('utf-8'), 'result': row[6], 'similarity': score,
+                        }
+                return best
+        except sqlite3.Error as e:
+            logging.error(f"Error reading dedup index: {e}")
+            return None
+
+    def add(self, owner, repo, path, contents, result, settings):
+        """
+        Indexes a reviewed file, so later near-duplicates reuse its review.
+
+        Parameters:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            path (str): The path of the reviewed file.
+            contents (str): The contents of the file.
+            result (str): The review result in markdown format.
+            settings (str): The settings_key of the review.
+        """
+        signature = minhash(contents)
+        if signature is None:
+            return
+
+        blob_sha = git_blob_sha(contents)
+        key = hash_text(blob_sha, settings)
+        try:
+            with self.connect() as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        key, blob_sha, settings, owner, repo, path, array('Q', signature).tobytes(),
+                        zlib.compress(contents.encode('utf-8')), result, time.time()
+                    )
+                )
+                connection.executemany(
+                    'INSERT OR IGNORE INTO bands VALUES (?, ?, ?)',
+                    [(band, bucket, key) for band, bucket in lsh_buckets(signature)]
+                )
+        except sqlite3.Error as e:
+            logging.error(f"Error writing dedup index: {e}")
@@ -0,0 +1,229 @@
+import os
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from tracing import record_http
+from llm_controller import retry_after
+
+# Ensure environment variable is set for GITHUB_KEY
+GITHUB_KEY = os.getenv('GITHUB_KEY')
+
+# Configurable client settings
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com')
+GITHUB_TIMEOUT = float(os.getenv('GITHUB_TIMEOUT', 30))  # seconds
+GITHUB_MAX_RETRIES = int(os.getenv('GITHUB_MAX_RETRIES', 5))
+GITHUB_POOL_SIZE = int(os.getenv('GITHUB_POOL_SIZE', 16))
+GITHUB_ETAG_CACHE_SIZE = int(os.getenv('GITHUB_ETAG_CACHE_SIZE', 2048))  # responses
+GITHUB_ETAG_CACHE_BYTES = int(os.getenv('GITHUB_ETAG_CACHE_BYTES', 64 * 1024 * 1024))  # 64 MB of response bodies
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv('GITHUB_RATE_LIMIT_RESERVE', 10))  # requests kept in hand
+GITHUB_RATE_LIMIT_PACING = int(os.getenv('GITHUB_RATE_LIMIT_PACING', 100))  # start spreading requests below this
+
+
+class GitHubClient:
+    """
+    Shared GitHub API client with connection pooling, ETag conditional requests, rate limit scheduling and retries.
+    """
+
+    def __init__(self, token=GITHUB_KEY, base_url=GITHUB_API_URL):
+        """
+        Initializes the pooled session with the GitHub headers.
+
+        Parameters:
+            token (str): The GitHub token.
+            base_url (str): The GitHub API root URL.
+        """
+        self.base_url = base_url.rstrip('/')
+
+        # Transport-level retries with backoff for 5xx responses and connection errors
+        retry = Retry(
+            total=GITHUB_MAX_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=('GET', 'HEAD'),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=GITHUB_POOL_SIZE, pool_maxsize=GITHUB_POOL_SIZE, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/vnd.github+json',
+            'X-GitHub-Api-Version': '2022-11-28',
+        })
+        if token:
+            self.session.headers['Authorization'] = f'token {token}'
+        else:
+            # Only needed when a repository is read from GitHub, local checkouts never create the client
+            logging.warning("GITHUB_KEY environment variable not set, GitHub requests are unauthenticated (60 per hour).")
+
+        self.etags = OrderedDict()
+        self.etag_bytes = 0
+        self.lock = threading.Lock()
+        self.remaining = None
+        self.reset_at = 0.0
+
+    def url(self, path):
+        """
+        Returns the absolute URL of an API path. Absolute URLs are returned unchanged.
+        """
+        if path.startswith('https://') or path.startswith('http://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def wait_for_rate_limit(self):
+        """
+        Blocks until the next request fits in the rate limit, spreading requests out as the budget runs low.
+        """
+        with self.lock:
+            now = time.time()
+            if self.remaining is None or self.reset_at <= now:
+                return
+
+            if self.remaining <= GITHUB_RATE_LIMIT_RESERVE:
+                delay = self.reset_at - now
+            elif self.remaining <= GITHUB_RATE_LIMIT_PACING:
+                delay = (self.reset_at - now) / (self.remaining - GITHUB_RATE_LIMIT_RESERVE)
+            else:
+                delay = 0
+
+            # Claim the request now so concurrent callers see the reduced budget
+            self.remaining -= 1
+
+        if delay > 0:
+            logging.info(f"GitHub rate limit low, waiting {delay:.1f}s before the next request.")
+            time.sleep(delay)
+
+    def update_rate_limit(self, response):
+        """
+        Records the rate limit state reported by GitHub.
+        """
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset_at = response.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset_at is None:
+            return
+
+        with self.lock:
+            self.remaining = int(remaining)
+            self.reset_at = float(reset_at)
+
+    def retry_delay(self, response, attempt):
+        """
+        Returns how long to wait before retrying a rate limited response, or None if it is not rate limited.
+        """
+        if response.status_code not in (403, 429):
+            return None
+
+        # Retry-After in seconds or as an HTTP date, None when it is missing or invalid
+        delay = retry_after(response)
+        if delay is not None:
+            return delay
+
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            return max(float(response.headers.get('X-RateLimit-Reset', 0)) - time.time(), 1.0)
+
+        if 'secondary rate limit' in response.text.lower():
+            return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+        return None
+
+    def get(self, path, params=None, stream=False):
+        """
+        Performs a GET request, answering from the ETag cache when GitHub replies 304 Not Modified.
+
+        Parameters:
+            path (str): The API path or absolute URL.
+            params (dict): The query parameters.
+            stream (bool): Stream the response body. Streamed responses are not cached.
+
+        Returns:
+            requests.Response: The response.
+
+        Raises:
+            requests.exceptions.RequestException: When the request fails after all retries.
+        """
+        url = self.url(path)
+        cache_key = (url, tuple(sorted((params or {}).items())))
+
+        for attempt in range(GITHUB_MAX_RETRIES + 1):
+            self.wait_for_rate_limit()
+
+            headers = {}
+            with self.lock:
+                cached = None if stream else self.etags.get(cache_key)
+            if cached is not None:
+                headers['If-None-Match'] = cached.headers['ETag']
+
+            response = self.session.get(url, params=params, headers=headers, timeout=GITHUB_TIMEOUT, stream=stream)
+            self.update_rate_limit(response)
+
+            # Streamed bodies are counted by the caller while they are read
+            record_http(0 if stream else len(response.content))
+
+            # Conditional requests answered with 304 do not count against the rate limit
+            if response.status_code == 304 and cached is not None:
+                with self.lock:
+                    self.etags.move_to_end(cache_key)
+                return cached
+
+            delay = self.retry_delay(response, attempt)
+            if delay is not None and attempt < GITHUB_MAX_RETRIES:
+                logging.warning(f"GitHub rate limited {url}, retrying in {delay:.1f}s.")
+                response.close()
+                time.sleep(delay)
+                continue
+
+            response.raise_for_status()
+
+            if not stream and 'ETag' in response.headers:
+                self.cache_response(cache_key, response)
+
+            return response
+
+    def cache_response(self, cache_key, response):
+        """
+        Keeps a response for conditional requests, evicting the least recently used ones beyond GITHUB_ETAG_CACHE_SIZE
+        responses or GITHUB_ETAG_CACHE_BYTES bytes of bodies.
+        """
+        size = len(response.content)
+        with self.lock:
+            previous = self.etags.pop(cache_key, None)
+            if previous is not None:
+                self.etag_bytes -= len(previous.content)
+            if size > GITHUB_ETAG_CACHE_BYTES:
+                return
+
+            self.etags[cache_key] = response
+            self.etag_bytes += size
+            while len(self.etags) > GITHUB_ETAG_CACHE_SIZE or self.etag_bytes > GITHUB_ETAG_CACHE_BYTES:
+                _, evicted = self.etags.popitem(last=False)
+                self.etag_bytes -= len(evicted.content)
+
+    def get_json(self, path, params=None):
+        """
+        Performs a GET request and returns the decoded JSON body.
+        """
+        return self.get(path, params=params).json()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Returns the process-wide GitHub client, so every module shares one connection pool and ETag cache.
+
+    Returns:
+        GitHubClient: The shared client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
@@ -1,61 +1,152 @@
 import os
 import requests
-import streamlit as st
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from github_client import get_client
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 
-# Ensure environment variable is set for GITHUB_KEY
-GITHUB_KEY = os.getenv('GITHUB_KEY')
-if not GITHUB_KEY:
-    logging.error("GITHUB_KEY environment variable not set.")
-    raise ValueError("GITHUB_KEY environment variable not set.")
+# Directories to ignore
+IGNORE_DIRS = {'public', 'images', 'media', 'assets'}
 
-def get_file_tree(owner: str, repo: str, path: str = "", level: int = 0, max_depth: int = 10) -> str:
+# Number of subtrees fetched concurrently when GitHub truncates a recursive tree
+TREE_FETCH_WORKERS = int(os.getenv('TREE_FETCH_WORKERS', 8))
+
+
+def get_commit_sha(owner: str, repo: str, ref: str = "HEAD") -> str:
     """
-    Fetch and print the tree structure of a GitHub repository, ignoring specific folders.
+    Resolve a branch, tag or HEAD to the commit SHA the tree should be pinned to.
 
     Parameters:
     - owner: The username of the repository owner.
     - repo: The name of the repository.
-    - path: The path to fetch. Leave empty to fetch the root directory.
-    - level: The current depth in the tree structure.
-    - max_depth: The maximum depth to recurse into directories.
+    - ref: The ref to resolve. Defaults to the default branch (HEAD).
+
+    Returns:
+    - str: The commit SHA.
+    """
+    commit = get_client().get_json(f"repos/{owner}/{repo}/commits/{ref}")
+    return commit['sha']
+
+
+def _fetch_tree(owner: str, repo: str, tree_sha: str, prefix: str = "") -> list:
+    """
+    Fetch a tree recursively, splitting into parallel subtree requests when GitHub truncates it.
+
+    Parameters:
+    - owner: The username of the repository owner.
+    - repo: The name of the repository.
+    - tree_sha: The SHA of the tree (or commit) to fetch.
+    - prefix: The path of the tree inside the repository, prepended to every entry.
+
+    Returns:
+    - list: Tree entries with repository-relative paths.
+    """
+    api_url = f"repos/{owner}/{repo}/git/trees/{tree_sha}"
+
+    tree = get_client().get_json(api_url, params={'recursive': 1})
+    if not tree.get('truncated'):
+        return [dict(item, path=prefix + item['path']) for item in tree['tree']]
+
+    # The recursive listing is incomplete: list this level only and fetch each subtree on its own
+    logging.info(f"Tree {prefix or '/'} truncated by GitHub, fetching subtrees in parallel.")
+    tree = get_client().get_json(api_url)
+
+    entries = []
+    subtrees = []
+    for item in tree['tree']:
+        item = dict(item, path=prefix + item['path'])
+        entries.append(item)
+        if item['type'] == 'tree' and os.path.basename(item['path']) not in IGNORE_DIRS:
+            subtrees.append(item)
+
+    with ThreadPoolExecutor(max_workers=TREE_FETCH_WORKERS) as executor:
+        futures = [executor.submit(_fetch_tree, owner, repo, item['sha'], item['path'] + "/") for item in subtrees]
+        for future in futures:
+            entries.extend(future.result())
+
+    return entries
+
+
+def get_tree_entries(owner: str, repo: str, sha: str = None) -> tuple:
+    """
+    Fetch the full tree of a GitHub repository in one request using the Git Trees API.
+
+    Parameters:
+    - owner: The username of the repository owner.
+    - repo: The name of the repository.
+    - sha: The commit SHA to pin the tree to. Resolved from HEAD when omitted.
+
+    Returns:
+    - tuple: The commit SHA and the list of tree entries (path, type, sha, size).
+    """
+    sha = sha or get_commit_sha(owner, repo)
+    entries = _fetch_tree(owner, repo, sha)
+    entries.sort(key=lambda item: item['path'])
+    return sha, entries
+
+
+def render_file_tree(entries: list, path: str = "", level: int = 0, max_depth: int = 10) -> str:
+    """
+    Render tree entries as the indented text tree, ignoring specific folders.
+
+    Parameters:
+    - entries: The tree entries returned by get_tree_entries.
+    - path: Only render the entries below this path. Leave empty to render the root directory.
+    - level: The indentation level of the rendered root.
+    - max_depth: The maximum depth to render.
 
     Returns:
     - str: The tree structure as a string.
     """
-    # Directories to ignore
-    ignore_dirs = {'public', 'images', 'media', 'assets'}
+    prefix = f"{path.strip('/')}/" if path.strip('/') else ""
 
-    if level > max_depth:
-        return ""
+    # Build a nested mapping of names so siblings are listed together
+    root = {}
+    for item in entries:
+        if not item['path'].startswith(prefix):
+            continue
 
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-    headers = {'Authorization': f'token {GITHUB_KEY}'}
+        parts = item['path'][len(prefix):].split('/')
+        if any(part in IGNORE_DIRS for part in parts):
+            continue
+        if len(parts) - 1 + level > max_depth:
+            continue
 
-    output = ""
+        node = root
+        for part in parts:
+            node = node.setdefault(part, {})
 
-    try:
-        # Make the request
-        response = requests.get(api_url, headers=headers, verify=True)
-        response.raise_for_status()
-        items = response.json()
+    lines = []
 
-        if isinstance(items, list):
-            for item in items:
-                # Skip ignored directories
-                if item['name'] in ignore_dirs:
-                    continue
+    def walk(node, depth):
+        for name in sorted(node):
+            lines.append(f"{' ' * (depth * 2)}- {name}\n")
+            walk(node[name], depth + 1)
 
-                item_name = f"{' ' * (level * 2)}- {item['name']}"
-                output += f"{item_name}\n"
+    walk(root, level)
+    return "".join(lines)
 
-                if item['type'] == 'dir':
-                    output += get_file_tree(owner, repo, item['path'], level + 1, max_depth)
 
-        return output
+def get_file_tree(owner: str, repo: str, path: str = "", level: int = 0, max_depth: int = 10, snapshot=None) -> str:
+    """
+    Fetch and print the tree structure of a GitHub repository, ignoring specific folders.
+
+    Parameters:
+    - owner: The username of the repository owner.
+    - repo: The name of the repository.
+    - path: The path to fetch. Leave empty to fetch the root directory.
+    - level: The current depth in the tree structure.
+    - max_depth: The maximum depth to recurse into directories.
+    - snapshot: Render the tree of this opened RepoSnapshot instead of calling the API.
+
+    Returns:
+    - str: The tree structure as a string.
+    """
+    try:
+        entries = snapshot.entries() if snapshot is not None else get_tree_entries(owner, repo)[1]
+        return render_file_tree(entries, path=path, level=level, max_depth=max_depth)
 
     except requests.exceptions.HTTPError as http_err:
         logging.error(f"HTTP error occurred: {http_err}")
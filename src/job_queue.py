@@ -0,0 +1,315 @@
+import os
+import time
+import socket
+import sqlite3
+import logging
+from contextlib import contextmanager
+
+# Configurable queue location, retries and leases
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', os.path.join('.cache', 'jobs.sqlite3'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', 5))  # 5 seconds, doubled on every attempt
+JOB_RETRY_BACKOFF_MAX = float(os.getenv('JOB_RETRY_BACKOFF_MAX', 120))  # 2 minutes
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', 15 * 60))  # 15 minutes
+JOB_MAX_AGE_DAYS = int(os.getenv('JOB_MAX_AGE_DAYS', 7))  # 7 days
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1))  # 1 second
+
+# SQLite limits the number of bound parameters per statement
+SQL_BATCH_SIZE = 500
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def worker_name():
+    """
+    Returns the name of the current process as a queue worker, used to detect claims of dead processes.
+
+    Returns:
+        str: The host name and the process id.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def is_dead_worker(worker):
+    """
+    Tells whether a worker name belongs to a process of this host that no longer exists.
+    """
+    host, _, pid = (worker or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class JobQueue:
+    """
+    Durable review queue on SQLite: one job per repository review, one work item per path.
+
+    Items move from pending to running when a worker claims them, then to done (with the review result) or back to
+    pending with a backoff until they run out of attempts and are marked failed. A job that did not finish is resumed
+    by the next run of the same repository, commit, directory and settings, so completed files are never reviewed twice.
+    """
+
+    def __init__(self, path=JOB_QUEUE_PATH, max_attempts=JOB_MAX_ATTEMPTS, backoff=JOB_RETRY_BACKOFF, lease_seconds=JOB_LEASE_SECONDS):
+        """
+        Opens (and creates if needed) the queue database.
+
+        Parameters:
+            path (str): The SQLite database file.
+            max_attempts (int): Number of attempts of an item before it is marked failed.
+            backoff (float): Delay before the first retry, doubled on every attempt.
+            lease_seconds (float): Time after which a running item is considered abandoned and can be claimed again.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease_seconds = lease_seconds
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        connection = sqlite3.connect(path, timeout=30)
+        try:
+            # The journal mode cannot change inside a transaction
+            connection.execute('PRAGMA journal_mode=WAL')
+        finally:
+            connection.close()
+
+        with self.connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    owner TEXT NOT NULL,
+                    repo TEXT NOT NULL,
+                    commit_sha TEXT,
+                    directory TEXT NOT NULL,
+                    settings TEXT,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    job_id INTEGER NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+                    path TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    claimed_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    PRIMARY KEY (job_id, path)
+                )
+            """)
+            # Queues created before jobs had settings
+            if 'settings' not in [column[1] for column in connection.execute('PRAGMA table_info(jobs)')]:
+                connection.execute('ALTER TABLE jobs ADD COLUMN settings TEXT')
+            connection.execute('CREATE INDEX IF NOT EXISTS jobs_lookup ON jobs (owner, repo, commit_sha, directory, status)')
+            connection.execute('CREATE INDEX IF NOT EXISTS items_status ON items (job_id, status, next_attempt_at)')
+
+    @contextmanager
+    def connect(self):
+        """
+        Opens a new connection for one transaction. BEGIN IMMEDIATE makes every claim atomic across threads and processes.
+        """
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield connection
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        finally:
+            connection.close()
+
+    def open_job(self, owner, repo, commit_sha, directory, paths, settings=None):
+        """
+        Resumes the unfinished job of the same repository, commit, directory and settings, or creates a new one.
+
+        Items claimed by a process that no longer exists, and items that failed in the previous run, are made pending again.
+
+        Parameters:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            commit_sha (str): The commit being reviewed.
+            directory (str): The directory input the paths were resolved from.
+            paths (list): The paths to review, in report order.
+            settings (str): The hash of the review mode, prompts and models: the results of a job made another way
+                (e.g. static-only reports) are not carried into this one.
+
+        Returns:
+            tuple: The job id and the number of paths already reviewed by a previous run.
+        """
+        now = time.time()
+        self.prune()
+
+        with self.connect() as connection:
+            row = connection.execute(
+                'SELECT id FROM jobs WHERE owner = ? AND repo = ? AND commit_sha IS ? AND directory = ? AND settings IS ? AND status != ? '
+                'ORDER BY id DESC LIMIT 1',
+                (owner, repo, commit_sha, directory, settings, DONE)
+            ).fetchone()
+
+            if row:
+                job_id = row[0]
+                connection.execute('UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?', (RUNNING, now, job_id))
+                connection.execute(
+                    'UPDATE items SET status = ?, attempts = 0, next_attempt_at = 0, error = NULL WHERE job_id = ? AND status = ?',
+                    (PENDING, job_id, FAILED)
+                )
+                stale = [
+                    (PENDING, job_id, path)
+                    for path, worker in connection.execute('SELECT path, worker FROM items WHERE job_id = ? AND status = ?', (job_id, RUNNING))
+                    if is_dead_worker(worker)
+                ]
+                connection.executemany('UPDATE items SET status = ?, worker = NULL WHERE job_id = ? AND path = ?', stale)
+
+                # Unfinished items of paths this run no longer resolves to are dropped
+                current = set(paths)
+                connection.executemany('DELETE FROM items WHERE job_id = ? AND path = ?', [
+                    (job_id, path)
+                    for path, in connection.execute('SELECT path FROM items WHERE job_id = ? AND status != ?', (job_id, DONE))
+                    if path not in current
+                ])
+            else:
+                job_id = connection.execute(
+                    'INSERT INTO jobs (owner, repo, commit_sha, directory, settings, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (owner, repo, commit_sha, directory, settings, RUNNING, now, now)
+                ).lastrowid
+
+            connection.executemany(
+                'INSERT INTO items (job_id, path, position, status) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (job_id, path) DO UPDATE SET position = excluded.position',
+                [(job_id, path, position, PENDING) for position, path in enumerate(paths)]
+            )
+
+            done_paths = {path for path, in connection.execute('SELECT path FROM items WHERE job_id = ? AND status = ?', (job_id, DONE))}
+            done_count = len(done_paths.intersection(paths))
+
+        if row:
+            logging.info(f"Resuming review job {job_id} of {owner}/{repo}: {done_count} of {len(paths)} files already reviewed")
+        return job_id, done_count
+
+    def claim(self, job_id, worker=None):
+        """
+        Claims the next pending item of a job whose backoff elapsed, or a running item whose lease expired.
+
+        Parameters:
+            job_id (int): The job id.
+            worker (str): The name of the claiming worker, defaults to worker_name().
+
+        Returns:
+            str: The claimed path, or None if no item can be claimed right now.
+        """
+        now = time.time()
+        with self.connect() as connection:
+            row = connection.execute(
+                'SELECT path FROM items WHERE job_id = ? AND ((status = ? AND next_attempt_at <= ?) OR (status = ? AND claimed_at < ?)) '
+                'ORDER BY position LIMIT 1',
+                (job_id, PENDING, now, RUNNING, now - self.lease_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+
+            connection.execute(
+                'UPDATE items SET status = ?, worker = ?, claimed_at = ?, attempts = attempts + 1 WHERE job_id = ? AND path = ?',
+                (RUNNING, worker or worker_name(), now, job_id, row[0])
+            )
+        return row[0]
+
+    def complete(self, job_id, path, result):
+        """
+        Marks an item done and stores its review result.
+        """
+        with self.connect() as connection:
+            connection.execute(
+                'UPDATE items SET status = ?, result = ?, error = NULL, worker = NULL WHERE job_id = ? AND path = ?',
+                (DONE, result, job_id, path)
+            )
+
+    def fail(self, job_id, path, error):
+        """
+        Schedules a retry of an item with an exponential backoff, or marks it failed once it ran out of attempts.
+
+        Returns:
+            bool: True if the item will be retried.
+        """
+        now = time.time()
+        with self.connect() as connection:
+            row = connection.execute('SELECT attempts FROM items WHERE job_id = ? AND path = ?', (job_id, path)).fetchone()
+            attempts = row[0] if row else self.max_attempts
+            retry = attempts < self.max_attempts
+
+            delay = min(self.backoff * 2 ** max(attempts - 1, 0), JOB_RETRY_BACKOFF_MAX)
+            connection.execute(
+                'UPDATE items SET status = ?, next_attempt_at = ?, error = ?, worker = NULL WHERE job_id = ? AND path = ?',
+                (PENDING if retry else FAILED, now + delay, str(error), job_id, path)
+            )
+
+        if retry:
+            logging.warning(f"Review of {path} failed (attempt {attempts} of {self.max_attempts}), retrying in {delay:.0f}s: {error}")
+        else:
+            logging.error(f"Review of {path} failed after {attempts} attempts: {error}")
+        return retry
+
+    def finished(self, job_id, paths):
+        """
+        Returns the final state of the given items that are done or failed.
+
+        Parameters:
+            job_id (int): The job id.
+            paths (list): The paths to look up.
+
+        Returns:
+            dict: The review result of every finished path, None for failed ones.
+        """
+        paths = list(paths)
+        rows = []
+        with self.connect() as connection:
+            for start in range(0, len(paths), SQL_BATCH_SIZE):
+                batch = paths[start:start + SQL_BATCH_SIZE]
+                rows.extend(connection.execute(
+                    f"SELECT path, status, result FROM items WHERE job_id = ? AND status IN (?, ?) AND path IN ({','.join('?' * len(batch))})",
+                    (job_id, DONE, FAILED, *batch)
+                ))
+        return {path: result if status == DONE else None for path, status, result in rows}
+
+    def remaining(self, job_id):
+        """
+        Returns the number of items of a job that are still pending or running.
+        """
+        with self.connect() as connection:
+            return connection.execute(
+                'SELECT COUNT(*) FROM items WHERE job_id = ? AND status IN (?, ?)', (job_id, PENDING, RUNNING)
+            ).fetchone()[0]
+
+    def close_job(self, job_id):
+        """
+        Marks a job done if every item is done, or failed so that the next run retries its failed items.
+        """
+        with self.connect() as connection:
+            failed = connection.execute('SELECT COUNT(*) FROM items WHERE job_id = ? AND status != ?', (job_id, DONE)).fetchone()[0]
+            connection.execute('UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?', (FAILED if failed else DONE, time.time(), job_id))
+
+    def prune(self, max_age_days=JOB_MAX_AGE_DAYS):
+        """
+        Drops jobs, and their items, not updated for max_age_days.
+        """
+        try:
+            with self.connect() as connection:
+                stale = connection.execute('SELECT id FROM jobs WHERE updated_at < ?', (time.time() - max_age_days * 24 * 60 * 60,)).fetchall()
+                connection.executemany('DELETE FROM items WHERE job_id = ?', stale)
+                connection.executemany('DELETE FROM jobs WHERE id = ?', stale)
+        except sqlite3.Error as e:
+            logging.error(f"Error pruning job queue: {e}")
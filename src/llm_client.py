@@ -0,0 +1,51 @@
+import os
+import threading
+import httpx
+from langchain_openai import ChatOpenAI
+
+# Configurable LLM connection pool
+LLM_POOL_SIZE = int(os.getenv('LLM_POOL_SIZE', 20))
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 600))  # 10 minutes
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Returns the process-wide HTTP client of the LLM API, so every agent reuses one connection pool (and TLS setup).
+
+    Returns:
+        httpx.Client: The shared client.
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=LLM_POOL_SIZE, max_keepalive_connections=LLM_POOL_SIZE),
+                timeout=LLM_TIMEOUT,
+            )
+        return _http_client
+
+
+def create_llm(model=None, **options):
+    """
+    Creates a chat model on top of the shared HTTP client.
+
+    Every agent needs its own instance: crewai adds a token counting callback to the model of each agent.
+
+    Parameters:
+        model (str): The model name, defaults to OPENAI_MODEL_NAME.
+        options: Extra ChatOpenAI options, e.g. streaming and callbacks.
+
+    Returns:
+        ChatOpenAI: The chat model.
+    """
+    return ChatOpenAI(
+        model=model or os.getenv("OPENAI_MODEL_NAME", "gpt-4o"),
+        http_client=get_http_client(),
+        # Retried by the LLM controller, which needs to see the 429s to adapt the concurrency
+        max_retries=0,
+        **options,
+    )
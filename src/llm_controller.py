@@ -0,0 +1,314 @@
+import os
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+import httpx
+import openai
+from tracing import record_llm_call
+
+# Configurable LLM concurrency: AIMD between the bounds, starting at LLM_INITIAL_CONCURRENCY
+LLM_INITIAL_CONCURRENCY = int(os.getenv('LLM_INITIAL_CONCURRENCY', 4))
+LLM_MIN_CONCURRENCY = int(os.getenv('LLM_MIN_CONCURRENCY', 1))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 32))
+LLM_LATENCY_TOLERANCE = float(os.getenv('LLM_LATENCY_TOLERANCE', 2.0))  # Slower than this times the baseline is congestion
+
+# Configurable LLM retries
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 4))
+LLM_BACKOFF = float(os.getenv('LLM_BACKOFF', 2))  # 2 seconds, doubled on every attempt
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', 60))  # 1 minute
+
+# Configurable circuit breaker
+LLM_BREAKER_THRESHOLD = int(os.getenv('LLM_BREAKER_THRESHOLD', 5))  # Consecutive failed calls that open the breaker
+LLM_BREAKER_COOLDOWN = float(os.getenv('LLM_BREAKER_COOLDOWN', 30))  # 30 seconds, doubled on every trip
+LLM_BREAKER_COOLDOWN_MAX = float(os.getenv('LLM_BREAKER_COOLDOWN_MAX', 300))  # 5 minutes
+LLM_BREAKER_MAX_TRIPS = int(os.getenv('LLM_BREAKER_MAX_TRIPS', 3))  # Trips in a row before calls fail fast while open
+
+MULTIPLICATIVE_DECREASE = 0.5  # On a 429, a timeout or a 5xx
+LATENCY_DECREASE = 0.8  # On a call slower than the tolerance
+BASELINE_DRIFT = 0.01  # The baseline latency creeps up 1% per call, so it follows a provider that got slower for good
+
+THROTTLED = 'throttled'  # 429: slow down
+FAILED = 'failed'  # Timeouts, connection errors and 5xx: the provider is struggling
+ERROR = 'error'  # Anything else is a problem of the request, retrying it does not help
+RETRY_STATUSES = (408, 409, 500, 502, 503, 504)
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling the LLM while the circuit breaker is open and has tripped LLM_BREAKER_MAX_TRIPS times in a row.
+    """
+
+
+def error_chain(error):
+    """
+    Yields an exception and the exceptions it was raised from, the provider error is often wrapped.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def retry_after(response):
+    """
+    Returns the delay a throttled response asks for (retry-after-ms, or Retry-After in seconds or as an HTTP date), or None.
+    """
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if not value:
+            return None
+        if value.strip().isdigit():
+            return float(value)
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(error):
+    """
+    Tells whether a failed LLM call is worth retrying.
+
+    Parameters:
+        error (Exception): The exception raised by the call.
+
+    Returns:
+        tuple: THROTTLED, FAILED or ERROR, and the delay the provider asked for (None if it did not).
+    """
+    for cause in error_chain(error):
+        response = getattr(cause, 'response', None)
+        status = getattr(cause, 'status_code', None) or getattr(response, 'status_code', None)
+        if status == 429:
+            return THROTTLED, retry_after(response)
+        if status in RETRY_STATUSES or (isinstance(status, int) and status >= 500):
+            return FAILED, retry_after(response)
+        if isinstance(cause, (openai.APIConnectionError, httpx.TransportError, TimeoutError, ConnectionError)):
+            return FAILED, None
+    return ERROR, None
+
+
+class LLMController:
+    """
+    Backpressure around the LLM calls of the process: an adaptive concurrency limit, retries and a circuit breaker.
+
+    The limit grows by one call per round trip while calls succeed at their usual speed (additive increase) and is
+    cut on a 429, a timeout or a 5xx, or when calls get much slower than the fastest seen (multiplicative decrease).
+    A 429 with Retry-After holds every new call until then. After LLM_BREAKER_THRESHOLD failed calls in a row the
+    breaker opens and the run pauses for a cooldown, then a single probe call decides whether it closes again.
+    """
+
+    def __init__(
+        self, initial=LLM_INITIAL_CONCURRENCY, minimum=LLM_MIN_CONCURRENCY, maximum=LLM_MAX_CONCURRENCY,
+        max_retries=LLM_MAX_RETRIES, backoff=LLM_BACKOFF, backoff_max=LLM_BACKOFF_MAX,
+        breaker_threshold=LLM_BREAKER_THRESHOLD, breaker_cooldown=LLM_BREAKER_COOLDOWN,
+        breaker_cooldown_max=LLM_BREAKER_COOLDOWN_MAX, breaker_max_trips=LLM_BREAKER_MAX_TRIPS,
+    ):
+        """
+        Parameters:
+            initial (int): The starting concurrency limit.
+            minimum (int): The lowest concurrency limit.
+            maximum (int): The highest concurrency limit.
+            max_retries (int): Retries of a call that failed with a 429, a timeout or a 5xx.
+            backoff (float): The first retry delay in seconds, doubled on every attempt and fully jittered.
+            backoff_max (float): The longest retry delay in seconds, unless the provider asks for more.
+            breaker_threshold (int): Consecutive failed calls that open the breaker.
+            breaker_cooldown (float): The first pause in seconds, doubled on every trip in a row.
+            breaker_cooldown_max (float): The longest pause in seconds.
+            breaker_max_trips (int): Trips in a row after which calls fail fast while the breaker is open.
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.breaker_cooldown_max = breaker_cooldown_max
+        self.breaker_max_trips = breaker_max_trips
+
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.last_decrease = 0.0  # Calls started before the last decrease do not decrease the limit again
+        self.baseline = None  # Fastest recent latency, in seconds per 1K tokens
+        self.resume_at = 0.0  # Retry-After of the last 429
+        self.failures = 0
+        self.trips = 0
+        self.open_until = None  # Set while the breaker is open or half-open
+        self.probing = False
+
+    def acquire(self):
+        """
+        Blocks until a call fits in the concurrency limit, the Retry-After of the last 429 passed and the breaker lets it through.
+
+        Returns:
+            tuple: When the call started (monotonic) and whether it is the probe of a half-open breaker.
+
+        Raises:
+            CircuitOpenError: When the breaker is open after LLM_BREAKER_MAX_TRIPS trips in a row.
+        """
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.open_until is not None and now < self.open_until:
+                    if self.trips >= self.breaker_max_trips:
+                        raise CircuitOpenError(f"The LLM provider keeps failing, calls are paused for {self.open_until - now:.0f}s more.")
+                    self.condition.wait(self.open_until - now)
+                elif now < self.resume_at:
+                    self.condition.wait(self.resume_at - now)
+                elif self.open_until is not None:
+                    # Half-open: a single probe, once the calls started before the trip are over
+                    if self.probing or self.in_flight:
+                        self.condition.wait()
+                        continue
+                    self.probing = True
+                    self.in_flight += 1
+                    return now, True
+                elif self.in_flight >= int(self.limit):
+                    self.condition.wait()
+                else:
+                    self.in_flight += 1
+                    return now, False
+
+    def release(self, started, probe, outcome, delay=None, tokens=None):
+        """
+        Frees the slot of a call and adapts the limit and the breaker to its outcome.
+
+        Parameters:
+            started (float): When the call started, as returned by acquire.
+            probe (bool): Whether the call was the probe of a half-open breaker.
+            outcome (str): None on success, else THROTTLED, FAILED or ERROR.
+            delay (float): The Retry-After of a 429.
+            tokens (int): The tokens of a successful call, to compare latencies of calls of different sizes.
+        """
+        now = time.monotonic()
+        with self.condition:
+            self.in_flight -= 1
+            if probe:
+                self.probing = False
+
+            if outcome is None:
+                self.failures = 0
+                if probe:
+                    logging.info("LLM calls resumed, the circuit breaker is closed.")
+                    self.open_until = None
+                    self.trips = 0
+                self.adapt(started, now - started, tokens)
+            elif outcome in (THROTTLED, FAILED):
+                self.decrease(started, MULTIPLICATIVE_DECREASE)
+                if outcome == THROTTLED and delay:
+                    self.resume_at = max(self.resume_at, now + delay)
+                self.failures += 1
+                if probe or self.failures >= self.breaker_threshold:
+                    self.trip(now)
+
+            self.condition.notify_all()
+
+    def adapt(self, started, latency, tokens):
+        """
+        Additive increase after a call at the usual speed, latency decrease after a call much slower than the baseline.
+        """
+        if tokens:
+            per_1k_tokens = latency / tokens * 1000
+            self.baseline = per_1k_tokens if self.baseline is None else min(per_1k_tokens, self.baseline * (1 + BASELINE_DRIFT))
+            if per_1k_tokens > self.baseline * LLM_LATENCY_TOLERANCE:
+                self.decrease(started, LATENCY_DECREASE)
+                return
+        self.limit = min(self.limit + 1 / self.limit, self.maximum)
+
+    def decrease(self, started, factor):
+        """
+        Cuts the limit, once per round trip: the other calls in flight saw the same congestion.
+        """
+        if started < self.last_decrease:
+            return
+        self.limit = max(self.limit * factor, self.minimum)
+        self.last_decrease = time.monotonic()
+        logging.info(f"LLM concurrency limit lowered to {int(self.limit)}")
+
+    def trip(self, now):
+        """
+        Opens the breaker: no new call until the cooldown is over.
+        """
+        self.trips += 1
+        cooldown = min(self.breaker_cooldown * 2 ** (self.trips - 1), self.breaker_cooldown_max)
+        self.open_until = now + cooldown
+        self.failures = 0
+        logging.warning(f"LLM circuit breaker open (trip {self.trips}), pausing LLM calls for {cooldown:.0f}s.")
+
+    def retry_delay(self, attempt, delay):
+        """
+        Returns the full-jitter exponential backoff of an attempt, or the delay the provider asked for when it is longer.
+        """
+        backoff = random.uniform(0, min(self.backoff * 2 ** attempt, self.backoff_max))
+        return max(backoff, delay or 0)
+
+    def call(self, function, tokens=None):
+        """
+        Runs an LLM call within the concurrency limit, retrying 429s, timeouts and 5xx with a jittered backoff.
+
+        Parameters:
+            function (callable): The call, e.g. crew.kickoff.
+            tokens (callable): Returns the tokens the call used once it succeeded, e.g. from crew.usage_metrics.
+
+        Returns:
+            The result of the call.
+
+        Raises:
+            CircuitOpenError: When the breaker is open after LLM_BREAKER_MAX_TRIPS trips in a row.
+            Exception: The error of the last attempt, or the first error that is not worth retrying.
+        """
+        for attempt in range(self.max_retries + 1):
+            started, probe = self.acquire()
+            try:
+                result = function()
+            except Exception as e:
+                outcome, delay = classify(e)
+                self.release(started, probe, outcome, delay=delay)
+                record_llm_call(throttled=outcome == THROTTLED, retried=outcome != ERROR and attempt < self.max_retries)
+                if outcome == ERROR or attempt == self.max_retries:
+                    raise
+
+                delay = self.retry_delay(attempt, delay)
+                logging.warning(f"LLM call failed ({outcome}, attempt {attempt + 1} of {self.max_retries + 1}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                continue
+
+            self.release(started, probe, None, tokens=tokens() if tokens else None)
+            record_llm_call()
+            return result
+
+    def stats(self):
+        """
+        Returns the state of the controller, e.g. for logs.
+        """
+        with self.condition:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'breaker': 'closed' if self.open_until is None else 'open',
+                'trips': self.trips,
+            }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    """
+    Returns the process-wide LLM controller, so every crew shares one concurrency limit and circuit breaker.
+
+    Returns:
+        LLMController: The shared controller.
+    """
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = LLMController()
+        return _controller
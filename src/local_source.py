@@ -0,0 +1,248 @@
+import os
+import mmap
+import hashlib
+import logging
+import threading
+import subprocess
+
+# Folders never listed by the directory walk, used when the folder is not a git working tree
+LOCAL_IGNORE_DIRS = {'.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', 'venv', '.cache'}
+
+# File modes of git entries that are not regular files: symlinks and submodules
+GIT_SKIPPED_MODES = {'120000', '160000'}
+
+
+def git_blob_sha(data):
+    """
+    Returns the git blob SHA of the given bytes, the same SHA the Git Trees API reports.
+    """
+    blob_sha = hashlib.sha1(b'blob %d\0' % len(data))
+    blob_sha.update(data)
+    return blob_sha.hexdigest()
+
+
+class LocalSource:
+    """
+    A local checkout served like a RepoSnapshot: the tree comes from git ls-files (or a directory walk outside git)
+    and every file is read through a memory map. Nothing is fetched from GitHub.
+
+    With a ref, the tree and the files of that commit are served from the git object store instead of the working tree.
+    """
+
+    def __init__(self, root, ref=None):
+        """
+        Initializes the source of the given folder. Nothing is listed until open() is called.
+
+        Parameters:
+            root (str): The folder of the working tree.
+            ref (str): Serve this commit (branch, tag or SHA) instead of the working tree.
+        """
+        self.root = os.path.abspath(root)
+        self.ref = ref
+        self.owner = 'local'
+        self.repo = os.path.basename(self.root.rstrip(os.sep)) or 'root'
+        self.sha = None
+
+        self.members = {}  # path -> (size, blob SHA)
+        self.dirs = set()
+        self.opened = False
+        self.lock = threading.Lock()
+
+    def git(self, *args):
+        """
+        Runs a git command in the working tree.
+
+        Returns:
+            bytes: The standard output.
+
+        Raises:
+            OSError: When git is not installed.
+            subprocess.CalledProcessError: When the command fails, e.g. outside a git working tree.
+        """
+        return subprocess.run(['git', '-C', self.root, *args], capture_output=True, check=True).stdout
+
+    def list_git(self):
+        """
+        Lists the tracked files (with the blob SHAs of the index) and the untracked files that are not ignored.
+
+        Returns:
+            bool: False when the folder is not a git working tree.
+        """
+        try:
+            staged = self.git('ls-files', '--stage', '-z').split(b'\0')
+            modified = set(self.git('ls-files', '--modified', '-z').split(b'\0'))
+            deleted = set(self.git('ls-files', '--deleted', '-z').split(b'\0'))
+            others = self.git('ls-files', '--others', '--exclude-standard', '-z').split(b'\0')
+        except (OSError, subprocess.CalledProcessError):
+            return False
+
+        files = {}
+        for line in staged:
+            if not line:
+                continue
+            info, _, path = line.partition(b'\t')
+            mode, blob_sha, _ = info.decode('ascii').split(' ')
+            if mode in GIT_SKIPPED_MODES or path in deleted:
+                continue
+            # Files edited in the working tree no longer match the SHA of the index
+            files[path.decode('utf-8')] = None if path in modified else blob_sha
+
+        for path in others:
+            if path:
+                files[path.decode('utf-8')] = None
+
+        try:
+            clean = not modified - {b''} and not deleted - {b''} and not any(others)
+            head = self.git('rev-parse', 'HEAD').decode('ascii').strip()
+            self.sha = head if clean else None
+        except subprocess.CalledProcessError:
+            # No commit yet
+            self.sha = None
+
+        self.add_files(files)
+        return True
+
+    def list_ref(self):
+        """
+        Lists the files of the commit with git ls-tree.
+
+        Raises:
+            ValueError: When the ref is not a commit of the repository.
+        """
+        try:
+            self.sha = self.git('rev-parse', '--verify', f"{self.ref}^{{commit}}").decode('ascii').strip()
+            tree = self.git('ls-tree', '-r', '-z', '--long', self.sha).split(b'\0')
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise ValueError(f"Unknown git ref {self.ref} in {self.root}") from e
+
+        for line in tree:
+            if not line:
+                continue
+            info, _, path = line.partition(b'\t')
+            mode, kind, blob_sha, size = info.decode('ascii').split()
+            if kind != 'blob' or mode in GIT_SKIPPED_MODES:
+                continue
+            self.add_member(path.decode('utf-8'), int(size), blob_sha)
+
+    def walk(self):
+        """
+        Lists every regular file below the folder, for folders outside git.
+        """
+        self.sha = None
+        files = {}
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(name for name in dirnames if name not in LOCAL_IGNORE_DIRS)
+            for filename in filenames:
+                full_path = os.path.join(directory, filename)
+                if os.path.isfile(full_path) and not os.path.islink(full_path):
+                    files[os.path.relpath(full_path, self.root).replace(os.sep, '/')] = None
+        self.add_files(files)
+
+    def add_files(self, files):
+        """
+        Records the size and blob SHA of every file, hashing the ones without a known SHA, and their parent folders.
+
+        Parameters:
+            files (dict): The blob SHA of every repository-relative path, None when it has to be computed.
+        """
+        for path, blob_sha in files.items():
+            try:
+                size = os.path.getsize(os.path.join(self.root, path))
+            except OSError:
+                continue
+            self.add_member(path, size, blob_sha)
+
+        for path, (size, blob_sha) in self.members.items():
+            if blob_sha is None:
+                self.members[path] = (size, git_blob_sha(self.read_bytes(path)))
+
+    def add_member(self, path, size, blob_sha):
+        """
+        Records a file and its parent folders.
+        """
+        self.members[path] = (size, blob_sha)
+
+        parent = path.rpartition('/')[0]
+        while parent and parent not in self.dirs:
+            self.dirs.add(parent)
+            parent = parent.rpartition('/')[0]
+
+    def open(self):
+        """
+        Lists the files of the working tree.
+
+        Returns:
+            LocalSource: The opened source.
+
+        Raises:
+            FileNotFoundError: When the folder does not exist.
+            ValueError: When the ref is not a commit of the repository.
+        """
+        with self.lock:
+            if self.opened:
+                return self
+
+            if not os.path.isdir(self.root):
+                raise FileNotFoundError(f"Local folder not found: {self.root}")
+
+            if self.ref:
+                self.list_ref()
+            # Folders ignored by an enclosing git repository list no file, they are walked as well
+            elif not self.list_git() or not self.members:
+                self.walk()
+
+            # A dirty working tree (or a plain folder) is pinned to the hash of its contents instead of a commit
+            if self.sha is None:
+                self.sha = hashlib.sha1(
+                    ''.join(f"{path}\0{blob_sha}\0" for path, (_, blob_sha) in sorted(self.members.items())).encode('utf-8')
+                ).hexdigest()
+
+            logging.info(f"Listed {len(self.members)} files in {self.root}")
+            self.opened = True
+
+        return self
+
+    def read_bytes(self, path):
+        """
+        Returns the content of a file, memory-mapped (read from the object store with a ref).
+
+        Parameters:
+            path (str): The repository-relative file path.
+
+        Returns:
+            memoryview: The file content.
+
+        Raises:
+            KeyError: When the file is not part of the source.
+        """
+        if path not in self.members:
+            raise KeyError(path)
+
+        if self.ref:
+            return memoryview(self.git('cat-file', 'blob', self.members[path][1]))
+
+        with open(os.path.join(self.root, path), 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return memoryview(b'')
+            # The map outlives the file descriptor, it is released with the last view on it
+            return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def entries(self):
+        """
+        Returns the tree entries of the working tree, shaped like github_helper.get_tree_entries.
+
+        Returns:
+            list: Tree entries (path, type, sha, size).
+        """
+        entries = [{'path': path, 'type': 'tree', 'sha': None, 'size': 0} for path in self.dirs]
+        entries.extend(
+            {'path': path, 'type': 'blob', 'sha': blob_sha, 'size': size}
+            for path, (size, blob_sha) in self.members.items()
+        )
+        entries.sort(key=lambda item: item['path'])
+        return entries
+
+    def close(self):
+        """
+        Nothing to release: every read maps its own file, unmapped with the last view on it.
+        """
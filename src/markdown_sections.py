@@ -0,0 +1,125 @@
+import re
+
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+SECTION_PATTERN = re.compile(r'^##\s+(.+?)\s*#*\s*$')
+CODE_BLOCK_PATTERN = re.compile(r'```[^\n]*\n(.*?)\n?```', re.DOTALL)
+
+
+def split_sections(markdown):
+    """
+    Splits a review in markdown format into its H2 sections, ignoring headings inside code blocks.
+
+    Parameters:
+        markdown (str): The review result in markdown format.
+
+    Returns:
+        dict: The body of every section by heading, in the order they appear.
+    """
+    sections = {}
+    heading = None
+    body = []
+    in_fence = False
+
+    for line in markdown.split('\n'):
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+
+        match = None if in_fence else SECTION_PATTERN.match(line)
+        if match:
+            if heading is not None:
+                sections[heading] = '\n'.join(body).strip()
+            heading = match.group(1).strip().rstrip(':')
+            body = []
+        elif heading is not None:
+            body.append(line)
+
+    if heading is not None:
+        sections[heading] = '\n'.join(body).strip()
+
+    return sections
+
+
+def extract_code(body):
+    """
+    Returns the content of the first code block of a section, or the whole section if it has none.
+
+    Parameters:
+        body (str): The body of a section.
+
+    Returns:
+        str: The code.
+    """
+    match = CODE_BLOCK_PATTERN.search(body)
+    return match.group(1) if match else body
+
+
+def split_by_path_headings(markdown, paths):
+    """
+    Splits a markdown document into per-file sections on "# <path>" headings.
+
+    Only headings of the given paths, outside code blocks, start a section, since reviews contain "# " lines of their own.
+
+    Parameters:
+        markdown (str): The markdown document, e.g. a report or a batch review.
+        paths (list): The paths whose headings delimit the sections.
+
+    Returns:
+        dict: The section of every path found in the document.
+    """
+    paths = set(paths)
+    sections = {}
+    path = None
+    body = []
+    in_fence = False
+
+    for line in markdown.split('\n'):
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+
+        heading = line.strip()[2:].strip() if not in_fence and line.strip().startswith('# ') else None
+        if heading in paths:
+            if path is not None:
+                sections[path] = '\n'.join(body).strip()
+            path = heading
+            body = []
+        elif path is not None:
+            body.append(line)
+
+    if path is not None:
+        sections[path] = '\n'.join(body).strip()
+
+    return sections
+
+
+def replace_section(markdown, heading, body):
+    """
+    Replaces the body of an H2 section, ignoring headings inside code blocks. The section is appended when missing.
+
+    Parameters:
+        markdown (str): The review result in markdown format.
+        heading (str): The heading of the section, e.g. "Updated Code".
+        body (str): The new body of the section.
+
+    Returns:
+        str: The review with the section replaced.
+    """
+    lines = markdown.split('\n')
+    start = end = None
+    in_fence = False
+
+    for index, line in enumerate(lines):
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            continue
+
+        match = None if in_fence else SECTION_PATTERN.match(line)
+        if match and start is not None:
+            end = index
+            break
+        if match and match.group(1).strip().rstrip(':') == heading:
+            start = index
+
+    if start is None:
+        return f"{markdown.rstrip()}\n\n## {heading}\n{body}"
+
+    return '\n'.join(lines[:start + 1] + [body, ''] + (lines[end:] if end is not None else []))
@@ -0,0 +1,124 @@
+import os
+from triage import PathMatcher
+
+# Configurable model routing: low-risk files go to the fast model, complex or sensitive ones to the strong model
+FAST_MODEL_NAME = os.getenv('FAST_MODEL_NAME', 'gpt-4o-mini')
+STRONG_MODEL_NAME = os.getenv('STRONG_MODEL_NAME', os.getenv('OPENAI_MODEL_NAME', 'gpt-4o'))
+ROUTER_STRONG_THRESHOLD = float(os.getenv('ROUTER_STRONG_THRESHOLD', 30))  # Files scoring at least this go to the strong model
+# Extra gitignore-style patterns (comma-separated) always sent to the strong or to the fast model
+ROUTER_STRONG_PATHS = [pattern.strip() for pattern in os.getenv('ROUTER_STRONG_PATHS', '').split(',') if pattern.strip()]
+ROUTER_FAST_PATHS = [pattern.strip() for pattern in os.getenv('ROUTER_FAST_PATHS', '').split(',') if pattern.strip()]
+
+# Score of a file: one point per LINES_PER_POINT lines, COMPLEXITY_POINTS per unit of cyclomatic complexity of its
+# most complex function above COMPLEXITY_BASELINE, FINDING_POINTS per static analysis finding, plus a language weight
+LINES_PER_POINT = 10
+MAX_SIZE_POINTS = 40
+COMPLEXITY_BASELINE = 5
+COMPLEXITY_POINTS = 3
+MAX_COMPLEXITY_POINTS = 30
+FINDING_POINTS = 2
+MAX_FINDING_POINTS = 20
+BYTES_PER_LINE = 40  # Line count estimate of the files without a static analysis
+
+# Languages where mistakes are easy to miss (manual memory, quoting, injection) weigh more
+LANGUAGE_WEIGHTS = {
+    '.c': 10, '.h': 10, '.cc': 10, '.cpp': 10, '.hpp': 10, '.sql': 10, '.sh': 10, '.bash': 10,
+    '.rs': 5, '.go': 5, '.java': 5, '.kt': 5, '.swift': 5, '.php': 5,
+}
+
+# Security-sensitive paths always get the strong model, documentation and configuration always the fast one
+DEFAULT_STRONG_PATHS = [
+    '*auth*', '*security*', '*crypto*', '*password*', '*secret*', '*token*', '*permission*', '*payment*', '*billing*',
+    'migrations/',
+]
+DEFAULT_FAST_PATHS = [
+    '*.md', '*.rst', '*.txt', '*.json', '*.yaml', '*.yml', '*.toml', '*.ini', '*.cfg', '*.csv', '*.xml', '*.svg',
+    '.gitignore', '.gitattributes', '.reviewignore', 'LICENSE*',
+]
+
+
+def route(model, tier, score, reason):
+    return {'model': model, 'tier': tier, 'score': score, 'reason': reason}
+
+
+class ModelRouter:
+    """
+    Scores every file before its review and picks the model reviewing it.
+    """
+
+    def __init__(
+        self, fast_model=FAST_MODEL_NAME, strong_model=STRONG_MODEL_NAME, threshold=ROUTER_STRONG_THRESHOLD,
+        strong_paths=ROUTER_STRONG_PATHS, fast_paths=ROUTER_FAST_PATHS,
+    ):
+        """
+        Parameters:
+            fast_model (str): The cheaper, faster model of low-risk files.
+            strong_model (str): The model of complex or sensitive files.
+            threshold (float): Files scoring at least this go to the strong model.
+            strong_paths (list): Extra gitignore-style patterns of files always sent to the strong model.
+            fast_paths (list): Extra gitignore-style patterns of files always sent to the fast model.
+        """
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.threshold = threshold
+        self.strong_paths = PathMatcher([*DEFAULT_STRONG_PATHS, *strong_paths], ignore_case=True)
+        self.fast_paths = PathMatcher([*DEFAULT_FAST_PATHS, *fast_paths], ignore_case=True)
+
+    def score(self, path, size=None, analysis=None):
+        """
+        Scores how much a file needs the strong model, from its size, complexity, static findings and language.
+
+        Parameters:
+            path (str): The repository-relative file path.
+            size (int): The size of the file in bytes, used when there is no static analysis.
+            analysis (dict): The static analysis of the file, as returned by static_analysis.analyze_file.
+
+        Returns:
+            tuple: The score and its breakdown, e.g. "lines 12 + complexity 9".
+        """
+        if analysis is not None:
+            lines = analysis['metrics'].get('lines', 0)
+            max_complexity = analysis['metrics'].get('max_complexity', 0)
+            finding_count = analysis['finding_count']
+        else:
+            lines = (size or 0) // BYTES_PER_LINE
+            max_complexity = 0
+            finding_count = 0
+
+        points = {
+            'lines': min(lines / LINES_PER_POINT, MAX_SIZE_POINTS),
+            'complexity': min(max(max_complexity - COMPLEXITY_BASELINE, 0) * COMPLEXITY_POINTS, MAX_COMPLEXITY_POINTS),
+            'findings': min(finding_count * FINDING_POINTS, MAX_FINDING_POINTS),
+            'language': LANGUAGE_WEIGHTS.get(os.path.splitext(path)[1].lower(), 0),
+        }
+        breakdown = ' + '.join(f"{name} {value:g}" for name, value in points.items() if value)
+        return round(sum(points.values()), 1), breakdown or "no risk signal"
+
+    def route(self, path, size=None, analysis=None):
+        """
+        Picks the model of a file.
+
+        Parameters:
+            path (str): The repository-relative file path.
+            size (int): The size of the file in bytes.
+            analysis (dict): The static analysis of the file, if any.
+
+        Returns:
+            dict: The model, the tier (fast or strong), the score and the reason of the decision.
+        """
+        if self.strong_paths.match(path):
+            return route(self.strong_model, 'strong', None, "sensitive path")
+        if self.fast_paths.match(path):
+            return route(self.fast_model, 'fast', None, "low-risk file type")
+
+        score, breakdown = self.score(path, size=size, analysis=analysis)
+        if score >= self.threshold:
+            return route(self.strong_model, 'strong', score, f"score {score:g} >= {self.threshold:g} ({breakdown})")
+        return route(self.fast_model, 'fast', score, f"score {score:g} < {self.threshold:g} ({breakdown})")
+
+
+def route_section(decision):
+    """
+    Renders the routing decision of a file as the "Review Model" section of its review.
+    """
+    return f"{decision['model']} ({decision['tier']} tier: {decision['reason']})"
@@ -0,0 +1,195 @@
+import os
+import re
+import ast
+import json
+
+# Configurable patching of the "Updated Code" diffs
+PATCH_MAX_RETRIES = int(os.getenv('PATCH_MAX_RETRIES', 1))  # Extra LLM calls to correct a diff that does not apply
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+class PatchError(ValueError):
+    """
+    Raised when a unified diff does not apply to the file it was made for, or breaks it.
+    """
+
+
+class Hunk:
+    """
+    One hunk of a unified diff: the lines it expects in the file and the lines replacing them.
+    """
+
+    def __init__(self, header, old_start, old_count=None):
+        self.header = header
+        self.old_start = old_start
+        self.old_count = old_count
+        self.old_lines = []
+        self.new_lines = []
+
+    def add(self, line):
+        """
+        Adds a diff line to the hunk. Blank lines count as blank context lines, models often drop their leading space.
+        """
+        marker, text = (line[0], line[1:]) if line else (' ', '')
+        if marker in (' ', '-'):
+            self.old_lines.append(text)
+        if marker in (' ', '+'):
+            self.new_lines.append(text)
+
+
+def is_diff(text):
+    """
+    Tells whether a code block holds a unified diff rather than the updated file itself.
+    """
+    return any(HUNK_HEADER.match(line) for line in text.split('\n'))
+
+
+def parse_diff(text):
+    """
+    Parses a unified diff into its hunks. The line counts of the hunk headers are ignored, models often get them wrong.
+
+    Parameters:
+        text (str): The unified diff of a single file.
+
+    Returns:
+        list: The hunks, in order.
+
+    Raises:
+        PatchError: When the diff has no hunk or a hunk line has no valid marker.
+    """
+    hunks = []
+    for line in text.split('\n'):
+        match = HUNK_HEADER.match(line)
+        if match:
+            hunks.append(Hunk(line, int(match.group(1)), int(match.group(2)) if match.group(2) is not None else None))
+        elif not hunks or line.startswith('\\'):
+            # Text and file headers before the first hunk, and "\ No newline at end of file". Within a hunk, "--- x"
+            # is a removed "-- x" line (an SQL or Lua comment), not a file header
+            continue
+        elif line and line[0] not in ' -+':
+            raise PatchError(f"Line {line!r} of {hunks[-1].header} is not a context, removed or added line")
+        else:
+            hunks[-1].add(line)
+
+    if not hunks:
+        raise PatchError("The diff has no hunk")
+
+    for hunk in hunks:
+        # Trailing blank lines are usually the end of the code block, not context
+        while hunk.old_lines and hunk.new_lines and not hunk.old_lines[-1] and not hunk.new_lines[-1]:
+            hunk.old_lines.pop()
+            hunk.new_lines.pop()
+
+    return hunks
+
+
+def find_hunk(lines, hunk, start, expected):
+    """
+    Finds where the lines a hunk expects are in the file, at or after start.
+
+    Exact matches come first, then matches ignoring whitespace, and the closest one to the line the header gives wins.
+
+    Returns:
+        int: The index of the first matching line, or None.
+    """
+    size = len(hunk.old_lines)
+    for normalize in (lambda line: line, lambda line: ' '.join(line.split())):
+        old_lines = [normalize(line) for line in hunk.old_lines]
+        candidates = [
+            index for index in range(start, len(lines) - size + 1)
+            if [normalize(line) for line in lines[index:index + size]] == old_lines
+        ]
+        if candidates:
+            return min(candidates, key=lambda index: abs(index - expected))
+    return None
+
+
+def apply_diff(original, diff):
+    """
+    Applies a unified diff to the contents it was made for.
+
+    Parameters:
+        original (str): The contents of the file.
+        diff (str): The unified diff.
+
+    Returns:
+        str: The patched contents.
+
+    Raises:
+        PatchError: When a hunk does not match the file.
+    """
+    lines = original.split('\n')
+    trailing_newline = original.endswith('\n')
+    if trailing_newline:
+        lines.pop()
+
+    patched = []
+    position = 0
+    for number, hunk in enumerate(parse_diff(diff), start=1):
+        # The old line numbers of every hunk count lines of the original file
+        expected = max(hunk.old_start - 1, position)
+        if hunk.old_lines:
+            index = find_hunk(lines, hunk, position, expected)
+            if index is None:
+                raise PatchError(f"Hunk {number} ({hunk.header}) does not match the file after line {position}")
+        elif hunk.old_count == 0:
+            # Pure insertion: "-N,0" inserts after line N
+            index = min(max(hunk.old_start, position), len(lines))
+        else:
+            # Additions under a header that claims old lines: the header is all there is to place them
+            index = min(expected, len(lines))
+
+        patched.extend(lines[position:index])
+        patched.extend(hunk.new_lines)
+        position = index + len(hunk.old_lines)
+
+    patched.extend(lines[position:])
+    return '\n'.join(patched) + ('\n' if trailing_newline else '')
+
+
+# Parsers by file extension: a file that parsed before the patch must still parse after it
+VALIDATORS = {'.py': ast.parse, '.json': json.loads}
+
+
+def validate(path, original, patched):
+    """
+    Checks that the patched file still parses when the original did.
+
+    Raises:
+        PatchError: When the patch breaks the file.
+    """
+    validator = VALIDATORS.get(os.path.splitext(path)[1])
+    if validator is None:
+        return
+
+    try:
+        validator(original)
+    except (SyntaxError, ValueError):
+        # Nothing to preserve
+        return
+
+    try:
+        validator(patched)
+    except (SyntaxError, ValueError) as e:
+        raise PatchError(f"The patched file no longer parses: {e}") from e
+
+
+def patch_file(path, original, diff):
+    """
+    Applies the diff of a file and validates the result.
+
+    Parameters:
+        path (str): The file path, used to pick the validator.
+        original (str): The contents of the file.
+        diff (str): The unified diff.
+
+    Returns:
+        str: The patched contents.
+
+    Raises:
+        PatchError: When the diff does not apply or breaks the file.
+    """
+    patched = apply_diff(original, diff)
+    validate(path, original, patched)
+    return patched
@@ -0,0 +1,131 @@
+import re
+import ast
+import fnmatch
+from bisect import bisect_left
+from triage import translate
+
+
+class PathIndex:
+    """
+    Local index over the repository tree that resolves a file, folder or glob into file paths.
+    """
+
+    GLOB_CHARS = set('*?[')
+
+    def __init__(self, entries, ignore_dirs=()):
+        """
+        Builds the index from the tree entries of a repository.
+
+        Parameters:
+            entries (list): Tree entries as returned by github_helper.get_tree_entries.
+            ignore_dirs (set): Folder names left out of the index, matching the rendered tree.
+        """
+        entries = [item for item in entries if not set(item['path'].split('/')) & set(ignore_dirs)]
+
+        self.files = sorted(item['path'] for item in entries if item['type'] == 'blob')
+        self.dirs = {item['path'] for item in entries if item['type'] == 'tree'}
+        self.file_set = set(self.files)
+
+        # Map each name (file or folder) to every full path carrying it
+        self.names = {}
+        for path in self.files:
+            self.names.setdefault(path.rsplit('/', 1)[-1], []).append(path)
+        for path in sorted(self.dirs):
+            self.names.setdefault(path.rsplit('/', 1)[-1] + '/', []).append(path)
+
+    @staticmethod
+    def normalize(query):
+        """
+        Normalizes user input into a repository-relative path.
+
+        Parameters:
+            query (str): The user input (file, folder or glob).
+
+        Returns:
+            str: The normalized query.
+        """
+        query = query.strip().strip('\'"`').strip()
+        if query.startswith('./'):
+            query = query[2:]
+        return query.strip('/')
+
+    def files_under(self, folder):
+        """
+        Returns every file below the given folder using a range scan on the sorted file list.
+
+        Parameters:
+            folder (str): The folder path.
+
+        Returns:
+            list: The full paths of all files inside the folder and its subfolders.
+        """
+        prefix = f"{folder}/"
+        paths = []
+        for path in self.files[bisect_left(self.files, prefix):]:
+            if not path.startswith(prefix):
+                break
+            paths.append(path)
+        return paths
+
+    def resolve(self, query):
+        """
+        Resolves a file, folder or glob into the list of file paths to review.
+
+        Parameters:
+            query (str): The user input (file, folder or glob).
+
+        Returns:
+            list: The matching full paths, empty when nothing in the tree matches.
+        """
+        query = self.normalize(query)
+
+        if not query:
+            return list(self.files)
+
+        if self.GLOB_CHARS & set(query):
+            # Globs without a folder match names at any depth, like .gitignore. With a folder, * and ? stay within a
+            # folder and ** spans folders
+            if '/' in query:
+                regex = re.compile(translate(query, recursive=False))
+                return [path for path in self.files if regex.fullmatch(path)]
+            return [path for path in self.files if fnmatch.fnmatchcase(path.rsplit('/', 1)[-1], query)]
+
+        if query in self.file_set:
+            return [query]
+
+        if query in self.dirs:
+            return self.files_under(query)
+
+        # Bare names such as "agents.py" or "src" resolve to the full path when it is unambiguous
+        name = query.rsplit('/', 1)[-1]
+        matches = [path for path in self.names.get(name, []) if f"/{path}".endswith(f"/{query}")]
+        if len(matches) == 1:
+            return matches
+
+        folders = [path for path in self.names.get(name + '/', []) if f"/{path}".endswith(f"/{query}")]
+        if len(folders) == 1:
+            return self.files_under(folders[0])
+
+        return []
+
+
+def parse_paths(text):
+    """
+    Extracts the array of paths from an LLM reply, ignoring any extra text around it.
+
+    Parameters:
+        text (str): The raw reply of the path agent.
+
+    Returns:
+        list: The list of paths, empty if no array could be parsed.
+    """
+    match = re.search(r'\[.*?\]', str(text), re.DOTALL)
+    if not match:
+        return []
+
+    try:
+        paths = ast.literal_eval(match.group(0))
+    except (ValueError, SyntaxError):
+        return []
+
+    return [path for path in paths if isinstance(path, str)]
@@ -0,0 +1,286 @@
+import os
+import re
+import logging
+import subprocess
+from github_client import get_client
+from github_helper import get_commit_sha
+from patching import HUNK_HEADER
+
+# Configurable pull request review
+PR_CONTEXT_LINES = int(os.getenv('PR_CONTEXT_LINES', 20))  # Unchanged lines shown around every change
+PR_FILES_PER_PAGE = 100
+PR_MAX_FILE_PAGES = 30  # GitHub lists at most 3000 files of a pull request
+
+PULL_REQUEST_PATTERN = re.compile(r'^(?:.*/pull/|#)?(\d+)/?$')
+REF_RANGE_PATTERN = re.compile(r'^(.*?)(\.\.\.?)(.*)$')
+GIT_DIFF_HEADER = re.compile(r'^diff --git "?a/(.+?)"? "?b/(.+?)"?$')
+
+
+class PullRequestSpec:
+    """
+    What to review: a pull request number, or a base..head ref pair (an empty head is the local working tree).
+    """
+
+    def __init__(self, number=None, base=None, head=None, merge_base=True):
+        """
+        Parameters:
+            number (int): The pull request number.
+            base (str): The base ref of a ref pair.
+            head (str): The head ref of a ref pair, None for the working tree of a local checkout.
+            merge_base (bool): Diff from the merge base of base and head (base...head) rather than from base (base..head).
+        """
+        self.number = number
+        self.base = base
+        self.head = head
+        self.merge_base = merge_base
+
+    @property
+    def label(self):
+        if self.number is not None:
+            return f"#{self.number}"
+        return f"{self.base}{'...' if self.merge_base else '..'}{self.head or ''}"
+
+
+def parse_pull_request(spec):
+    """
+    Parses a pull request number, pull request URL or ref pair.
+
+    Parameters:
+        spec (str): e.g. "42", "#42", "https://github.com/owner/repo/pull/42", "main...feature" or "main.." (local).
+
+    Returns:
+        PullRequestSpec: The parsed spec.
+
+    Raises:
+        ValueError: When the spec is neither a pull request nor a ref pair.
+    """
+    spec = spec.strip()
+    match = PULL_REQUEST_PATTERN.match(spec)
+    if match:
+        return PullRequestSpec(number=int(match.group(1)))
+
+    match = REF_RANGE_PATTERN.match(spec)
+    if not match or not match.group(1).strip():
+        raise ValueError(f"Not a pull request number or a base..head ref pair: {spec}")
+    return PullRequestSpec(base=match.group(1).strip(), head=match.group(3).strip() or None, merge_base=match.group(2) == '...')
+
+
+class FileChange:
+    """
+    The changes of one file: which lines of the new version were added, and the removed lines before each of them.
+    """
+
+    def __init__(self, path, status='modified', patch="", previous_path=None):
+        """
+        Parses the unified diff of the file.
+
+        Parameters:
+            path (str): The path of the file in the new version.
+            status (str): added, modified, renamed or removed.
+            patch (str): The hunks of the file, None when the diff is not available (binary or too large).
+            previous_path (str): The path before a rename.
+        """
+        self.path = path
+        self.status = status
+        self.patch = patch
+        self.previous_path = previous_path
+
+        self.added = set()
+        self.removed = {}  # New line number -> the lines removed just before it
+        new_line = None
+        for line in (patch or "").split('\n'):
+            match = HUNK_HEADER.match(line)
+            if match:
+                # A hunk without new lines starts after its header line
+                new_line = int(match.group(3)) + (1 if match.group(4) == '0' else 0)
+            elif new_line is None or line.startswith('\\'):
+                continue
+            elif line.startswith('+'):
+                self.added.add(new_line)
+                new_line += 1
+            elif line.startswith('-'):
+                self.removed.setdefault(new_line, []).append(line[1:])
+            else:
+                new_line += 1
+
+    @property
+    def description(self):
+        if self.status == 'renamed' and self.previous_path:
+            return f"renamed from {self.previous_path}"
+        return self.status
+
+    def windows(self, line_count, context=PR_CONTEXT_LINES):
+        """
+        Returns the line ranges to show: every change with its surrounding context, overlapping ranges merged.
+
+        Parameters:
+            line_count (int): The number of lines of the new version of the file.
+            context (int): Unchanged lines shown before and after every change.
+
+        Returns:
+            list: The (start, end) line ranges, inclusive and in order.
+        """
+        windows = []
+        for line in sorted(self.added | set(self.removed)):
+            line = min(max(line, 1), max(line_count, 1))
+            start, end = max(1, line - context), min(max(line_count, 1), line + context)
+            if windows and start <= windows[-1][1] + 1:
+                windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+            else:
+                windows.append((start, end))
+        return windows
+
+    def render(self, contents, context=PR_CONTEXT_LINES):
+        """
+        Renders the changed regions of the new version of the file with line numbers: added lines are marked "+",
+        removed lines are shown as "-" lines without a number where they used to be.
+
+        Parameters:
+            contents (str): The new version of the file.
+            context (int): Unchanged lines shown before and after every change.
+
+        Returns:
+            str: The regions, separated by "..." lines. Empty when nothing changed.
+        """
+        lines = contents.split('\n')
+        if contents.endswith('\n'):
+            lines.pop()
+
+        regions = []
+        for start, end in self.windows(len(lines), context):
+            region = []
+            for number in range(start, end + 1):
+                region.extend(f"{'':>6} - {line}" for line in self.removed.get(number, []))
+                if number <= len(lines):
+                    region.append(f"{number:>6} {'+' if number in self.added else ' '} {lines[number - 1]}")
+            if end >= len(lines):
+                # Lines removed at the end of the file
+                region.extend(f"{'':>6} - {line}" for number in sorted(self.removed) if number > end for line in self.removed[number])
+            regions.append('\n'.join(region))
+        return '\n   ...\n'.join(regions)
+
+
+def change_from_github(item):
+    """
+    Builds the change of a file from an entry of the pulls/files or compare API.
+    """
+    return FileChange(
+        path=item['filename'], status=item.get('status', 'modified'),
+        patch=item.get('patch'), previous_path=item.get('previous_filename')
+    )
+
+
+def fetch_changes(owner, repo, spec):
+    """
+    Fetches the changed files of a pull request (pulls API) or of a ref pair (compare API).
+
+    Parameters:
+        owner (str): The owner of the repository.
+        repo (str): The name of the repository.
+        spec (PullRequestSpec): What to review.
+
+    Returns:
+        tuple: The head commit SHA and the change of every changed file, by path.
+    """
+    client = get_client()
+
+    if spec.number is not None:
+        pull = client.get_json(f"repos/{owner}/{repo}/pulls/{spec.number}")
+        head_sha = pull['head']['sha']
+        items = []
+        for page in range(1, PR_MAX_FILE_PAGES + 1):
+            files = client.get_json(
+                f"repos/{owner}/{repo}/pulls/{spec.number}/files",
+                params={'per_page': PR_FILES_PER_PAGE, 'page': page}
+            )
+            items.extend(files)
+            if len(files) < PR_FILES_PER_PAGE:
+                break
+    else:
+        if spec.head is None:
+            raise ValueError("A GitHub repository has no working tree: give both refs, e.g. main...feature")
+        if not spec.merge_base:
+            logging.info("The compare API always diffs from the merge base, base..head is reviewed as base...head")
+        head_sha = get_commit_sha(owner, repo, spec.head)
+        # The first page of a comparison lists every changed file, only its commits are paginated
+        comparison = client.get_json(f"repos/{owner}/{repo}/compare/{spec.base}...{head_sha}", params={'per_page': 1})
+        items = comparison.get('files', [])
+
+    changes = {item['filename']: change_from_github(item) for item in items}
+    logging.info(f"{len(changes)} files changed in {owner}/{repo} {spec.label}")
+    return head_sha, changes
+
+
+def parse_git_diff(text):
+    """
+    Splits the output of git diff into the change of every file.
+
+    Parameters:
+        text (str): The output of git diff.
+
+    Returns:
+        dict: The change of every changed file, by path.
+    """
+    changes = {}
+    for block in re.split(r'^(?=diff --git )', text, flags=re.MULTILINE):
+        lines = block.split('\n')
+        match = GIT_DIFF_HEADER.match(lines[0])
+        if not match:
+            continue
+
+        previous_path, path = match.group(1), match.group(2)
+        status = 'renamed' if previous_path != path else 'modified'
+        hunks = None
+        for index, line in enumerate(lines[1:], start=1):
+            if line.startswith('new file mode'):
+                status = 'added'
+            elif line.startswith('deleted file mode'):
+                status = 'removed'
+            elif line.startswith('Binary files'):
+                break
+            elif line.startswith('@@'):
+                hunks = '\n'.join(lines[index:]).rstrip('\n')
+                break
+
+        if hunks is None and status == 'renamed':
+            # Renamed without changes
+            hunks = ""
+        changes[path] = FileChange(path=path, status=status, patch=hunks, previous_path=previous_path if status == 'renamed' else None)
+    return changes
+
+
+def local_changes(root, spec):
+    """
+    Runs git diff in a local checkout, without any GitHub request.
+
+    Parameters:
+        root (str): The folder of the working tree.
+        spec (PullRequestSpec): The ref pair to review. An empty head diffs the base against the working tree.
+
+    Returns:
+        dict: The change of every changed file, by path.
+
+    Raises:
+        ValueError: When the spec is a pull request number or git diff fails.
+    """
+    if spec.number is not None:
+        raise ValueError("Pull request numbers need a GitHub repository, review a local checkout with base..head refs")
+
+    if spec.head is None:
+        refs = [spec.base]
+    elif spec.merge_base:
+        refs = [f"{spec.base}...{spec.head}"]
+    else:
+        refs = [spec.base, spec.head]
+
+    try:
+        output = subprocess.run(
+            ['git', '-C', root, 'diff', '--no-color', '--no-ext-diff', '-M', '--relative', *refs, '--'],
+            capture_output=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise ValueError(f"git diff {spec.label} failed: {getattr(e, 'stderr', b'').decode('utf-8', 'replace').strip() or e}") from e
+
+    changes = parse_git_diff(output.decode('utf-8', 'replace'))
+    logging.info(f"{len(changes)} files changed in {root} {spec.label}")
+    return changes
@@ -0,0 +1,137 @@
+import os
+import mmap
+import zlib
+import logging
+import tarfile
+import tempfile
+import threading
+from github_client import get_client
+from tracing import record_http
+from local_source import git_blob_sha
+
+# Where downloaded snapshots are kept, one uncompressed tar per commit
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', os.path.join('.cache', 'snapshots'))
+
+
+class RepoSnapshot:
+    """
+    Local snapshot of a repository at one commit, downloaded once as a tarball and read through a memory map.
+    """
+
+    def __init__(self, owner, repo, sha, directory=SNAPSHOT_DIR):
+        """
+        Initializes the snapshot of the given commit. Nothing is downloaded until open() is called.
+
+        Parameters:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            sha (str): The commit SHA of the snapshot.
+            directory (str): The folder where snapshots are cached.
+        """
+        self.owner = owner
+        self.repo = repo
+        self.sha = sha
+        self.tar_path = os.path.join(directory, owner, repo, f"{sha}.tar")
+
+        self.members = {}
+        self.dirs = set()
+        self.mmap = None
+        self.lock = threading.Lock()
+
+    def download(self):
+        """
+        Downloads the tarball of the commit and stores it uncompressed, so members can be memory-mapped.
+        """
+        api_url = f"repos/{self.owner}/{self.repo}/tarball/{self.sha}"
+
+        os.makedirs(os.path.dirname(self.tar_path), exist_ok=True)
+
+        with get_client().get(api_url, stream=True) as response:
+            # Decompress while streaming, then move into place so a partial download is never used
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.tar_path), suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        record_http(len(chunk), requests=0)
+                        file.write(decompressor.decompress(chunk))
+                    file.write(decompressor.flush())
+                os.replace(tmp_path, self.tar_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        logging.info(f"Downloaded snapshot of {self.owner}/{self.repo}@{self.sha[:7]}")
+
+    def open(self):
+        """
+        Downloads the snapshot if it is not cached yet, then indexes and memory-maps it.
+
+        Returns:
+            RepoSnapshot: The opened snapshot.
+        """
+        with self.lock:
+            if self.mmap is not None:
+                return self
+
+            if not os.path.exists(self.tar_path):
+                self.download()
+
+            with tarfile.open(self.tar_path, 'r:') as archive:
+                for member in archive:
+                    # GitHub prefixes every member with an "<owner>-<repo>-<sha>/" folder
+                    _, _, path = member.name.partition('/')
+                    if not path:
+                        continue
+                    if member.isdir():
+                        self.dirs.add(path.rstrip('/'))
+                    elif member.isreg():
+                        self.members[path] = (member.offset_data, member.size)
+
+            with open(self.tar_path, 'rb') as file:
+                self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self
+
+    def close(self):
+        """
+        Releases the memory map. Views still held elsewhere keep it mapped until they are released.
+        """
+        with self.lock:
+            if self.mmap is None:
+                return
+            try:
+                self.mmap.close()
+            except BufferError:
+                pass
+            self.mmap = None
+            self.members = {}
+            self.dirs = set()
+
+    def read_bytes(self, path):
+        """
+        Returns the content of a file as a zero-copy view on the memory map.
+
+        Parameters:
+            path (str): The repository-relative file path.
+
+        Returns:
+            memoryview: The file content.
+        """
+        offset, size = self.members[path]
+        return memoryview(self.mmap)[offset:offset + size]
+
+    def entries(self):
+        """
+        Returns the tree entries of the snapshot, shaped like github_helper.get_tree_entries.
+
+        Returns:
+            list: Tree entries (path, type, sha, size), with git blob SHAs computed locally.
+        """
+        entries = [{'path': path, 'type': 'tree', 'sha': None, 'size': 0} for path in self.dirs]
+
+        for path, (_, size) in self.members.items():
+            entries.append({'path': path, 'type': 'blob', 'sha': git_blob_sha(self.read_bytes(path)), 'size': size})
+
+        entries.sort(key=lambda item: item['path'])
+        return entries
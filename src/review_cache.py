@@ -0,0 +1,171 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+from contextlib import contextmanager
+
+# Configurable cache location and eviction limits
+REVIEW_CACHE_PATH = os.getenv('REVIEW_CACHE_PATH', os.path.join('.cache', 'reviews.sqlite3'))
+REVIEW_CACHE_MAX_BYTES = int(os.getenv('REVIEW_CACHE_MAX_BYTES', 256 * 1024 * 1024))  # 256 MB
+REVIEW_CACHE_MAX_AGE_DAYS = int(os.getenv('REVIEW_CACHE_MAX_AGE_DAYS', 30))  # 30 days
+
+
+def model_settings(model=None):
+    """
+    Returns the model settings that change the review output and therefore belong in the cache key.
+
+    Parameters:
+        model (str): The model reviewing the code, defaults to OPENAI_MODEL_NAME.
+
+    Returns:
+        dict: The model name and endpoint used by the agents.
+    """
+    return {
+        'model': model or os.getenv('OPENAI_MODEL_NAME', 'gpt-4o'),
+        'api_base': os.getenv('OPENAI_API_BASE', ''),
+    }
+
+
+def hash_text(*parts):
+    """
+    Hashes the given strings into a stable hex digest.
+
+    Returns:
+        str: The SHA-256 hex digest of the parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ReviewCache:
+    """
+    Persistent review cache on SQLite, keyed by blob SHA, prompt version and model settings.
+    """
+
+    def __init__(self, path=REVIEW_CACHE_PATH, max_bytes=REVIEW_CACHE_MAX_BYTES, max_age_days=REVIEW_CACHE_MAX_AGE_DAYS):
+        """
+        Opens (and creates if needed) the cache database.
+
+        Parameters:
+            path (str): The SQLite database file.
+            max_bytes (int): Total size of cached reviews kept before the least recently used are evicted.
+            max_age_days (int): Age after which a cached review is evicted.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 24 * 60 * 60
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self.connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS reviews (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT,
+                    repo TEXT,
+                    path TEXT,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            connection.execute('CREATE INDEX IF NOT EXISTS reviews_accessed_at ON reviews (accessed_at)')
+
+    @contextmanager
+    def connect(self):
+        """
+        Opens a new connection for one transaction. One connection per call keeps the cache safe to use from worker threads.
+        """
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def make_key(blob_sha, prompt_version, settings=None):
+        """
+        Builds the cache key of a review.
+
+        Parameters:
+            blob_sha (str): The git blob SHA of the reviewed file.
+            prompt_version (str): The hash of the prompts used for the review.
+            settings (dict): The model settings, defaults to model_settings().
+
+        Returns:
+            str: The cache key.
+        """
+        settings = settings or model_settings()
+        return hash_text(blob_sha, prompt_version, *sorted(f"{name}={value}" for name, value in settings.items()))
+
+    def get(self, key):
+        """
+        Returns the cached review for the key, if present and not expired.
+
+        Parameters:
+            key (str): The cache key.
+
+        Returns:
+            str: The cached review result, or None on a miss.
+        """
+        now = time.time()
+        try:
+            with self.connect() as connection:
+                row = connection.execute(
+                    'SELECT result FROM reviews WHERE key = ? AND created_at >= ?',
+                    (key, now - self.max_age)
+                ).fetchone()
+                if row:
+                    connection.execute('UPDATE reviews SET accessed_at = ? WHERE key = ?', (now, key))
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logging.error(f"Error reading review cache: {e}")
+            return None
+
+    def put(self, key, owner, repo, path, result):
+        """
+        Stores a review result and evicts old entries.
+
+        Parameters:
+            key (str): The cache key.
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            path (str): The path of the reviewed file.
+            result (str): The review result in markdown format.
+        """
+        now = time.time()
+        try:
+            with self.connect() as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, owner, repo, path, result, len(result.encode('utf-8')), now, now)
+                )
+            self.evict()
+        except sqlite3.Error as e:
+            logging.error(f"Error writing review cache: {e}")
+
+    def evict(self):
+        """
+        Drops expired reviews, then the least recently used ones until the cache fits in max_bytes.
+        """
+        with self.connect() as connection:
+            connection.execute('DELETE FROM reviews WHERE created_at < ?', (time.time() - self.max_age,))
+
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM reviews').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            rows = connection.execute('SELECT key, size FROM reviews ORDER BY accessed_at').fetchall()
+            stale = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                total -= size
+            connection.executemany('DELETE FROM reviews WHERE key = ?', stale)
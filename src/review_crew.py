@@ -1,10 +1,24 @@
 import os
 import re
-import streamlit as st
+import difflib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from crewai import Crew
-from agents import Agents
+from agents import Agents, TokenStream
 from tasks import Tasks
+from tools import LINE_LIMIT_MESSAGE, MAX_LINE_COUNT, fetch_file_contents
+from chunker import CHUNK_REVIEW_WORKERS, split_into_chunks
+from markdown_sections import extract_code, replace_section, split_by_path_headings, split_sections
+from review_cache import hash_text, model_settings
+from dedup import DEDUP_DELTA_REVIEW, settings_key
+from static_analysis import ANALYSIS_VERSION, format_findings, static_report
+from patching import PATCH_MAX_RETRIES, PatchError, is_diff, patch_file
+from pull_request import PR_CONTEXT_LINES
+from model_router import route_section
+from review_store import ReviewStore
+from llm_controller import get_controller
+from tracing import record_tokens, span, wrap
 
 # Create a custom logger
 logger = logging.getLogger(__name__)
@@ -27,7 +41,7 @@ class ReviewCrew:
     Class to handle the review process for a given file in a GitHub repository.
     """
 
-    def __init__(self, owner, repo, path, output):
+    def __init__(self, owner, repo, path, output, blob_sha=None, cache=None, inject_content=False, snapshot=None, previous_result=None, chunked=False, batch=None, stream_tokens=False, output_placeholder=None, store=None, dedup=None, duplicates=None, static_analysis=None, static_only=False, diff_output=False, change=None, ref=None, route=None, contents=None):
         """
         Initializes the ReviewCrew with the repository details.
 
@@ -36,79 +50,773 @@ class ReviewCrew:
             repo (str): The name of the repository.
             path (str): The path of the file to review.
             output (str): The path of the single file with all the repo files reviewed.
+            blob_sha (str): The git blob SHA of the file, used as the review cache key.
+            cache (ReviewCache): The review cache to check before running the crew.
+            inject_content (bool): Fetch the file in Python and embed it in the review task instead of using content_agent.
+            snapshot (RepoSnapshot): Serve the file from this local snapshot instead of the Contents API.
+            previous_result (str): The review carried forward from the last report when the file did not change.
+            chunked (bool): Review files over MAX_LINE_COUNT in chunks instead of skipping them (content injection only).
+            batch (ReviewBatch): Review the file together with other small files in one LLM call (content injection only).
+            stream_tokens (bool): Stream the review tokens into token_stream while the LLM generates them.
+            output_placeholder: The UI placeholder showing the result (e.g. st.empty()), None when running headless.
+            store (ReviewStore): The review store of the repository, the report is rendered from it.
+            dedup (DedupIndex): Reuse the review of a near-duplicate file reviewed before (content injection only).
+            duplicates (DuplicateGroup): The files of the run with the same content, reviewed once.
+            static_analysis (dict): The static analysis of the files of the run, by path. Its findings go into the prompt.
+            static_only (bool): Report the static analysis alone, without any LLM call.
+            diff_output (bool): Ask for a unified diff under "Updated Code" and render the patched file (content injection only).
+            change (FileChange): Review only the changed regions of the file in a pull request, not the entire file.
+            ref (str): The commit to fetch the file at, defaults to the default branch.
+            route (dict): The routing decision of the file (ModelRouter.route), None to review with OPENAI_MODEL_NAME.
+            contents (dict): The file contents already read by the run (static analysis), by path, not fetched again.
         """
         self.owner = owner
         self.repo = repo
         self.path = path
         self.output = output
-        self.output_placeholder = st.empty()
+        self.blob_sha = blob_sha
+        self.cache = cache
+        self.inject_content = inject_content
+        self.snapshot = snapshot
+        self.previous_result = previous_result
+        self.chunked = chunked
+        self.batch = batch
+        self.skipped = False
+        self.deduplicated = False
+        self.error = None
+        self.token_stream = TokenStream() if stream_tokens else None
+        self.output_placeholder = output_placeholder
+        self.store = store or ReviewStore(owner, repo)
+        self.dedup = dedup
+        self.duplicates = duplicates
+        self.static_analysis = static_analysis
+        self.static_only = static_only
+        self.diff_output = diff_output
+        self.change = change
+        self.ref = ref
+        self.route = route
+        self.model = route['model'] if route else None
+        self.contents = contents or {}
 
-    def append_review_to_file(self, result):
+    def prompt_version(self):
         """
-        Appends the review result to a markdown file.
+        Hashes the prompts that shape the review, so that editing them invalidates cached reviews.
+
+        Returns:
+            str: The prompt version hash.
+        """
+        if self.change is not None:
+            file_input = Tasks.HUNK_REVIEW_TASK_DESCRIPTION + str(PR_CONTEXT_LINES)
+        elif self.inject_content:
+            file_input = Tasks.REVIEW_TASK_INJECTED_FILE_INPUT + Tasks.REVIEW_TASK_INJECTED_CONTENTS
+            if self.chunked:
+                file_input += Tasks.REVIEW_TASK_CHUNK_CONTEXT
+            if self.diff_output:
+                file_input += Tasks.REVIEW_TASK_DIFF_OUTPUT
+        else:
+            file_input = Tasks.REVIEW_TASK_FILE_INPUT
+        if self.static_analysis is not None:
+            file_input += Tasks.REVIEW_TASK_STATIC_FINDINGS + ANALYSIS_VERSION
+
+        return hash_text(
+            Agents.REVIEW_AGENT_ROLE,
+            Agents.REVIEW_AGENT_GOAL,
+            Agents.REVIEW_AGENT_BACKSTORY,
+            Tasks.REVIEW_TASK_DESCRIPTION,
+            Tasks.REVIEW_TASK_EXPECTED_OUTPUT,
+            file_input,
+        )
+
+    def cache_key(self):
+        """
+        Returns the review cache key of the file, or None when the file cannot be cached.
+        """
+        if self.cache is None or not self.blob_sha:
+            return None
+        if self.change is not None:
+            # The review of a pull request depends on the changes, not only on the new version of the file
+            return self.cache.make_key(hash_text(self.blob_sha, self.change.patch), self.prompt_version(), model_settings(self.model))
+        return self.cache.make_key(self.blob_sha, self.prompt_version(), model_settings(self.model))
+
+    def cached_result(self):
+        """
+        Returns the cached review of the file, or None on a miss.
+        """
+        cache_key = self.cache_key()
+        cached_result = self.cache.get(cache_key) if cache_key else None
+        # The same content may have been reviewed at another path or in another repository
+        return self.retarget(cached_result) if cached_result is not None else None
+
+    def retarget(self, result, path=None):
+        """
+        Rewrites the Project Name and Path sections of a review of the same content made elsewhere, so it names this file.
+
+        Parameters:
+            result (str): The review result in markdown format.
+            path (str): The reviewed file, defaults to the file of this crew.
+
+        Returns:
+            str: The review result naming this repository and file.
+        """
+        sections = split_sections(result)
+        for heading, body in (('Project Name', self.repo), ('Path', path or self.path)):
+            if heading in sections:
+                result = replace_section(result, heading, body)
+        return result
+
+    def skipped_result(self, message, path=None):
+        """
+        Builds the review section of a file that was skipped by the size or line count limits.
+
+        Parameters:
+            message (str): The skip message returned by fetch_file_contents.
+            path (str): The skipped file, defaults to the file of this crew.
+
+        Returns:
+            str: The review result in markdown format.
+        """
+        return f"## Project Name\n{self.repo}\n\n## Path\n{path or self.path}\n\n## Code Review\n{message}"
+
+    def static_findings(self, path, start=None, end=None):
+        """
+        Returns the static analysis findings of a file of the run for the review prompt, optionally within a line range.
+        """
+        return format_findings((self.static_analysis or {}).get(path), start=start, end=end)
+
+    def duplicate_result(self, canonical_path):
+        """
+        Builds the review section of a file with the same content as another file of the run, linking to its review.
 
         Parameters:
-            result (str): The str containing the explain and the review results in markdown format.
+            canonical_path (str): The file reviewed in its place.
+
+        Returns:
+            str: The review result in markdown format.
+        """
+        return (
+            f"## Project Name\n{self.repo}\n\n## Path\n{self.path}\n\n"
+            f"## Code Review\nIdentical to `{canonical_path}`, see the review of `{canonical_path}` in this report."
+        )
+
+    def near_duplicate(self, path, file_contents):
         """
-        # Create directory path using owner and repo
-        dir_path = os.path.join(self.owner, self.repo)
-        os.makedirs(dir_path, exist_ok=True)
+        Reuses the review of a near-duplicate file reviewed before, in this run or in another repository.
 
-        # Create a file with the current date as its name
-        file_path = os.path.join(dir_path, self.output)
+        Parameters:
+            path (str): The file about to be reviewed.
+            file_contents (str): The contents of the file.
+
+        Returns:
+            str: The review result in markdown format, or None when no near-duplicate was reviewed.
+        """
+        if self.dedup is None:
+            return None
+
+        match = self.dedup.find(
+            file_contents, settings_key(self.prompt_version(), self.model), owner=self.owner, repo=self.repo, path=path
+        )
+        if match is None:
+            return None
+
+        # Same content reviewed elsewhere: the review applies as is, once it names this file
+        if match['contents'] == file_contents:
+            logger.info(f"Reusing the review of {match['owner']}/{match['repo']}/{match['path']} for {path}")
+            return self.retarget(match['result'], path=path)
+
+        logger.info(f"{path} is a near-duplicate ({match['similarity']:.0%}) of {match['owner']}/{match['repo']}/{match['path']}")
+        sections = split_sections(match['result'])
+        review = (
+            f"Near-duplicate ({match['similarity']:.0%} similar) of `{match['path']}` in {match['owner']}/{match['repo']}, "
+            f"reviewed once. The review of `{match['path']}` follows."
+        )
+        if DEDUP_DELTA_REVIEW:
+            review += f"\n\n### Differences\n{self.review_delta(path, match['path'], match['contents'], file_contents)}"
+        review += f"\n\n### Review of `{match['path']}`\n{sections.get('Code Review', '')}"
+
+        return (
+            f"## Project Name\n{self.repo}\n\n## Path\n{path}\n\n"
+            f"## Explain This\n{sections.get('Explain This', '')}\n\n## Code Review\n{review}"
+        )
+
+    def review_delta(self, path, canonical_path, canonical_contents, file_contents):
+        """
+        Reviews only the differences of a near-duplicate file with the file reviewed in its place.
 
+        Returns:
+            str: The review of the differences in markdown format.
+        """
+        diff = '\n'.join(difflib.unified_diff(
+            canonical_contents.split('\n'), file_contents.split('\n'),
+            fromfile=canonical_path, tofile=path, lineterm=''
+        ))
         try:
-            with open(file_path, 'a') as file:
-                file.write(f"\n\n# {self.path}\n\n")
-                file.write(result)
+            review_agent = Agents().review_agent(model=self.model)
+            review_task = Tasks().delta_review_task(agent=review_agent, repo=self.repo, path=path, canonical_path=canonical_path, diff=diff)
+            output = self.kickoff([review_agent], [review_task])
         except Exception as e:
-            logger.error(f"Error writing to file: {e}")
+            logger.error(f"Error reviewing the differences of {path}: {e}")
+            return "Error: The review of the differences failed."
 
-    def run(self):
+        return split_sections(output).get('Code Review') or output.strip()
+
+    def remember(self, path, file_contents, result):
         """
-        Runs the review process using the defined agents and tasks.
+        Indexes a fresh review, so later near-duplicates of the file reuse it.
+        """
+        if self.dedup is not None and result is not None:
+            self.dedup.add(self.owner, self.repo, path, file_contents, result, settings_key(self.prompt_version(), self.model))
+
+    def review(self):
         """
+        Runs the review process using the defined agents and tasks, without touching the UI or the report.
+
+        Safe to call from a worker thread.
+
+        Returns:
+            str: The review result in markdown format, or None if the crew failed.
+        """
+        if self.static_only:
+            analysis = (self.static_analysis or {}).get(self.path)
+            if analysis is not None and self.change is not None:
+                # Only the findings within the changed regions
+                windows = self.change.windows(analysis['metrics']['lines'])
+                findings = [item for item in analysis['findings'] if any(start <= item['line'] <= end for start, end in windows)]
+                analysis = dict(analysis, findings=findings, finding_count=len(findings))
+            return static_report(self.repo, self.path, analysis)
+
+        if self.previous_result is not None:
+            logger.info(f"Carrying forward the previous review of {self.path}")
+            return self.previous_result
+
+        # Files of the run with the same content share one review
+        if self.duplicates is not None:
+            return self.duplicates.result(self)
+
+        cached_result = self.cached_result()
+        if cached_result is not None:
+            logger.info(f"Review cache hit for {self.path}")
+            return cached_result
+
+        return self.review_file()
+
+    def review_file(self):
+        """
+        Reviews the file with the LLM and caches the result.
+
+        Returns:
+            str: The review result in markdown format, or None if the crew failed.
+        """
+        cache_key = self.cache_key()
+        self.error = None
         try:
-            # The Agents
-            agents = Agents()
-            review_agent = agents.review_agent()
-            content_agent = agents.content_agent()
-
-            # The Tasks
-            tasks = Tasks()
-            content_task = tasks.content_task(
-                agent=content_agent,
-                owner=self.owner,
-                repo=self.repo,
-                path=self.path
+            if self.change is not None:
+                result = self.review_changes()
+            elif self.inject_content:
+                result = self.review_injected()
+            else:
+                result = self.review_with_content_agent()
+
+            # Record which model reviewed the file when the files are routed between models
+            if self.route is not None and result is not None and not self.skipped and not self.deduplicated:
+                result = replace_section(result, 'Review Model', route_section(self.route))
+
+            # Skipped and deduplicated files only hold a note, not a review of the file
+            if cache_key and result is not None and not self.skipped and not self.deduplicated:
+                self.cache.put(cache_key, self.owner, self.repo, self.path, result)
+
+            return result
+
+        except Exception as e:
+            logger.error(f"Error running ReviewCrew: {e}")
+            self.error = str(e)
+
+    def kickoff(self, crew_agents, crew_tasks):
+        """
+        Runs a crew and strips the markdown fence from its output.
+
+        Parameters:
+            crew_agents (list): The agents of the crew.
+            crew_tasks (list): The tasks of the crew.
+
+        Returns:
+            str: The review result in markdown format.
+        """
+        # The Crew
+        crew = Crew(
+            agents=crew_agents,
+            tasks=crew_tasks,
+            verbose=2,
+            telemetry=False
+        )
+
+        # Run the crew within the LLM concurrency limit, retrying rate limits, timeouts and 5xx
+        with span('kickoff', path=self.path):
+            kickoff_result = get_controller().call(crew.kickoff, tokens=lambda: (crew.usage_metrics or {}).get('total_tokens', 0))
+            usage_metrics = crew.usage_metrics or {}
+            record_tokens(usage_metrics.get('prompt_tokens', 0), usage_metrics.get('completion_tokens', 0), model=self.model)
+
+        str_result = str(kickoff_result).strip()
+
+        return re.sub(r'```markdown|```$', '', str_result, flags=re.DOTALL)
+
+    def review_with_content_agent(self):
+        """
+        Reviews the file with content_agent fetching it through the tool, then review_agent reviewing it.
+        """
+        # The Agents
+        agents = Agents()
+        review_agent = agents.review_agent(token_stream=self.token_stream, model=self.model)
+        content_agent = agents.content_agent(snapshot=self.snapshot, ref=self.ref)
+
+        # The Tasks
+        tasks = Tasks()
+        content_task = tasks.content_task(
+            agent=content_agent,
+            owner=self.owner,
+            repo=self.repo,
+            path=self.path
+        )
+        review_task = tasks.review_task(
+            agent=review_agent,
+            repo=self.repo,
+            path=self.path,
+            context=[content_task],
+            static_findings=self.static_findings(self.path)
+        )
+
+        return self.kickoff([content_agent, review_agent], [content_task, review_task])
+
+    def read_file(self, path, enforce_line_limit=True):
+        """
+        Returns the contents of a file of the repository, without a request when the run already read it.
+
+        Parameters:
+            path (str): The file path.
+            enforce_line_limit (bool): Skip files over MAX_LINE_COUNT.
+
+        Returns:
+            str: The content of the file, or a message starting with "Skipped:" or "Error:".
+        """
+        file_contents = self.contents.get(path)
+        if file_contents is None:
+            return fetch_file_contents(path, self.owner, self.repo, snapshot=self.snapshot, enforce_line_limit=enforce_line_limit, ref=self.ref)
+        if enforce_line_limit and len(file_contents.split('\n')) > MAX_LINE_COUNT:
+            return LINE_LIMIT_MESSAGE
+        return file_contents
+
+    def review_injected(self):
+        """
+        Fetches the file here and embeds it in the review task: one LLM call per file (or per chunk).
+        """
+        if self.batch is not None:
+            result = self.batch.result(self)
+            if result is not None:
+                return result
+            # Failed in the batch, left out of its output or over the line limit: the file is reviewed on its own
+
+        file_contents = self.read_file(self.path, enforce_line_limit=not self.chunked)
+        if file_contents.startswith("Error:"):
+            logger.error(f"Error fetching {self.path}: {file_contents}")
+            return None
+        if file_contents.startswith("Skipped:"):
+            self.skipped = True
+            return self.skipped_result(file_contents)
+
+        near_duplicate = self.near_duplicate(self.path, file_contents)
+        if near_duplicate is not None:
+            self.deduplicated = True
+            return near_duplicate
+
+        if self.chunked and len(file_contents.split('\n')) > MAX_LINE_COUNT:
+            result = self.review_chunks(file_contents)
+        else:
+            result = self.review_contents(self.path, file_contents)
+
+        self.remember(self.path, file_contents, result)
+        return result
+
+    def review_changes(self):
+        """
+        Reviews only the changed regions of the file in a pull request, with PR_CONTEXT_LINES lines of context around
+        every change: the prompt grows with the size of the diff, not with the size of the file.
+        """
+        if self.change.patch is None:
+            self.skipped = True
+            return self.skipped_result("Skipped: The diff of this file is not available (binary file or diff too large).")
+
+        file_contents = self.read_file(self.path, enforce_line_limit=False)
+        if file_contents.startswith("Error:"):
+            logger.error(f"Error fetching {self.path}: {file_contents}")
+            return None
+        if file_contents.startswith("Skipped:"):
+            self.skipped = True
+            return self.skipped_result(file_contents)
+
+        changes = self.change.render(file_contents)
+        if not changes:
+            self.skipped = True
+            return self.skipped_result(f"Skipped: No changed lines ({self.change.description}).")
+
+        lines = file_contents.split('\n')
+        static_findings = '\n'.join(filter(None, (
+            self.static_findings(self.path, start=start, end=end) for start, end in self.change.windows(len(lines))
+        )))
+
+        review_agent = Agents().review_agent(token_stream=self.token_stream, model=self.model)
+        review_task = Tasks().hunk_review_task(
+            agent=review_agent,
+            repo=self.repo,
+            path=self.path,
+            change=self.change.description,
+            changes=changes,
+            context=PR_CONTEXT_LINES,
+            static_findings=static_findings
+        )
+
+        return self.kickoff([review_agent], [review_task])
+
+    def review_contents(self, path, file_contents):
+        """
+        Reviews one file of the repository with its contents embedded in the review task.
+        """
+        review_agent = Agents().review_agent(token_stream=self.token_stream if path == self.path else None, model=self.model)
+        review_task = Tasks().review_task(
+            agent=review_agent,
+            repo=self.repo,
+            path=path,
+            file_contents=file_contents,
+            static_findings=self.static_findings(path),
+            diff_output=self.diff_output
+        )
+
+        return self.apply_updated_code(path, file_contents, self.kickoff([review_agent], [review_task]))
+
+    def apply_updated_code(self, path, file_contents, result):
+        """
+        Renders the entire updated file under "Updated Code" by applying the unified diff the model returned there.
+
+        A diff that does not apply (or breaks the file) is sent back to the model for a correction, up to PATCH_MAX_RETRIES times.
+
+        Parameters:
+            path (str): The reviewed file.
+            file_contents (str): The contents the diff was made for.
+            result (str): The review result in markdown format.
+
+        Returns:
+            str: The review result with the patched file, or with the diff and the reason it did not apply.
+        """
+        if not self.diff_output or result is None:
+            return result
+
+        language = os.path.splitext(path)[1].lstrip('.')
+        updated_section = split_sections(result).get('Updated Code')
+        if not updated_section:
+            # No change suggested
+            return replace_section(result, 'Updated Code', f"```{language}\n{file_contents.rstrip()}\n```")
+
+        diff = extract_code(updated_section)
+        if not is_diff(diff):
+            # The model returned the entire updated file after all
+            return result
+
+        error = None
+        for attempt in range(PATCH_MAX_RETRIES + 1):
+            if attempt:
+                diff = self.correct_diff(path, file_contents, diff, error)
+                if diff is None:
+                    break
+            try:
+                patched = patch_file(path, file_contents, diff)
+                return replace_section(result, 'Updated Code', f"```{language}\n{patched.rstrip()}\n```")
+            except PatchError as e:
+                logger.warning(f"The diff of {path} does not apply: {e}")
+                error = str(e)
+
+        return replace_section(result, 'Updated Code', f"Error: The suggested changes could not be applied. {error}\n\n```diff\n{diff}\n```")
+
+    def correct_diff(self, path, file_contents, diff, error):
+        """
+        Asks the model to correct a diff that did not apply.
+
+        Returns:
+            str: The corrected diff, or None when the model did not return one.
+        """
+        try:
+            review_agent = Agents().review_agent(model=self.model)
+            retry_task = Tasks().patch_retry_task(agent=review_agent, repo=self.repo, path=path, file_contents=file_contents, diff=diff, error=error)
+            output = self.kickoff([review_agent], [retry_task])
+        except Exception as e:
+            logger.error(f"Error correcting the diff of {path}: {e}")
+            return None
+
+        corrected = extract_code(split_sections(output).get('Updated Code') or output)
+        return corrected if is_diff(corrected) else None
+
+    def review_together(self, paths):
+        """
+        Reviews several small files of the repository in a single LLM call and splits the output per file.
+
+        Parameters:
+            paths (list): The paths of the batch.
+
+        Returns:
+            tuple: The review result by path and the set of paths that got a note instead of a review (skipped or
+                deduplicated). Files that failed, were left out of the combined output or are over the line limit are
+                missing: their crews review them on their own.
+        """
+        results = {}
+        skipped = set()
+        files = {}
+
+        for path in paths:
+            file_contents = self.read_file(path, enforce_line_limit=not self.chunked)
+            if file_contents.startswith("Error:"):
+                logger.error(f"Error fetching {path}: {file_contents}")
+            elif file_contents.startswith("Skipped:"):
+                results[path] = self.skipped_result(file_contents, path=path)
+                skipped.add(path)
+            elif (near_duplicate := self.near_duplicate(path, file_contents)) is not None:
+                results[path] = near_duplicate
+                skipped.add(path)
+            elif self.chunked and len(file_contents.split('\n')) > MAX_LINE_COUNT:
+                # Reviewed in chunks by its own crew
+                continue
+            else:
+                files[path] = file_contents
+
+        if len(files) > 1:
+            logger.info(f"Reviewing {len(files)} small files in one request")
+            review_agent = Agents().review_agent(token_stream=self.token_stream, model=self.model)
+            review_task = Tasks().batch_review_task(
+                agent=review_agent, repo=self.repo, files=files,
+                static_findings={path: self.static_findings(path) for path in files},
+                diff_output=self.diff_output
             )
-            review_task = tasks.review_task(
+            for path, result in split_by_path_headings(self.kickoff([review_agent], [review_task]), files).items():
+                if result:
+                    results[path] = self.apply_updated_code(path, files[path], result)
+                    self.remember(path, files[path], results[path])
+
+        return results, skipped
+
+    def review_chunk(self, chunk, chunk_count, header):
+        """
+        Reviews one chunk of an oversized file. Each chunk gets its own agent so chunks can run in parallel.
+        """
+        try:
+            review_agent = Agents().review_agent(model=self.model)
+            review_task = Tasks().chunk_review_task(
                 agent=review_agent,
                 repo=self.repo,
                 path=self.path,
-                context=[content_task]
+                chunk=chunk,
+                chunk_count=chunk_count,
+                header=header,
+                static_findings=self.static_findings(self.path, start=chunk.start, end=chunk.end),
+                diff_output=self.diff_output
             )
+            return self.apply_updated_code(self.path, chunk.text, self.kickoff([review_agent], [review_task]))
+        except Exception as e:
+            logger.error(f"Error reviewing lines {chunk.start}-{chunk.end} of {self.path}: {e}")
+            return None
 
-            # The Crew
-            crew = Crew(
-                agents=[content_agent, review_agent],
-                tasks=[content_task, review_task],
-                verbose=2,
-                telemetry=False
-            )
+    def review_chunks(self, file_contents):
+        """
+        Splits an oversized file along class/function boundaries, reviews the chunks in parallel and merges them.
 
-            # Run the crew
-            kickoff_result = crew.kickoff()
+        Parameters:
+            file_contents (str): The content of the file.
+
+        Returns:
+            str: The merged review result in markdown format, or None if every chunk failed.
+        """
+        header, chunks = split_into_chunks(self.path, file_contents)
+        logger.info(f"Reviewing {self.path} in {len(chunks)} chunks")
+
+        with ThreadPoolExecutor(max_workers=CHUNK_REVIEW_WORKERS) as executor:
+            results = list(executor.map(wrap(lambda chunk: self.review_chunk(chunk, len(chunks), header)), chunks))
+
+        if all(result is None for result in results):
+            return None
+
+        return self.merge_chunk_results(chunks, results)
+
+    def merge_chunk_results(self, chunks, results):
+        """
+        Merges the reviews of the chunks into the single per-file review section.
+
+        Parameters:
+            chunks (list): The chunks of the file, in order.
+            results (list): The review result of every chunk, None where the review failed.
+
+        Returns:
+            str: The review result in markdown format.
+        """
+        explanations = []
+        reviews = []
+        updated_code = []
 
-            str_result = str(kickoff_result).strip()
+        for chunk, result in zip(chunks, results):
+            label = f"Lines {chunk.start}-{chunk.end}"
+            if result is None:
+                reviews.append(f"### {label}\nError: The review of this part failed.")
+                updated_code.append(chunk.text)
+                continue
 
-            result = re.sub(r'```markdown|```$', '', str_result, flags=re.DOTALL)
+            sections = split_sections(result)
+            explanations.append(f"- **{label}**: {sections.get('Explain This', '')}")
+            reviews.append(f"### {label}\n{sections.get('Code Review', '')}")
 
-            self.append_review_to_file(f"\n\n{result}\n\n")
+            # Keep the original lines when the model did not return updated code for the part, or a diff that did not apply
+            updated_section = sections.get('Updated Code')
+            if updated_section and updated_section.startswith("Error:"):
+                patch_error = updated_section.split('\n')[0]
+                reviews[-1] += f"\n\n{patch_error}"
+                updated_section = None
+            updated_code.append(extract_code(updated_section) if updated_section else chunk.text)
 
+        language = os.path.splitext(self.path)[1].lstrip('.')
+        explanation = '\n'.join(explanations)
+        review = '\n\n'.join(reviews)
+        code = '\n'.join(updated_code)
+
+        return (
+            f"## Project Name\n{self.repo}\n\n## Path\n{self.path}\n\n"
+            f"## Explain This\n{explanation}\n\n## Code Review\n{review}\n\n"
+            f"## Updated Code\n```{language}\n{code}\n```"
+        )
+
+    def publish(self, result):
+        """
+        Records the review result in the review store and shows it in the placeholder, if any. Must be called from the script thread.
+
+        Parameters:
+            result (str): The review result in markdown format.
+        """
+        self.store.append(report=self.output, path=self.path, blob_sha=self.blob_sha, result=result)
+
+        if self.output_placeholder is not None:
             self.output_placeholder.code(f"\n\n{result}\n\n", language='bash')
 
-            return result
+    def run(self):
+        """
+        Runs the review process using the defined agents and tasks.
+        """
+        result = self.review()
+        if result is None:
+            return None
 
-        except Exception as e:
-            logger.error(f"Error running ReviewCrew: {e}")
\ No newline at end of file
+        self.publish(result)
+
+        return result
+
+
+class ReviewBatch:
+    """
+    Small files of a repository reviewed together in one LLM call. The first member crew to run reviews the batch,
+    the others wait for it and review the files it left out on their own, in parallel.
+    """
+
+    def __init__(self, paths):
+        """
+        Parameters:
+            paths (list): The paths of the batch, in review order.
+        """
+        self.paths = paths
+        self.lock = threading.Lock()
+        self.started = False
+        self.done = threading.Event()
+        self.results = {}
+        self.skipped = set()
+
+    def result(self, review_crew):
+        """
+        Returns the review of the crew's file, running the batch review on the first call.
+
+        Parameters:
+            review_crew (ReviewCrew): The crew of one of the files of the batch.
+
+        Returns:
+            str: The review result in markdown format, or None if the batch did not review the file.
+        """
+        # The lock only elects the crew running the batch, the LLM call runs outside of it
+        with self.lock:
+            first = not self.started
+            self.started = True
+
+        if first:
+            try:
+                self.results, self.skipped = review_crew.review_together(self.paths)
+            except Exception as e:
+                logger.error(f"Error running review batch: {e}")
+            finally:
+                self.done.set()
+        else:
+            self.done.wait()
+
+        review_crew.skipped = review_crew.path in self.skipped
+        return self.results.get(review_crew.path)
+
+
+class DuplicateGroup:
+    """
+    Files of a run with the same blob SHA. The first file (in review order) is reviewed once, the others link to it.
+    """
+
+    def __init__(self, canonical):
+        """
+        Parameters:
+            canonical (ReviewCrew): The crew of the file reviewed for the whole group.
+        """
+        self.canonical = canonical
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.canonical_result = None
+        self.attempted = False
+        self.running = False
+
+    def result(self, review_crew):
+        """
+        Returns the review of the crew's file, reviewing the canonical file on the first call.
+
+        A failed canonical review is only retried by the canonical crew itself: the other files of the group fail
+        without reviewing it again.
+
+        Parameters:
+            review_crew (ReviewCrew): The crew of one of the files of the group.
+
+        Returns:
+            str: The review result in markdown format, or None if it failed.
+        """
+        canonical = self.canonical
+        # The lock only elects the crew reviewing the canonical file, the others wait for it outside of the lock
+        with self.lock:
+            run = (
+                self.canonical_result is None and not self.running
+                and (review_crew is canonical or not self.attempted)
+            )
+            if run:
+                self.attempted = True
+                self.running = True
+                self.done.clear()
+
+        if run:
+            result = None
+            try:
+                result = canonical.previous_result or canonical.cached_result() or canonical.review_file()
+            finally:
+                with self.lock:
+                    self.canonical_result = result
+                    self.running = False
+                self.done.set()
+        else:
+            self.done.wait()
+
+        if review_crew is canonical:
+            return self.canonical_result
+        if self.canonical_result is None:
+            review_crew.error = f"The review of the identical file {canonical.path} failed. {canonical.error or ''}".strip()
+            return None
+
+        review_crew.deduplicated = True
+        return review_crew.duplicate_result(self.canonical.path)
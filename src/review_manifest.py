@@ -0,0 +1,125 @@
+import os
+import json
+import logging
+from datetime import datetime
+from markdown_sections import split_by_path_headings
+from review_store import ReviewStore
+
+
+class ReviewManifest:
+    """
+    Records, next to each report, the commit and the per-file blob SHAs that the report covered.
+    """
+
+    def __init__(self, owner, repo):
+        """
+        Initializes the manifest store of a repository, kept in the same folder as its reports.
+
+        Parameters:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+        """
+        self.owner = owner
+        self.repo = repo
+        self.dir_path = os.path.join(owner, repo)
+
+    def save(self, output, commit_sha, files):
+        """
+        Writes the manifest of a report.
+
+        Parameters:
+            output (str): The report file name, e.g. 2024_08_05_04_31_14.md.
+            commit_sha (str): The commit the report was made from.
+            files (dict): The blob SHA of every path covered by the report.
+        """
+        os.makedirs(self.dir_path, exist_ok=True)
+
+        manifest = {
+            'owner': self.owner,
+            'repo': self.repo,
+            'report': output,
+            'commit_sha': commit_sha,
+            'created_at': datetime.now().isoformat(),
+            'files': files,
+        }
+
+        file_path = os.path.join(self.dir_path, f"{os.path.splitext(output)[0]}.json")
+        try:
+            with open(file_path, 'w') as file:
+                json.dump(manifest, file, indent=2)
+        except OSError as e:
+            logging.error(f"Error writing review manifest: {e}")
+
+    def latest(self):
+        """
+        Returns the manifest of the most recent report whose markdown file still exists.
+
+        Returns:
+            dict: The manifest, or None if the repository was never reviewed.
+        """
+        if not os.path.isdir(self.dir_path):
+            return None
+
+        # Report names are timestamps, so the lexical order is the chronological order
+        for name in sorted(os.listdir(self.dir_path), reverse=True):
+            # <report>.metrics.json holds the metrics of the run, not its manifest
+            if not name.endswith('.json') or name.endswith('.metrics.json'):
+                continue
+            try:
+                with open(os.path.join(self.dir_path, name)) as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if 'files' in manifest and os.path.exists(os.path.join(self.dir_path, manifest.get('report', ''))):
+                return manifest
+
+        return None
+
+    def sections(self, manifest):
+        """
+        Returns the per-file review sections of the report of a manifest, from the review store when it has them.
+
+        Parameters:
+            manifest (dict): The manifest returned by latest().
+
+        Returns:
+            dict: The review result of every path covered by the report.
+        """
+        results = ReviewStore(owner=self.owner, repo=self.repo).report_results(manifest['report'])
+        if results:
+            return {path: result for path, result in results.items() if path in manifest['files']}
+
+        # Reports written before the review store existed are split on their path headings
+        try:
+            with open(os.path.join(self.dir_path, manifest['report'])) as file:
+                report = file.read()
+        except OSError as e:
+            logging.error(f"Error reading previous report: {e}")
+            return {}
+
+        return split_by_path_headings(report, manifest['files'])
+
+    def carried_results(self, blob_shas, paths):
+        """
+        Returns the previous review of every path whose blob SHA did not change since the latest report.
+
+        Parameters:
+            blob_shas (dict): The current blob SHA of every path.
+            paths (list): The paths to review.
+
+        Returns:
+            tuple: The commit SHA of the latest report (or None) and the carried review result per unchanged path.
+        """
+        manifest = self.latest()
+        if manifest is None:
+            return None, {}
+
+        unchanged = [
+            path for path in paths
+            if blob_shas.get(path) and manifest['files'].get(path) == blob_shas.get(path)
+        ]
+        if not unchanged:
+            return manifest.get('commit_sha'), {}
+
+        sections = self.sections(manifest)
+        return manifest.get('commit_sha'), {path: sections[path] for path in unchanged if path in sections}
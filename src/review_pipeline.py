@@ -0,0 +1,602 @@
+import os
+import queue
+import logging
+import threading
+import uuid
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+from constants import (
+    APP_BATCH_TOKEN_BUDGET, APP_CHUNKED_REVIEW, APP_DEDUP, APP_DIFF_OUTPUT, APP_INCREMENTAL_REVIEW, APP_INJECT_FILE_CONTENTS,
+    APP_MAX_CONCURRENCY, APP_MODEL_ROUTING, APP_PATH_AGENT_FALLBACK, APP_REPO_FILE_SAMPLE, APP_REPO_FULLPATH_SAMPLE,
+    APP_REPO_OUTPUT, APP_REPO_STRUCTURE, APP_SNAPSHOT_MODE, APP_STATIC_ANALYSIS, APP_STATIC_ONLY, APP_TRIAGE
+)
+from agents import Agents
+from tasks import Tasks
+from github_helper import IGNORE_DIRS, get_commit_sha, get_tree_entries, render_file_tree
+from path_resolver import PathIndex, parse_paths
+from repo_snapshot import RepoSnapshot
+from local_source import LocalSource
+from pull_request import fetch_changes, local_changes, parse_pull_request
+from review_cache import ReviewCache, hash_text
+from batching import estimate_tokens, estimate_tokens_from_size, pack_files
+from review_crew import DuplicateGroup, ReviewBatch, ReviewCrew
+from dedup import DedupIndex, settings_key
+from review_manifest import ReviewManifest
+from job_queue import JOB_POLL_INTERVAL, JobQueue
+from review_store import ReviewStore
+from llm_controller import get_controller
+from tracing import Tracer, record_tokens, wrap
+from tools import fetch_file_contents
+from triage import TRIAGE_RULES_FILE, Triage
+from static_analysis import analyze_files, is_supported
+from model_router import ModelRouter
+
+
+def parse_github_url(github_url):
+    """
+    Extracts the owner and repository name from a GitHub URL.
+
+    Parameters:
+        github_url (str): The URL, e.g. https://github.com/josoroma/code_challenge_reviewer.
+
+    Returns:
+        tuple: The owner and the repository name.
+
+    Raises:
+        ValueError: When the URL does not point to a repository.
+    """
+    split_url = github_url.strip().rstrip('/').split('/')
+    if len(split_url) < 5:
+        raise ValueError(f"Not a GitHub repository URL: {github_url}")
+
+    owner = split_url[3]
+    repo = split_url[4].removesuffix('.git')
+    return owner, repo
+
+
+def parse_source(source):
+    """
+    Tells a local checkout from a GitHub URL.
+
+    Parameters:
+        source (str): A GitHub repository URL, a local folder or a file:// URL of a local folder.
+
+    Returns:
+        tuple: The owner, the repository name and the local folder (None for GitHub repositories).
+
+    Raises:
+        ValueError: When the source is neither a local folder nor a GitHub repository URL.
+    """
+    source = source.strip()
+    local_path = os.path.expanduser(source.removeprefix('file://'))
+    if source.startswith('file://') or os.path.isdir(local_path):
+        local_source = LocalSource(local_path)
+        return local_source.owner, local_source.repo, local_source.root
+
+    owner, repo = parse_github_url(source)
+    return owner, repo, None
+
+
+class ReviewPipeline:
+    """
+    The tree -> paths -> review pipeline of one repository, without any UI dependency.
+
+    The Streamlit app and the headless batch runner both drive it; the UI hooks in through placeholders and on_poll.
+    """
+
+    def __init__(
+        self, owner, repo,
+        max_concurrency=APP_MAX_CONCURRENCY,
+        inject_content=APP_INJECT_FILE_CONTENTS,
+        snapshot_mode=APP_SNAPSHOT_MODE,
+        chunked=APP_CHUNKED_REVIEW,
+        batch_token_budget=APP_BATCH_TOKEN_BUDGET,
+        stream_tokens=False,
+        incremental=APP_INCREMENTAL_REVIEW,
+        path_agent_fallback=APP_PATH_AGENT_FALLBACK,
+        triage=APP_TRIAGE,
+        dedup=APP_DEDUP,
+        local_path=None,
+        static_analysis=APP_STATIC_ANALYSIS,
+        static_only=APP_STATIC_ONLY,
+        diff_output=APP_DIFF_OUTPUT,
+        pull_request=None,
+        model_routing=APP_MODEL_ROUTING,
+    ):
+        """
+        Initializes the pipeline of a repository with the review options.
+
+        Parameters:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            max_concurrency (int): Number of files reviewed in parallel.
+            inject_content (bool): Embed the file contents in the review task instead of using content_agent.
+            snapshot_mode (bool): Download the repository once as a tarball and read every file locally.
+            chunked (bool): Review files over the line count limit in chunks.
+            batch_token_budget (int): Token budget of the batches of small files, 0 disables batching.
+            stream_tokens (bool): Stream the review tokens into each crew's token_stream.
+            incremental (bool): Only review files changed since the last report.
+            path_agent_fallback (bool): Ask the path agent when the input is not an exact file, folder or glob.
+            triage (bool): Drop generated, vendored, binary and lock files before fetching and reviewing them.
+            dedup (bool): Review identical files once and reuse the reviews of near-duplicate files.
+            local_path (str): Review this local checkout instead of fetching the repository from GitHub.
+            static_analysis (bool): Analyze the files statically first and give the findings to the review agent.
+            static_only (bool): Report the static analysis alone, without any LLM call (the path agent included).
+            diff_output (bool): Ask for a unified diff under "Updated Code" and render the patched file (content injection only).
+            pull_request (str): Review only the changed hunks of this pull request (number or URL) or base..head ref pair.
+            model_routing (bool): Review low-risk files with FAST_MODEL_NAME and complex or sensitive ones with the strong model.
+
+        Raises:
+            ValueError: When pull_request is neither a pull request nor a ref pair.
+        """
+        self.owner = owner
+        self.repo = repo
+        self.max_concurrency = max_concurrency
+        self.inject_content = inject_content
+        self.snapshot_mode = snapshot_mode
+        self.chunked = chunked
+        self.batch_token_budget = batch_token_budget
+        self.stream_tokens = stream_tokens
+        self.incremental = incremental
+        self.pull_request = parse_pull_request(pull_request) if pull_request else None
+        self.path_agent_fallback = path_agent_fallback and not static_only and self.pull_request is None
+        self.triage = triage
+        self.dedup = dedup
+        self.local_path = local_path
+        self.static_analysis = static_analysis or static_only
+        self.static_only = static_only
+        self.diff_output = diff_output
+        self.model_routing = model_routing and not static_only
+
+        # Runs started in the same second (batch workers, concurrent sessions) must not share a report
+        self.output = f"{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}_{os.getpid()}_{uuid.uuid4().hex[:8]}.md"
+        self.commit_sha = None
+        self.tree_entries = []
+        self.snapshot = None
+        self.repo_tree = ""
+        self.base_sha = None
+        self.carried_results = {}
+        self.directory = ""
+        self.skipped = {}
+        self.duplicate_count = 0
+        self.analyses = {}
+        self.contents = {}
+        self.routes = {}
+        self.changes = {}
+        self.head_ref = None
+        self.job_queue = None
+        self.job_id = None
+        self.resumed_count = 0
+        self.store = ReviewStore(owner=owner, repo=repo)
+        self.tracer = Tracer(owner=owner, repo=repo)
+        self.summary = None
+
+    def fetch_tree(self):
+        """
+        Fetches the tree of the repository, pinned to the current commit.
+
+        Returns:
+            str: The tree structure as an indented text tree.
+        """
+        with self.tracer.span('fetch_tree'):
+            if self.pull_request is not None:
+                self.fetch_changes()
+
+            if self.local_path:
+                # git ls-files (or a directory walk) and memory-mapped reads: no GitHub request at all
+                self.snapshot = LocalSource(self.local_path, ref=self.head_ref).open()
+                self.commit_sha = self.snapshot.sha
+                self.tree_entries = self.snapshot.entries()
+            elif self.snapshot_mode:
+                # One tarball download per commit, then every read is local
+                self.commit_sha = self.head_ref or get_commit_sha(owner=self.owner, repo=self.repo)
+                self.snapshot = RepoSnapshot(owner=self.owner, repo=self.repo, sha=self.commit_sha).open()
+                self.tree_entries = self.snapshot.entries()
+            else:
+                # One recursive Git Trees request pinned to the current commit
+                self.commit_sha, self.tree_entries = get_tree_entries(owner=self.owner, repo=self.repo, sha=self.head_ref)
+
+            self.repo_tree = render_file_tree(self.tree_entries)
+        return self.repo_tree
+
+    def fetch_changes(self):
+        """
+        Fetches the changed files of the pull request (pulls or compare API), or runs git diff in a local checkout.
+        The tree and the file contents are then pinned to the head of the changes.
+        """
+        with self.tracer.span('fetch_changes'):
+            if self.local_path:
+                self.changes = local_changes(self.local_path, self.pull_request)
+                self.head_ref = self.pull_request.head
+            else:
+                self.head_ref, self.changes = fetch_changes(self.owner, self.repo, self.pull_request)
+
+    def resolve_paths(
+        self, repo_directory,
+        repo_structure=APP_REPO_STRUCTURE,
+        repo_file_sample=APP_REPO_FILE_SAMPLE,
+        repo_fullpath_sample=APP_REPO_FULLPATH_SAMPLE,
+        repo_output_sample=APP_REPO_OUTPUT,
+    ):
+        """
+        Resolves the repo directory into file paths, falling back to the path agent for fuzzy input.
+
+        Parameters:
+            repo_directory (str): The user input (file, folder or glob).
+            repo_structure (str): The tree sample given to the path agent.
+            repo_file_sample (str): The file sample given to the path agent.
+            repo_fullpath_sample (str): The full path sample given to the path agent.
+            repo_output_sample (str): The array output sample given to the path agent.
+
+        Returns:
+            list: The full paths of the files to review, after triage.
+
+        Raises:
+            ValueError: When the reply of the path agent cannot be parsed.
+        """
+        with self.tracer.span('resolve_paths'):
+            self.directory = repo_directory
+            path_index = PathIndex(self.tree_entries, ignore_dirs=IGNORE_DIRS)
+
+            paths = path_index.resolve(repo_directory)
+            if self.pull_request is not None:
+                # Only the files the pull request changed, the repo directory narrows them down (empty for all of them)
+                self.directory = f"{self.pull_request.label}:{repo_directory}"
+                return self.triage_paths([path for path in paths if path in self.changes], requested=PathIndex.normalize(repo_directory))
+            if paths or not self.path_agent_fallback:
+                return self.triage_paths(paths, requested=PathIndex.normalize(repo_directory))
+
+            path_agent = Agents().path_agent()
+            path_task = Tasks().get_file_path_task(
+                agent=path_agent, file_tree=self.repo_tree,
+                repo_directory=repo_directory,
+                repo_structure=repo_structure,
+                repo_file_sample=repo_file_sample,
+                repo_fullpath_sample=repo_fullpath_sample,
+                repo_output_sample=repo_output_sample
+            )
+            task_output = get_controller().call(path_task.execute_sync)
+
+            # Tasks run outside a crew have no usage_metrics, the agent keeps its own token counts
+            usage_metrics = path_agent._token_process.get_summary()
+            record_tokens(usage_metrics.get('prompt_tokens', 0), usage_metrics.get('completion_tokens', 0))
+
+            # Only keep paths that actually exist in the tree
+            paths = [path for path in parse_paths(task_output) if path in path_index.file_set]
+            if not paths:
+                raise ValueError("Unable to parse the paths string.")
+            return self.triage_paths(paths)
+
+    def read_repo_file(self, path):
+        """
+        Returns the contents of a repository file, or an empty string when it is missing or unreadable.
+        """
+        if not any(item['path'] == path and item['type'] == 'blob' for item in self.tree_entries):
+            return ""
+        contents = fetch_file_contents(path, self.owner, self.repo, snapshot=self.snapshot, enforce_line_limit=False, ref=self.commit_sha)
+        return "" if contents.startswith(("Error:", "Skipped:")) else contents
+
+    def triage_paths(self, paths, requested=None):
+        """
+        Drops generated, vendored, binary and lock files before any content fetch, following the repository
+        .gitattributes (linguist-generated, linguist-vendored) and .reviewignore rules.
+
+        Parameters:
+            paths (list): The resolved file paths.
+            requested (str): The normalized user input. A file asked for by its exact path is always kept.
+
+        Returns:
+            list: The paths to review, in order. The dropped ones are kept in self.skipped with their reason.
+        """
+        self.skipped = {}
+        if not self.triage or paths == [requested]:
+            return paths
+
+        with self.tracer.span('triage'):
+            triage = Triage(
+                rules=self.read_repo_file(TRIAGE_RULES_FILE).splitlines(),
+                gitattributes=self.read_repo_file('.gitattributes')
+            )
+            sizes = {item['path']: item.get('size') for item in self.tree_entries if item['type'] == 'blob'}
+            paths, self.skipped = triage.filter(paths, sizes=sizes, snapshot=self.snapshot)
+        return paths
+
+    def create_crews(self, paths, placeholder_factory=None):
+        """
+        Creates one review crew per path, in path order.
+
+        Parameters:
+            paths (list): The paths to review.
+            placeholder_factory (callable): Creates the UI placeholder of each crew, e.g. st.empty.
+
+        Returns:
+            list: The review crews.
+        """
+        # Unchanged files (same blob SHA, prompts and model) are served from the review cache
+        review_cache = ReviewCache()
+        # Near-duplicates are found from the file contents, so only when the contents are injected
+        reviews_files = self.pull_request is None and not self.static_only
+        dedup_index = DedupIndex() if self.dedup and self.inject_content and reviews_files else None
+
+        # The router scores files from their static analysis as well
+        if self.static_analysis or self.model_routing:
+            self.analyze(paths)
+        if self.model_routing:
+            self.route(paths)
+        blob_shas = {item['path']: item['sha'] for item in self.tree_entries if item['type'] == 'blob'}
+
+        # Incremental mode: reuse the sections of files that did not change since the last report
+        if self.incremental and self.pull_request is None:
+            self.base_sha, self.carried_results = ReviewManifest(owner=self.owner, repo=self.repo).carried_results(blob_shas, paths)
+
+        review_crews = [
+            ReviewCrew(
+                owner=self.owner, repo=self.repo, path=path, output=self.output,
+                blob_sha=blob_shas.get(path), cache=review_cache,
+                inject_content=self.inject_content, snapshot=self.snapshot,
+                previous_result=self.carried_results.get(path), chunked=self.chunked,
+                stream_tokens=self.stream_tokens, store=self.store, dedup=dedup_index,
+                static_analysis=self.analyses if self.static_analysis else None, static_only=self.static_only,
+                diff_output=self.diff_output and self.inject_content,
+                change=self.changes.get(path), ref=self.commit_sha, route=self.routes.get(path), contents=self.contents,
+                output_placeholder=placeholder_factory() if placeholder_factory else None
+            )
+            for path in paths
+        ]
+
+        # Resume the unfinished job of the same commit, directory and settings: files it already reviewed are not reviewed
+        # again. A job made another way (static-only, another pull request, prompts or models) is not resumed
+        job_settings = hash_text(
+            'static-only' if self.static_only else 'review',
+            self.pull_request.label if self.pull_request is not None else '',
+            *sorted({settings_key(review_crew.prompt_version(), review_crew.model) for review_crew in review_crews})
+        )
+        self.job_queue = JobQueue()
+        self.job_id, self.resumed_count = self.job_queue.open_job(
+            self.owner, self.repo, self.commit_sha, self.directory, paths, settings=job_settings
+        )
+        if self.resumed_count:
+            completed = self.job_queue.finished(self.job_id, paths)
+            for review_crew in review_crews:
+                if completed.get(review_crew.path) is not None:
+                    review_crew.previous_result = completed[review_crew.path]
+
+        if self.dedup and reviews_files:
+            self.plan_duplicates(review_crews)
+        self.plan_review_batches(review_crews)
+
+        return review_crews
+
+    def analyze(self, paths):
+        """
+        Runs the static pre-analysis of the files with an analyzer: contents are read concurrently, then analyzed on a
+        process pool. The analyses are kept in self.analyses, the contents read from the API in self.contents.
+
+        Parameters:
+            paths (list): The paths to review.
+        """
+        with self.tracer.span('static_analysis'):
+            def read(path):
+                return path, fetch_file_contents(path, self.owner, self.repo, snapshot=self.snapshot, enforce_line_limit=False, ref=self.commit_sha)
+
+            with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as executor:
+                contents = dict(executor.map(wrap(read), [path for path in paths if is_supported(path)]))
+
+            files = {path: text for path, text in contents.items() if not text.startswith(("Error:", "Skipped:"))}
+            self.analyses = analyze_files(files)
+            if self.snapshot is None:
+                # The crews review these contents instead of fetching every file a second time
+                self.contents = files
+
+        logging.info(f"Statically analyzed {len(self.analyses)} files")
+
+    def route(self, paths):
+        """
+        Picks the model of every file from its size, complexity, language and path. The decisions are kept in self.routes.
+
+        Parameters:
+            paths (list): The paths to review.
+        """
+        router = ModelRouter()
+        sizes = {item['path']: item.get('size') for item in self.tree_entries if item['type'] == 'blob'}
+        self.routes = {path: router.route(path, size=sizes.get(path), analysis=self.analyses.get(path)) for path in paths}
+
+        strong_count = sum(1 for decision in self.routes.values() if decision['tier'] == 'strong')
+        logging.info(f"Routed {len(paths) - strong_count} files to {router.fast_model} and {strong_count} to {router.strong_model}")
+
+    def plan_duplicates(self, review_crews):
+        """
+        Groups the files with the same blob SHA: the first one is reviewed, the others link to its review.
+        """
+        crews_by_sha = {}
+        for review_crew in review_crews:
+            if review_crew.blob_sha:
+                crews_by_sha.setdefault(review_crew.blob_sha, []).append(review_crew)
+
+        self.duplicate_count = 0
+        for group in crews_by_sha.values():
+            if len(group) > 1:
+                duplicate_group = DuplicateGroup(group[0])
+                for review_crew in group:
+                    review_crew.duplicates = duplicate_group
+                self.duplicate_count += len(group) - 1
+
+    def estimate_file_tokens(self, path, size):
+        """
+        Counts the tokens of a file when its contents are at hand (read for the static analysis, or in the snapshot),
+        and estimates them from its size otherwise.
+
+        Parameters:
+            path (str): The file path.
+            size (int): The file size in bytes, from the tree.
+
+        Returns:
+            int: The token count of the file.
+        """
+        contents = self.contents.get(path)
+        if contents is None and self.snapshot is not None:
+            try:
+                contents = str(self.snapshot.read_bytes(path), 'utf-8', errors='replace')
+            except Exception:
+                contents = None
+        return estimate_tokens(contents) if contents is not None else estimate_tokens_from_size(size)
+
+    def plan_review_batches(self, review_crews):
+        """
+        Groups small files that still need a review into batches reviewed with a single LLM call.
+        """
+        if not self.inject_content or self.batch_token_budget <= 0 or self.static_only or self.pull_request is not None:
+            return
+
+        sizes = {item['path']: item.get('size') or 0 for item in self.tree_entries if item['type'] == 'blob'}
+        file_tokens = {
+            review_crew.path: self.estimate_file_tokens(review_crew.path, sizes.get(review_crew.path, 0))
+            for review_crew in review_crews
+            if review_crew.previous_result is None and review_crew.cached_result() is None
+            and (review_crew.duplicates is None or review_crew.duplicates.canonical is review_crew)
+        }
+
+        # A batch is reviewed by one model: files routed to different models are packed apart
+        models = {review_crew.path: review_crew.model for review_crew in review_crews}
+        for model in dict.fromkeys(models[path] for path in file_tokens):
+            tier_tokens = {path: tokens for path, tokens in file_tokens.items() if models[path] == model}
+            for batch_paths in pack_files(tier_tokens, budget=self.batch_token_budget):
+                review_batch = ReviewBatch(batch_paths)
+                for review_crew in review_crews:
+                    if review_crew.path in batch_paths:
+                        review_crew.batch = review_batch
+
+    def work(self, crews_by_path, finished, stop):
+        """
+        Claims and reviews items of the job until none is left. Runs on a worker thread.
+
+        Parameters:
+            crews_by_path (dict): The review crew of every path.
+            finished (queue.Queue): Receives the (path, result) of every item this worker finished.
+            stop (threading.Event): Set when the run is abandoned.
+        """
+        while not stop.is_set():
+            path = self.job_queue.claim(self.job_id)
+            if path is None:
+                # Items still running elsewhere, or waiting for their retry backoff
+                if self.job_queue.remaining(self.job_id) == 0:
+                    return
+                stop.wait(JOB_POLL_INTERVAL)
+                continue
+
+            review_crew = crews_by_path[path]
+            route = review_crew.route
+            attributes = {'model': route['model'], 'tier': route['tier']} if route else {}
+            with self.tracer.span('review', path=path, **attributes):
+                result = review_crew.review()
+
+            if result is not None:
+                self.job_queue.complete(self.job_id, path, result)
+                finished.put((path, result))
+            elif not self.job_queue.fail(self.job_id, path, review_crew.error or "The review crew did not return a result."):
+                finished.put((path, None))
+            else:
+                # A file of a failed batch is retried on its own
+                review_crew.batch = None
+
+    def run(self, review_crews, on_poll=None):
+        """
+        Runs the review crews with up to max_concurrency worker threads claiming files from the job queue.
+
+        Failed reviews are retried with a backoff. Results are published to the review store and yielded in the original
+        path order, from the calling thread. The report is written when the run ends, even when it is abandoned partway.
+
+        Parameters:
+            review_crews (list): The crews returned by create_crews.
+            on_poll (callable): Called from the calling thread while waiting, with the crews still running.
+
+        Yields:
+            tuple: The review crew and its result (None if the review failed), in path order.
+        """
+        crews_by_path = {review_crew.path: review_crew for review_crew in review_crews}
+        index_of = {review_crew.path: index for index, review_crew in enumerate(review_crews)}
+        uncollected = set(crews_by_path)
+        finished = queue.Queue()
+        stop = threading.Event()
+
+        results = {}
+        next_index = 0
+        reviewed_files = {}
+        completed = False
+
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_concurrency))
+        try:
+            workers = [
+                executor.submit(self.work, crews_by_path, finished, stop)
+                for _ in range(max(1, min(self.max_concurrency, len(review_crews))))
+            ]
+
+            while uncollected:
+                _, running = wait(workers, timeout=0.2)
+
+                while not finished.empty():
+                    path, result = finished.get()
+                    results[index_of[path]] = result
+                    uncollected.discard(path)
+
+                if not running:
+                    for future in workers:
+                        future.result()
+                    # Items finished by another run of the same job (e.g. before a Streamlit rerun)
+                    for path, result in self.job_queue.finished(self.job_id, uncollected).items():
+                        results[index_of[path]] = result
+                    for path in uncollected:
+                        results.setdefault(index_of[path], None)
+                    uncollected.clear()
+
+                if on_poll is not None:
+                    on_poll([review_crews[index] for index in range(next_index, len(review_crews)) if index not in results])
+
+                # Publish every result whose predecessors are done, keeping the path order
+                while next_index in results:
+                    review_crew = review_crews[next_index]
+                    result = results.pop(next_index)
+                    if result is not None:
+                        review_crew.publish(result)
+                        reviewed_files[review_crew.path] = review_crew.blob_sha
+                    next_index += 1
+                    yield review_crew, result
+            completed = True
+        finally:
+            # An abandoned run (closed generator, Streamlit rerun) returns at once: the workers stop claiming items and
+            # finish their current review on their own
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.finish(review_crews, reviewed_files, completed)
+
+    def finish(self, review_crews, reviewed_files, completed):
+        """
+        Writes the report, the metrics and the manifest of the run. An abandoned run writes them too, with the files
+        published so far, but keeps its job open for the next run to resume and its snapshot open for the workers
+        still reviewing.
+
+        Parameters:
+            review_crews (list): The crews of the run.
+            reviewed_files (dict): The blob SHA of every published file.
+            completed (bool): Whether every file of the run is done.
+        """
+        if completed:
+            self.job_queue.close_job(self.job_id)
+
+        # The markdown report is rendered from the review store
+        with self.tracer.span('write_report'):
+            self.store.write_report(self.output)
+
+        # Every file was read, the snapshot of the run is not needed anymore
+        if completed and self.snapshot is not None:
+            self.snapshot.close()
+
+        # Per-stage and per-file timings, HTTP traffic, tokens and cost of the run
+        self.summary = self.tracer.write(self.output)
+        logging.info(f"LLM controller after the run: {get_controller().stats()}")
+
+        # Record what this report covered, as the base of the next incremental review. A pull request review only
+        # covers changed hunks and a static-only report holds no review, so neither is ever a base
+        if self.pull_request is None and not self.static_only:
+            ReviewManifest(owner=self.owner, repo=self.repo).save(output=self.output, commit_sha=self.commit_sha, files=reviewed_files)
+        logging.info(f"Reviewed {len(reviewed_files)} of {len(review_crews)} files of {self.owner}/{self.repo} into {self.output}")
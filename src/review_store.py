@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import logging
+import threading
+from markdown_sections import split_sections
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks on Windows: appends are only serialized within the process
+    fcntl = None
+
+REVIEW_STORE_FILE = 'reviews.jsonl'
+REVIEW_INDEX_FILE = 'reviews.idx'
+
+
+class ReviewStore:
+    """
+    Append-only store of every review of a repository: one JSON record per reviewed file, next to its reports.
+
+    reviews.jsonl holds the records (path, blob SHA, report, timestamp, result and its parsed sections).
+    reviews.idx holds one [offset, length, report, path] line per record, so the latest review of a file and the
+    records of a report are read with a seek instead of scanning the whole history. Markdown reports are rendered
+    from the store on demand.
+    """
+
+    def __init__(self, owner, repo):
+        """
+        Opens the store of a repository, kept in the same folder as its reports.
+
+        Parameters:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+        """
+        self.owner = owner
+        self.repo = repo
+        self.dir_path = os.path.join(owner, repo)
+        self.records_path = os.path.join(self.dir_path, REVIEW_STORE_FILE)
+        self.index_path = os.path.join(self.dir_path, REVIEW_INDEX_FILE)
+
+        self.lock = threading.Lock()
+        self.index_position = 0
+        self.indexed_end = 0
+        self.indexed_offsets = set()
+        self.latest_by_path = {}
+        self.records_by_report = {}
+
+    def add_to_index(self, offset, length, report, path):
+        if offset in self.indexed_offsets:
+            return
+        self.indexed_offsets.add(offset)
+        self.latest_by_path[path] = (offset, length)
+        self.records_by_report.setdefault(report, []).append((path, offset, length))
+        self.indexed_end = max(self.indexed_end, offset + length)
+
+    def refresh(self):
+        """
+        Reads the index lines appended since the last call, by this or another process.
+
+        Records written without their index line (e.g. a crash between both writes) are recovered from the store.
+        """
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as file:
+                file.seek(self.index_position)
+                for line in file:
+                    if not line.endswith(b'\n'):
+                        # Partially written line, read it on the next refresh
+                        break
+                    self.index_position += len(line)
+                    try:
+                        self.add_to_index(*json.loads(line))
+                    except (ValueError, TypeError):
+                        logging.error(f"Skipping invalid review index line in {self.index_path}")
+
+        if os.path.exists(self.records_path) and os.path.getsize(self.records_path) > self.indexed_end:
+            self.recover()
+
+    def recover(self):
+        """
+        Indexes the records past the end of the index.
+        """
+        with open(self.records_path, 'rb') as file:
+            file.seek(self.indexed_end)
+            offset = self.indexed_end
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                    self.add_to_index(offset, len(line), record['report'], record['path'])
+                except (ValueError, KeyError):
+                    logging.error(f"Skipping invalid review record at offset {offset} of {self.records_path}")
+                offset += len(line)
+
+    def append(self, report, path, blob_sha, result):
+        """
+        Appends the review of a file to the store and to the index.
+
+        Parameters:
+            report (str): The report file name the review belongs to, e.g. 2024_08_05_04_31_14.md.
+            path (str): The path of the reviewed file.
+            blob_sha (str): The git blob SHA of the reviewed file.
+            result (str): The review result in markdown format.
+        """
+        record = {
+            'path': path,
+            'blob_sha': blob_sha,
+            'report': report,
+            'created_at': time.time(),
+            'sections': split_sections(result),
+            'result': result,
+        }
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with self.lock:
+            os.makedirs(self.dir_path, exist_ok=True)
+            with open(self.records_path, 'ab') as records:
+                if fcntl is not None:
+                    fcntl.flock(records, fcntl.LOCK_EX)
+                try:
+                    records.seek(0, os.SEEK_END)
+                    offset = records.tell()
+                    records.write(line)
+                    records.flush()
+
+                    with open(self.index_path, 'ab') as index:
+                        index.write((json.dumps([offset, len(line), report, path], ensure_ascii=False) + '\n').encode('utf-8'))
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(records, fcntl.LOCK_UN)
+
+    def read_record(self, file, offset, length):
+        file.seek(offset)
+        return json.loads(file.read(length))
+
+    def latest(self, path):
+        """
+        Returns the latest review record of a file.
+
+        Parameters:
+            path (str): The path of the file.
+
+        Returns:
+            dict: The record, or None if the file was never reviewed.
+        """
+        with self.lock:
+            self.refresh()
+            location = self.latest_by_path.get(path)
+
+        if location is None:
+            return None
+        with open(self.records_path, 'rb') as file:
+            return self.read_record(file, *location)
+
+    def report_records(self, report):
+        """
+        Yields the records of a report in the order they were published, reading them one at a time.
+
+        Parameters:
+            report (str): The report file name.
+
+        Yields:
+            dict: The review record of every file of the report.
+        """
+        with self.lock:
+            self.refresh()
+            locations = list(self.records_by_report.get(report, []))
+
+        if not locations:
+            return
+        with open(self.records_path, 'rb') as file:
+            for _, offset, length in locations:
+                yield self.read_record(file, offset, length)
+
+    def report_results(self, report):
+        """
+        Returns the review result of every file of a report.
+
+        Returns:
+            dict: The review result by path.
+        """
+        return {record['path']: record['result'] for record in self.report_records(report)}
+
+    def render_report(self, report):
+        """
+        Renders a report in markdown format, one file at a time.
+
+        Parameters:
+            report (str): The report file name.
+
+        Yields:
+            str: The markdown of every file of the report.
+        """
+        for record in self.report_records(report):
+            yield f"\n\n# {record['path']}\n\n\n\n{record['result']}\n\n"
+
+    def write_report(self, report):
+        """
+        Writes the markdown file of a report from the store.
+
+        Parameters:
+            report (str): The report file name.
+        """
+        file_path = os.path.join(self.dir_path, report)
+        try:
+            os.makedirs(self.dir_path, exist_ok=True)
+            with open(f"{file_path}.tmp", 'w') as file:
+                file.writelines(self.render_report(report))
+            os.replace(f"{file_path}.tmp", file_path)
+        except OSError as e:
+            logging.error(f"Error writing report: {e}")
@@ -0,0 +1,261 @@
+import io
+import os
+import re
+import ast
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    # Optional: richer lint diagnostics when pyflakes is installed
+    from pyflakes.api import check as pyflakes_check
+    from pyflakes.reporter import Reporter
+except ImportError:
+    pyflakes_check = None
+
+# Configurable static analysis
+STATIC_ANALYSIS_WORKERS = int(os.getenv('STATIC_ANALYSIS_WORKERS', os.cpu_count() or 2))
+STATIC_MAX_COMPLEXITY = int(os.getenv('STATIC_MAX_COMPLEXITY', 10))
+STATIC_MAX_FUNCTION_LINES = int(os.getenv('STATIC_MAX_FUNCTION_LINES', 50))
+STATIC_MAX_FINDINGS = int(os.getenv('STATIC_MAX_FINDINGS', 30))  # Per file, keeps the review prompt short
+STATIC_POOL_MIN_FILES = 8  # Fewer files are analyzed in process: starting the pool would cost more
+
+# Changes whenever the findings of the same file could change, so it belongs in the review cache key
+ANALYSIS_VERSION = f"1:{STATIC_MAX_COMPLEXITY}:{STATIC_MAX_FUNCTION_LINES}:{STATIC_MAX_FINDINGS}:{pyflakes_check is not None}"
+
+# Nodes adding a decision point to the cyclomatic complexity of a function
+BRANCH_NODES = (
+    ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler,
+    ast.Assert, ast.comprehension, ast.match_case,
+)
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+MUTABLE_DEFAULTS = (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)
+BROAD_EXCEPTIONS = {'Exception', 'BaseException'}
+PYFLAKES_LINE = re.compile(r'^[^:]*:(\d+):(?:\d+:)? (.*)$')
+
+
+def finding(line, rule, message):
+    return {'line': line, 'rule': rule, 'message': message}
+
+
+def cyclomatic_complexity(function):
+    """
+    Returns the cyclomatic complexity of a function, not counting the functions and classes nested in it.
+    """
+    score = 1
+    stack = list(ast.iter_child_nodes(function))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, SCOPE_NODES):
+            continue
+        if isinstance(node, BRANCH_NODES):
+            score += 1
+        elif isinstance(node, ast.BoolOp):
+            score += len(node.values) - 1
+        stack.extend(ast.iter_child_nodes(node))
+    return score
+
+
+def exception_names(handler):
+    """
+    Returns the names of the exception classes caught by an except clause.
+    """
+    nodes = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return {node.id if isinstance(node, ast.Name) else getattr(node, 'attr', '') for node in nodes}
+
+
+def unused_imports(tree):
+    """
+    Finds the module-level imports never referenced, for when pyflakes is not installed.
+    """
+    imported = {}
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name != '*':
+                    imported.setdefault(alias.asname or alias.name.split('.')[0], node.lineno)
+
+    used = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    # Names re-exported through __all__ count as used
+    used.update(
+        node.value for node in ast.walk(tree)
+        if isinstance(node, ast.Constant) and isinstance(node.value, str)
+    )
+    return [finding(line, 'unused-import', f"`{name}` is imported but unused") for name, line in imported.items() if name not in used]
+
+
+def lint(path, contents, tree):
+    """
+    Collects lint diagnostics with pyflakes, or the built-in unused import check without it.
+    """
+    if pyflakes_check is None:
+        return [] if path.endswith('__init__.py') else unused_imports(tree)
+
+    output = io.StringIO()
+    pyflakes_check(contents, path, Reporter(output, output))
+    findings = []
+    for line in output.getvalue().splitlines():
+        match = PYFLAKES_LINE.match(line)
+        if match:
+            findings.append(finding(int(match.group(1)), 'pyflakes', match.group(2)))
+    return findings
+
+
+def analyze_python(path, contents):
+    """
+    Analyzes a Python module with ast: complexity and length of functions, broad excepts, mutable defaults,
+    eval/exec calls and lint diagnostics.
+
+    Returns:
+        tuple: The findings and the metrics of the module.
+    """
+    try:
+        tree = ast.parse(contents)
+    except SyntaxError as e:
+        return [finding(e.lineno or 1, 'syntax-error', e.msg)], {}
+
+    findings = []
+    complexities = []
+    for node in ast.walk(tree):
+        if isinstance(node, FUNCTION_NODES):
+            complexity = cyclomatic_complexity(node)
+            complexities.append(complexity)
+            if complexity > STATIC_MAX_COMPLEXITY:
+                findings.append(finding(node.lineno, 'complexity', f"`{node.name}` has a cyclomatic complexity of {complexity} (limit {STATIC_MAX_COMPLEXITY})"))
+
+            length = node.end_lineno - node.lineno + 1
+            if length > STATIC_MAX_FUNCTION_LINES:
+                findings.append(finding(node.lineno, 'function-length', f"`{node.name}` is {length} lines long (limit {STATIC_MAX_FUNCTION_LINES})"))
+
+            for default in node.args.defaults + [default for default in node.args.kw_defaults if default is not None]:
+                if isinstance(default, MUTABLE_DEFAULTS):
+                    findings.append(finding(default.lineno, 'mutable-default', f"`{node.name}` has a mutable default argument"))
+
+        elif isinstance(node, ast.ExceptHandler):
+            if node.type is None:
+                findings.append(finding(node.lineno, 'bare-except', "Bare `except:` also catches KeyboardInterrupt and SystemExit"))
+            elif exception_names(node) & BROAD_EXCEPTIONS:
+                findings.append(finding(node.lineno, 'broad-except', f"`except {ast.unparse(node.type)}` catches every error"))
+            if all(isinstance(statement, ast.Pass) for statement in node.body):
+                findings.append(finding(node.lineno, 'silenced-exception', "The exception is silently ignored"))
+
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ('eval', 'exec'):
+            findings.append(finding(node.lineno, 'eval', f"`{node.func.id}` runs arbitrary code"))
+
+    findings.extend(lint(path, contents, tree))
+
+    metrics = {
+        'functions': len(complexities),
+        'classes': sum(isinstance(node, ast.ClassDef) for node in ast.walk(tree)),
+        'max_complexity': max(complexities, default=0),
+    }
+    return findings, metrics
+
+
+# Analyzers by file extension
+ANALYZERS = {'.py': analyze_python}
+
+
+def is_supported(path):
+    """
+    Tells whether the file type has a static analyzer.
+    """
+    return os.path.splitext(path)[1] in ANALYZERS
+
+
+def analyze_file(path, contents):
+    """
+    Analyzes one file. Runs in a worker process, so it only takes and returns plain data.
+
+    Parameters:
+        path (str): The repository-relative file path.
+        contents (str): The contents of the file.
+
+    Returns:
+        dict: The path, the findings (sorted by line, at most STATIC_MAX_FINDINGS) and the metrics of the file.
+    """
+    analyzer = ANALYZERS.get(os.path.splitext(path)[1])
+    findings, metrics = analyzer(path, contents) if analyzer else ([], {})
+    findings.sort(key=lambda item: (item['line'], item['rule']))
+
+    return {
+        'path': path,
+        'supported': analyzer is not None,
+        'findings': findings[:STATIC_MAX_FINDINGS],
+        'finding_count': len(findings),
+        'metrics': {'lines': contents.count('\n') + 1, **metrics},
+    }
+
+
+def analyze_files(files, workers=STATIC_ANALYSIS_WORKERS):
+    """
+    Analyzes files in parallel on a process pool: ast parsing is CPU-bound and holds the GIL.
+
+    Parameters:
+        files (dict): The contents of every file, by path.
+        workers (int): Number of worker processes.
+
+    Returns:
+        dict: The analysis of every file, by path.
+    """
+    paths = list(files)
+    if len(paths) >= STATIC_POOL_MIN_FILES and workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                chunksize = max(1, len(paths) // (workers * 4))
+                analyses = executor.map(analyze_file, paths, [files[path] for path in paths], chunksize=chunksize)
+                return dict(zip(paths, analyses))
+        except (BrokenProcessPool, OSError) as e:
+            logging.error(f"Static analysis pool failed, analyzing in process: {e}")
+
+    return {path: analyze_file(path, files[path]) for path in paths}
+
+
+def format_findings(analysis, start=None, end=None):
+    """
+    Formats the findings of a file as a compact list for the review prompt.
+
+    Parameters:
+        analysis (dict): The analysis returned by analyze_file.
+        start (int): Only keep the findings from this line on.
+        end (int): Only keep the findings up to this line.
+
+    Returns:
+        str: One line per finding, or an empty string when there is none.
+    """
+    if not analysis:
+        return ""
+
+    return '\n'.join(
+        f"- Line {item['line']} [{item['rule']}] {item['message']}"
+        for item in analysis['findings']
+        if (start is None or item['line'] >= start) and (end is None or item['line'] <= end)
+    )
+
+
+def static_report(repo, path, analysis):
+    """
+    Builds the review section of a file from its static analysis alone, without any LLM call.
+
+    Parameters:
+        repo (str): The name of the repository.
+        path (str): The file path.
+        analysis (dict): The analysis returned by analyze_file, None when the file was not analyzed.
+
+    Returns:
+        str: The review result in markdown format.
+    """
+    if not is_supported(path) or (analysis is not None and not analysis['supported']):
+        review = f"Not analyzed: no static analyzer for {os.path.splitext(path)[1] or 'extensionless'} files."
+    elif analysis is None:
+        review = "Not analyzed: the file could not be read."
+    else:
+        metrics = ', '.join(f"{name.replace('_', ' ')}: {value}" for name, value in analysis['metrics'].items())
+        findings = format_findings(analysis) or "No findings."
+        hidden = analysis['finding_count'] - len(analysis['findings'])
+        if hidden > 0:
+            findings += f"\n- ... and {hidden} more"
+        review = f"### Static Analysis\n{metrics}\n\n{findings}"
+
+    return f"## Project Name\n{repo}\n\n## Path\n{path}\n\n## Code Review\n{review}"
@@ -0,0 +1,97 @@
+import os
+import re
+import time
+import queue
+import threading
+from collections import deque
+import streamlit as st
+
+# Configurable rendering of the crew logs
+LOG_MAX_LINES = int(os.getenv('LOG_MAX_LINES', 200))
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', 0.5))  # seconds
+
+
+class StreamToExpander:
+    # Precompiled, since write() is called for every chunk the crew prints
+    ANSI_PATTERN = re.compile(r'\x1B\[[0-9;]*[mK]')
+    TASK_OBJECT_PATTERN = re.compile(r'\"task\"\s*:\s*\"(.*?)\"', re.IGNORECASE)
+    TASK_INPUT_PATTERN = re.compile(r'task\s*:\s*([^\n]*)', re.IGNORECASE)
+
+    def __init__(self, expander, max_lines=LOG_MAX_LINES, flush_interval=LOG_FLUSH_INTERVAL):
+        self.expander = expander
+        self.buffer = []
+
+        # Logs are kept in a bounded ring buffer and rendered into a single placeholder on an interval
+        self.placeholder = expander.empty()
+        self.lines = deque(maxlen=max_lines)
+        self.flush_interval = flush_interval
+        self.last_flush = 0.0
+
+        # Streamlit widgets may only be updated from the script thread; other threads queue their writes
+        self.owner_thread = threading.get_ident()
+        self.pending = queue.Queue()
+
+    def write(self, data):
+        if threading.get_ident() != self.owner_thread:
+            self.pending.put(data)
+            return
+
+        self.drain()
+        self.render(data)
+
+    def drain(self):
+        """Renders the writes queued by worker threads. Must be called from the script thread."""
+        while True:
+            try:
+                data = self.pending.get_nowait()
+            except queue.Empty:
+                break
+            self.render(data)
+
+    def render(self, data):
+        # Filter out ANSI escape codes using a regular expression
+        cleaned_data = self.ANSI_PATTERN.sub('', str(data))
+
+        # Check if the data contains 'task' information
+        if 'task' in cleaned_data.lower():
+            task_match_object = self.TASK_OBJECT_PATTERN.search(cleaned_data)
+            task_match_input = self.TASK_INPUT_PATTERN.search(cleaned_data)
+
+            task_value = None
+
+            if task_match_object:
+                task_value = task_match_object.group(1)
+            elif task_match_input:
+                task_value = task_match_input.group(1).strip()
+
+            if task_value:
+                st.toast(":robot_face: " + task_value)
+
+        self.buffer.append(cleaned_data)
+
+        if "\n" in cleaned_data:
+            *lines, partial = ''.join(self.buffer).split('\n')
+            self.lines.extend(lines)
+            self.buffer = [partial] if partial else []
+
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.render_lines()
+
+    def render_lines(self):
+        """Replaces the content of the log placeholder with the lines in the ring buffer."""
+        self.placeholder.code('\n'.join(self.lines), language='bash')
+        self.last_flush = time.monotonic()
+
+    def flush(self):
+        if threading.get_ident() != self.owner_thread:
+            return
+
+        self.drain()
+        if self.buffer:
+            self.lines.append(''.join(self.buffer))
+            self.clear_buffer()
+        self.render_lines()
+
+    def clear_buffer(self):
+        """Clears the buffer to free memory."""
+        self.buffer = []
\ No newline at end of file
@@ -6,7 +6,152 @@ class Tasks:
     Class to create and manage different types of tasks.
     """
 
-    def review_task(self, agent: Agent, repo: str, path: str, context: str) -> Task:
+    REVIEW_TASK_DESCRIPTION = """
+        Review the given file and provide detailed feedback and a code review to ensure it adheres to industry code quality standards.
+
+        {file_input}
+        
+        - Code Review Requirements:
+            - Code Quality: Assess the overall quality of the code.
+            - Bugs: Identify any bugs present in the code.
+            - Anti-Patterns: Point out any anti-patterns and suggest improvements.
+            - Improvements: Recommend general improvements.
+            - Compliance: Check for compliance with industry standards and best practices.
+            - Improvements: Make necessary improvements to the file content and return the updated content as updated_code.
+        
+        Output values to return
+
+        Return the following values in the Markdown content output:
+
+        Project Name: {repo}
+        Path: {path}
+        Explain This: Generate documentation for the code, explaining the entire code in a few lines.
+        Code Review: Provide detailed feedback on code quality, bugs, anti-patterns, improvements, and compliance.
+        Updated Code: Return the updated code of the file after making the necessary changes.
+        
+        Output Format
+
+        The returned attributes must be in Markdown format, with each section as an H2 heading (##) and the corresponding values as nested text.
+        
+        For "Explain This" and "Code Review", consolidate multiple explanations and reviews into a single cohesive output for each section.
+        
+        Enclose the entire output in triple backticks with the format specified as markdown, like this: ```markdown output``` .
+    """
+    REVIEW_TASK_FILE_INPUT = "- File Input: Take the file path and file contents from content_agent."
+    REVIEW_TASK_INJECTED_FILE_INPUT = "- File Input: The file contents are given below, after the output format."
+    REVIEW_TASK_INJECTED_CONTENTS = """
+        Here are the file contents:
+
+        ```
+        {file_contents}
+        ```
+    """
+    REVIEW_TASK_CHUNK_CONTEXT = """
+        This file is too large to review at once. You are reviewing part {index} of {count}, lines {start} to {end} of {path}.
+        Review only this part. Under "Updated Code", return only the updated lines of this part, not the entire file.
+
+        Here is the shared header context of the file (imports and module documentation), for reference only:
+
+        ```
+        {header}
+        ```
+    """
+    REVIEW_TASK_BATCH_CONTEXT = """
+        You are given {count} small files of the same repository: {paths}.
+        Review every file on its own and return the output values above once per file.
+        Start the output of each file with a level 1 heading holding its exact path, like "# path/to/file", followed by its H2 sections.
+    """
+    REVIEW_TASK_BATCH_FILE = """
+        File: {path}
+
+        ```
+        {file_contents}
+        ```
+    """
+    DELTA_REVIEW_TASK_DESCRIPTION = """
+        The file {path} of the repository {repo} is a near-copy of {canonical_path}, which was already reviewed.
+        Review only the differences between the two files, given below as a unified diff from {canonical_path} to {path}.
+
+        - Code Review Requirements: Point out bugs, anti-patterns and improvements introduced or removed by the differences.
+
+        Output Format
+
+        Return a single H2 heading "## Code Review" followed by the review of the differences, in Markdown format.
+
+        Enclose the entire output in triple backticks with the format specified as markdown, like this: ```markdown output``` .
+
+        ```diff
+        {diff}
+        ```
+    """
+    HUNK_REVIEW_TASK_DESCRIPTION = """
+        Review the changes a pull request ({change}) makes to {path} of the repository {repo}.
+
+        Only the changed regions of the file are given below, with the line numbers of the new version and up to
+        {context} unchanged lines around every change: lines marked "+" were added, lines marked "-" (without a number)
+        were removed, the other lines are unchanged context. Regions are separated by "..." lines.
+
+        - Code Review Requirements:
+            - Review only the added and removed lines, using the unchanged lines as context. Do not review code that is not shown.
+            - Bugs: Identify bugs and regressions introduced by the changes.
+            - Anti-Patterns: Point out anti-patterns introduced by the changes and suggest improvements.
+            - Compliance: Check the changes for compliance with industry standards and best practices.
+            - Refer to the lines you comment on by their line numbers.
+
+        Output values to return
+
+        Return the following values in the Markdown content output:
+
+        Project Name: {repo}
+        Path: {path}
+        Explain This: Explain what the changes do, in a few lines.
+        Code Review: Provide detailed feedback on the changes.
+
+        Output Format
+
+        The returned attributes must be in Markdown format, with each section as an H2 heading (##) and the corresponding values as nested text.
+
+        Enclose the entire output in triple backticks with the format specified as markdown, like this: ```markdown output``` .
+
+        Here are the changed regions:
+
+        ```
+        {changes}
+        ```
+    """
+    REVIEW_TASK_STATIC_FINDINGS = """
+        Static analysis of {path} already found the issues below. Do not list them again one by one:
+        fix them in the updated code and spend the review on what a linter cannot find.
+
+        {findings}
+    """
+    REVIEW_TASK_DIFF_OUTPUT = """
+        Under "Updated Code", do not return the entire updated file: return only your changes, as a unified diff
+        against the given contents in a ```diff code block. Start every hunk with a "@@ -start,count +start,count @@"
+        header, keep 3 unchanged context lines around each change and copy the context and removed lines exactly.
+        Leave "Updated Code" empty when nothing needs to change.
+    """
+    PATCH_RETRY_TASK_DESCRIPTION = """
+        The unified diff you returned for {path} of the repository {repo} does not apply to the file: {error}.
+
+        Return the corrected unified diff against the exact file contents given below. Copy the context and removed lines
+        character for character, with a "@@ -start,count +start,count @@" header before every hunk.
+
+        Output Format
+
+        Return a single H2 heading "## Updated Code" followed by the diff in a ```diff code block.
+
+        Enclose the entire output in triple backticks with the format specified as markdown, like this: ```markdown output``` .
+
+        Here is the diff that did not apply:
+
+        ```diff
+        {diff}
+        ```
+    """
+    REVIEW_TASK_EXPECTED_OUTPUT = "NOTE: Return the entire output formatted as Markdown, enclosed within triple backticks like this: ```markdown output```"
+
+    def review_task(self, agent: Agent, repo: str, path: str, context: str = None, file_contents: str = None, static_findings: str = None, diff_output: bool = False) -> Task:
         """
         Creates a review task for a given file.
 
@@ -15,51 +160,192 @@ class Tasks:
             repo (str): The name of the repository.
             path (str): The file path.
             context (str): The context for the task.
+            file_contents (str): The file contents to embed in the task instead of taking them from content_agent.
+            static_findings (str): The static analysis findings of the file.
+            diff_output (bool): Ask for a unified diff under "Updated Code" instead of the entire updated file.
 
         Returns:
             Task: Configured task for performing the review.
         """
         try:
+            if file_contents is None:
+                description = self.REVIEW_TASK_DESCRIPTION.format(repo=repo, path=path, file_input=self.REVIEW_TASK_FILE_INPUT)
+            else:
+                description = self.REVIEW_TASK_DESCRIPTION.format(repo=repo, path=path, file_input=self.REVIEW_TASK_INJECTED_FILE_INPUT)
+                description += self.REVIEW_TASK_INJECTED_CONTENTS.replace("{file_contents}", file_contents)
+            if static_findings:
+                description += self.REVIEW_TASK_STATIC_FINDINGS.format(path=path, findings=static_findings)
+            if diff_output:
+                description += self.REVIEW_TASK_DIFF_OUTPUT
+
             return Task(
                 agent=agent,
-                description=f"""
-                    Review the given file and provide detailed feedback and a code review to ensure it adheres to industry code quality standards.
-
-                    - File Input: Take the file path and file contents from content_agent.
-                    
-                    - Code Review Requirements:
-                        - Code Quality: Assess the overall quality of the code.
-                        - Bugs: Identify any bugs present in the code.
-                        - Anti-Patterns: Point out any anti-patterns and suggest improvements.
-                        - Improvements: Recommend general improvements.
-                        - Compliance: Check for compliance with industry standards and best practices.
-                        - Improvements: Make necessary improvements to the file content and return the updated content as updated_code.
-                    
-                    Output values to return
-
-                    Return the following values in the Markdown content output:
-
-                    Project Name: {repo}
-                    Path: {path}
-                    Explain This: Generate documentation for the code, explaining the entire code in a few lines.
-                    Code Review: Provide detailed feedback on code quality, bugs, anti-patterns, improvements, and compliance.
-                    Updated Code: Return the updated code of the file after making the necessary changes.
-                    
-                    Output Format
-
-                    The returned attributes must be in Markdown format, with each section as an H2 heading (##) and the corresponding values as nested text.
-                    
-                    For "Explain This" and "Code Review", consolidate multiple explanations and reviews into a single cohesive output for each section.
-                    
-                    Enclose the entire output in triple backticks with the format specified as markdown, like this: ```markdown output``` .
-                """,
+                description=description,
                 context=context,
-                expected_output="NOTE: Return the entire output formatted as Markdown, enclosed within triple backticks like this: ```markdown output```"
+                expected_output=self.REVIEW_TASK_EXPECTED_OUTPUT
             )
         except Exception as e:
             logging.error(f"Error creating review task: {e}")
             return None
 
+    def chunk_review_task(self, agent: Agent, repo: str, path: str, chunk, chunk_count: int, header: str, static_findings: str = None, diff_output: bool = False) -> Task:
+        """
+        Creates a review task for one chunk of a file that is over the line count limit.
+
+        Parameters:
+            agent (Agent): The agent responsible for performing the review.
+            repo (str): The name of the repository.
+            path (str): The file path.
+            chunk (FileChunk): The chunk of the file to review.
+            chunk_count (int): The number of chunks of the file.
+            header (str): The shared header context of the file.
+            static_findings (str): The static analysis findings within the lines of the chunk.
+            diff_output (bool): Ask for a unified diff of the chunk under "Updated Code" instead of its updated lines.
+
+        Returns:
+            Task: Configured task for performing the review of the chunk.
+        """
+        try:
+            description = self.REVIEW_TASK_DESCRIPTION.format(repo=repo, path=path, file_input=self.REVIEW_TASK_INJECTED_FILE_INPUT)
+            description += self.REVIEW_TASK_CHUNK_CONTEXT.format(
+                index=chunk.index, count=chunk_count, start=chunk.start, end=chunk.end, path=path, header=header
+            )
+            description += self.REVIEW_TASK_INJECTED_CONTENTS.replace("{file_contents}", chunk.text)
+            if static_findings:
+                description += self.REVIEW_TASK_STATIC_FINDINGS.format(path=path, findings=static_findings)
+            if diff_output:
+                description += self.REVIEW_TASK_DIFF_OUTPUT
+
+            return Task(
+                agent=agent,
+                description=description,
+                expected_output=self.REVIEW_TASK_EXPECTED_OUTPUT
+            )
+        except Exception as e:
+            logging.error(f"Error creating chunk review task: {e}")
+            return None
+
+    def batch_review_task(self, agent: Agent, repo: str, files: dict, static_findings: dict = None, diff_output: bool = False) -> Task:
+        """
+        Creates a single review task for several small files, to amortize the prompt overhead.
+
+        Parameters:
+            agent (Agent): The agent responsible for performing the review.
+            repo (str): The name of the repository.
+            files (dict): The contents of every file to review, by path.
+            static_findings (dict): The static analysis findings of the files, by path.
+            diff_output (bool): Ask for a unified diff of every file under "Updated Code" instead of the entire updated files.
+
+        Returns:
+            Task: Configured task for performing the review of all the files.
+        """
+        try:
+            description = self.REVIEW_TASK_DESCRIPTION.format(
+                repo=repo, path="The path of each file", file_input=self.REVIEW_TASK_INJECTED_FILE_INPUT
+            )
+            description += self.REVIEW_TASK_BATCH_CONTEXT.format(count=len(files), paths=", ".join(files))
+            if diff_output:
+                description += self.REVIEW_TASK_DIFF_OUTPUT
+            for path, file_contents in files.items():
+                description += self.REVIEW_TASK_BATCH_FILE.format(path=path, file_contents=file_contents)
+                if static_findings and static_findings.get(path):
+                    description += self.REVIEW_TASK_STATIC_FINDINGS.format(path=path, findings=static_findings[path])
+
+            return Task(
+                agent=agent,
+                description=description,
+                expected_output=self.REVIEW_TASK_EXPECTED_OUTPUT
+            )
+        except Exception as e:
+            logging.error(f"Error creating batch review task: {e}")
+            return None
+
+    def delta_review_task(self, agent: Agent, repo: str, path: str, canonical_path: str, diff: str) -> Task:
+        """
+        Creates a short review task for the differences of a near-duplicate file with an already reviewed one.
+
+        Parameters:
+            agent (Agent): The agent responsible for performing the review.
+            repo (str): The name of the repository.
+            path (str): The file path.
+            canonical_path (str): The path of the already reviewed file.
+            diff (str): The unified diff from the reviewed file to this one.
+
+        Returns:
+            Task: Configured task for performing the review of the differences.
+        """
+        try:
+            description = self.DELTA_REVIEW_TASK_DESCRIPTION.format(repo=repo, path=path, canonical_path=canonical_path, diff="{diff}")
+
+            return Task(
+                agent=agent,
+                description=description.replace("{diff}", diff),
+                expected_output=self.REVIEW_TASK_EXPECTED_OUTPUT
+            )
+        except Exception as e:
+            logging.error(f"Error creating delta review task: {e}")
+            return None
+
+    def hunk_review_task(self, agent: Agent, repo: str, path: str, change: str, changes: str, context: int, static_findings: str = None) -> Task:
+        """
+        Creates a review task for the changed regions of a file in a pull request, instead of the entire file.
+
+        Parameters:
+            agent (Agent): The agent responsible for performing the review.
+            repo (str): The name of the repository.
+            path (str): The file path.
+            change (str): How the file changed, e.g. "modified" or "renamed from old/path.py".
+            changes (str): The changed regions of the file, rendered by FileChange.render.
+            context (int): The number of unchanged lines shown around every change.
+            static_findings (str): The static analysis findings within the changed regions.
+
+        Returns:
+            Task: Configured task for performing the review of the changes.
+        """
+        try:
+            description = self.HUNK_REVIEW_TASK_DESCRIPTION.format(repo=repo, path=path, change=change, context=context, changes="{changes}")
+            description = description.replace("{changes}", changes)
+            if static_findings:
+                description += self.REVIEW_TASK_STATIC_FINDINGS.format(path=path, findings=static_findings)
+
+            return Task(
+                agent=agent,
+                description=description,
+                expected_output=self.REVIEW_TASK_EXPECTED_OUTPUT
+            )
+        except Exception as e:
+            logging.error(f"Error creating hunk review task: {e}")
+            return None
+
+    def patch_retry_task(self, agent: Agent, repo: str, path: str, file_contents: str, diff: str, error: str) -> Task:
+        """
+        Creates a task to correct an "Updated Code" diff that did not apply to the file.
+
+        Parameters:
+            agent (Agent): The agent responsible for performing the review.
+            repo (str): The name of the repository.
+            path (str): The file path.
+            file_contents (str): The contents the diff has to apply to.
+            diff (str): The diff that did not apply.
+            error (str): Why the diff did not apply.
+
+        Returns:
+            Task: Configured task for returning a corrected diff.
+        """
+        try:
+            description = self.PATCH_RETRY_TASK_DESCRIPTION.format(repo=repo, path=path, error="{error}", diff="{diff}")
+            description = description.replace("{error}", error).replace("{diff}", diff)
+            description += self.REVIEW_TASK_INJECTED_CONTENTS.replace("{file_contents}", file_contents)
+
+            return Task(
+                agent=agent,
+                description=description,
+                expected_output=self.REVIEW_TASK_EXPECTED_OUTPUT
+            )
+        except Exception as e:
+            logging.error(f"Error creating patch retry task: {e}")
+            return None
+
     def get_file_path_task(self, agent: Agent, file_tree: str, repo_directory: str, repo_structure: str, repo_file_sample: str, repo_fullpath_sample: str, repo_output_sample: str) -> Task:
         """
         Creates a task to get the file path from a given tree structure.
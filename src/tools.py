@@ -1,48 +1,81 @@
 import os
 import requests
+from github_client import get_client
+from tracing import span
+from triage import is_binary, skip_message
 import base64
 from langchain_community.tools import tool
 
-# Ensure environment variable is set for GITHUB_KEY
-GITHUB_KEY = os.getenv('GITHUB_KEY')
-
-if not GITHUB_KEY:
-    raise EnvironmentError("GITHUB_KEY environment variable not set")
-
 # Configurable thresholds
 MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 1000000))  # 1 MB
 MAX_LINE_COUNT = int(os.getenv('MAX_LINE_COUNT', 500))  # 500 lines
 
-class Tools():
-    @staticmethod
-    @tool("get file contents from given file path")
-    def get_file_contents(path, owner, repo):
-        """
-        Fetches the content of a given file from GitHub using the provided path, owner, and repository name.
+LINE_LIMIT_MESSAGE = "Skipped: File contains more lines than the configured limit."
 
-        Parameters:
-            path (str): The file path or URL.
-            owner (str): The owner of the repository.
-            repo (str): The name of the repository.
 
-        Returns:
-            str: The content of the file or an error message.
-        """
+def read_snapshot_contents(snapshot, path, enforce_line_limit=True):
+    """
+    Reads the content of a given file from a repository snapshot, applying the same limits as the API.
+
+    Parameters:
+        snapshot (RepoSnapshot): The opened snapshot of the repository.
+        path (str): The file path.
+        enforce_line_limit (bool): Skip files over MAX_LINE_COUNT. Disabled when the file is reviewed in chunks.
+
+    Returns:
+        str: The content of the file, or a message starting with "Skipped:" or "Error:".
+    """
+    try:
+        content = snapshot.read_bytes(path)
+
+        # Check the size of the file
+        if len(content) > MAX_FILE_SIZE:  # Configurable file size limit
+            return "Skipped: File size is greater than the configured limit."
+
+        if is_binary(content):
+            return skip_message('binary')
+
+        content_str = str(content, 'utf-8')
+
+        # Check the number of lines in the file
+        if enforce_line_limit and len(content_str.split('\n')) > MAX_LINE_COUNT:  # Configurable line count limit
+            return LINE_LIMIT_MESSAGE
+
+        return content_str
+
+    except KeyError:
+        return f"Error: File not found in snapshot - {path}"
+    except Exception as e:
+        return f"Error: An unexpected error occurred - {str(e)}"
+
+def fetch_file_contents(path, owner, repo, snapshot=None, enforce_line_limit=True, ref=None):
+    """
+    Fetches the content of a given file from GitHub using the provided path, owner, and repository name.
+
+    Parameters:
+        path (str): The file path or URL.
+        owner (str): The owner of the repository.
+        repo (str): The name of the repository.
+        snapshot (RepoSnapshot): Read the file from this snapshot instead of the Contents API.
+        enforce_line_limit (bool): Skip files over MAX_LINE_COUNT. Disabled when the file is reviewed in chunks.
+        ref (str): The commit to read the file at, defaults to the default branch. Ignored with a snapshot.
+
+    Returns:
+        str: The content of the file, or a message starting with "Skipped:" or "Error:".
+    """
+    with span('fetch_contents', path=path):
+        if snapshot is not None and not path.startswith("https://"):
+            return read_snapshot_contents(snapshot, path, enforce_line_limit=enforce_line_limit)
+
         # Construct the API URL
         if path.startswith("https://"):
             api_url = path
         else:
-            api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-
-        # Add the Authorization header with the token
-        headers = {
-            'Authorization': f'token {GITHUB_KEY}',
-            'X-GitHub-Api-Version': '2022-11-28'
-        }
+            api_url = f"repos/{owner}/{repo}/contents/{path}"
 
         try:
-            response = requests.get(api_url, headers=headers)
-            response.raise_for_status()  # Raise an HTTPError for bad responses (4xx and 5xx)
+            # Shared pooled client: auth headers, ETags, rate limit and retries
+            response = get_client().get(api_url, params={'ref': ref} if ref else None)
 
             file_content = response.json()
 
@@ -53,12 +86,15 @@ class Tools():
             # Decode the Base64 encoded content
             content_decoded = base64.b64decode(file_content['content'])
 
+            if is_binary(content_decoded):
+                return skip_message('binary')
+
             # Convert bytes to string
             content_str = content_decoded.decode('utf-8')
 
             # Check the number of lines in the file
-            if len(content_str.split('\n')) > MAX_LINE_COUNT:  # Configurable line count limit
-                return "Skipped: File contains more lines than the configured limit."
+            if enforce_line_limit and len(content_str.split('\n')) > MAX_LINE_COUNT:  # Configurable line count limit
+                return LINE_LIMIT_MESSAGE
 
             return content_str
 
@@ -69,4 +105,35 @@ class Tools():
         except base64.binascii.Error as e:
             return f"Error: Base64 decoding failed - {str(e)}"
         except Exception as e:
-            return f"Error: An unexpected error occurred - {str(e)}"
\ No newline at end of file
+            return f"Error: An unexpected error occurred - {str(e)}"
+
+
+class Tools():
+    @staticmethod
+    def file_contents_tool(snapshot=None, ref=None):
+        """
+        Creates the file contents tool of one review, bound to its snapshot and commit.
+
+        Parameters:
+            snapshot (RepoSnapshot): Read the files from this snapshot instead of the Contents API.
+            ref (str): The commit to read the files at, defaults to the default branch.
+
+        Returns:
+            BaseTool: The tool.
+        """
+        @tool("get file contents from given file path")
+        def get_file_contents(path, owner, repo):
+            """
+            Fetches the content of a given file from GitHub using the provided path, owner, and repository name.
+
+            Parameters:
+                path (str): The file path or URL.
+                owner (str): The owner of the repository.
+                repo (str): The name of the repository.
+
+            Returns:
+                str: The content of the file or an error message.
+            """
+            return fetch_file_contents(path, owner, repo, snapshot=snapshot, ref=ref)
+
+        return get_file_contents
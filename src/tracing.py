@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+# Optional Prometheus textfile collector target, written in addition to the file next to the report
+TRACE_PROMETHEUS_PATH = os.getenv('TRACE_PROMETHEUS_PATH', '')
+
+# USD per 1K tokens (prompt, completion), overridable with LLM_PRICE_PROMPT_PER_1K / LLM_PRICE_COMPLETION_PER_1K
+MODEL_PRICES = {
+    'gpt-4o-mini': (0.00015, 0.0006),
+    'gpt-4o': (0.005, 0.015),
+    'gpt-4-turbo': (0.01, 0.03),
+    'gpt-4': (0.03, 0.06),
+    'gpt-3.5-turbo': (0.0005, 0.0015),
+}
+
+COUNTERS = ('http_requests', 'http_bytes', 'llm_calls', 'llm_throttles', 'llm_retries', 'prompt_tokens', 'completion_tokens', 'cost')
+
+# The spans open on each thread, innermost last
+local = threading.local()
+
+
+def model_prices(model):
+    """
+    Returns the price of a model in USD per 1K tokens.
+
+    Parameters:
+        model (str): The model name, e.g. gpt-4o.
+
+    Returns:
+        tuple: The prompt and completion prices. Unknown models are priced at 0 unless set in the environment.
+    """
+    prompt_price, completion_price = next(
+        (prices for name, prices in MODEL_PRICES.items() if model.startswith(name)), (0.0, 0.0)
+    )
+    return (
+        float(os.getenv('LLM_PRICE_PROMPT_PER_1K', prompt_price)),
+        float(os.getenv('LLM_PRICE_COMPLETION_PER_1K', completion_price)),
+    )
+
+
+class Span:
+    """
+    One timed stage of a run, e.g. the review of a file. Counters include the ones of the nested spans.
+    """
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.start = time.monotonic()
+        self.seconds = None
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def as_dict(self):
+        return {'name': self.name, **self.attributes, 'seconds': round(self.seconds or 0, 3), **self.counters}
+
+
+class Tracer:
+    """
+    Collects the spans of one review run and exports them as a JSON summary and a Prometheus text file.
+
+    HTTP requests and LLM tokens are recorded with record_http() and record_tokens() from whatever code runs inside a
+    span, on any thread the span was bound to with bind() or wrap().
+    """
+
+    def __init__(self, owner, repo, model=None):
+        """
+        Parameters:
+            owner (str): The owner of the repository.
+            repo (str): The name of the repository.
+            model (str): The model used by the agents, to estimate the cost.
+        """
+        self.owner = owner
+        self.repo = repo
+        self.model = model or os.getenv('OPENAI_MODEL_NAME', 'gpt-4o')
+        self.prompt_price, self.completion_price = model_prices(self.model)
+        self.started_at = time.time()
+        self.start = time.monotonic()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Times a stage on the current thread. Spans nest: counters recorded inside also add up in the enclosing spans.
+
+        Parameters:
+            name (str): The stage name, e.g. fetch_tree, review or kickoff.
+            attributes: Extra fields of the span, e.g. path.
+        """
+        span = Span(self, name, attributes)
+        stack = getattr(local, 'stack', None)
+        if stack is None:
+            stack = local.stack = []
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.seconds = time.monotonic() - span.start
+            stack.pop()
+            with self.lock:
+                self.spans.append(span)
+
+    def add(self, **counters):
+        """
+        Adds counters to every span open on the current thread that belongs to this tracer.
+        """
+        with self.lock:
+            for span in getattr(local, 'stack', ()):
+                if span.tracer is self:
+                    for key, value in counters.items():
+                        span.counters[key] += value
+
+    def summary(self):
+        """
+        Aggregates the spans per stage and per file.
+
+        Returns:
+            dict: The run summary.
+        """
+        with self.lock:
+            spans = list(self.spans)
+
+        stages = {}
+        for span in spans:
+            stage = stages.setdefault(span.name, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0, **dict.fromkeys(COUNTERS, 0)})
+            stage['count'] += 1
+            stage['seconds'] += span.seconds
+            stage['max_seconds'] = max(stage['max_seconds'], span.seconds)
+            for key in COUNTERS:
+                stage[key] += span.counters[key]
+
+        for stage in stages.values():
+            stage['seconds'] = round(stage['seconds'], 3)
+            stage['max_seconds'] = round(stage['max_seconds'], 3)
+            stage['cost'] = round(stage['cost'], 6)
+
+        files = sorted(
+            (span.as_dict() for span in spans if span.name == 'review' and 'path' in span.attributes),
+            key=lambda span: span['seconds'], reverse=True
+        )
+
+        return {
+            'owner': self.owner,
+            'repo': self.repo,
+            'model': self.model,
+            'started_at': self.started_at,
+            'seconds': round(time.monotonic() - self.start, 3),
+            'stages': stages,
+            'files': files,
+        }
+
+    def prometheus(self, summary=None):
+        """
+        Renders the summary in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        summary = summary or self.summary()
+        labels = f'owner="{self.owner}",repo="{self.repo}"'
+        metrics = [
+            ('reviewer_run_seconds', 'gauge', 'Wall time of the last review run.', [(labels, summary['seconds'])]),
+            ('reviewer_files_reviewed', 'gauge', 'Files reviewed in the last run.', [(labels, len(summary['files']))]),
+        ]
+
+        stage_metrics = {
+            'reviewer_stage_seconds': ('seconds', 'Wall time spent per stage, summed over spans.'),
+            'reviewer_stage_spans': ('count', 'Number of spans per stage.'),
+            'reviewer_stage_http_requests': ('http_requests', 'GitHub HTTP requests per stage.'),
+            'reviewer_stage_http_bytes': ('http_bytes', 'Bytes fetched from GitHub per stage.'),
+            'reviewer_stage_llm_calls': ('llm_calls', 'LLM call attempts per stage.'),
+            'reviewer_stage_llm_throttles': ('llm_throttles', 'LLM calls rate limited (429) per stage.'),
+            'reviewer_stage_llm_retries': ('llm_retries', 'LLM calls retried per stage.'),
+            'reviewer_stage_prompt_tokens': ('prompt_tokens', 'Prompt tokens per stage.'),
+            'reviewer_stage_completion_tokens': ('completion_tokens', 'Completion tokens per stage.'),
+            'reviewer_stage_cost_usd': ('cost', 'Estimated LLM cost in USD per stage.'),
+        }
+        for metric, (key, help_text) in stage_metrics.items():
+            samples = [(f'{labels},stage="{stage}"', values[key]) for stage, values in sorted(summary['stages'].items())]
+            metrics.append((metric, 'gauge', help_text, samples))
+
+        lines = []
+        for metric, metric_type, help_text, samples in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            lines.extend(f"{metric}{{{sample_labels}}} {value}" for sample_labels, value in samples)
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, output):
+        """
+        Writes <report>.metrics.json and <report>.prom next to the report of the run.
+
+        Parameters:
+            output (str): The report file name, e.g. 2024_08_05_04_31_14.md.
+
+        Returns:
+            dict: The run summary.
+        """
+        summary = self.summary()
+        dir_path = os.path.join(self.owner, self.repo)
+        base_name = os.path.join(dir_path, os.path.splitext(output)[0])
+        prometheus = self.prometheus(summary)
+
+        try:
+            os.makedirs(dir_path, exist_ok=True)
+            with open(f"{base_name}.metrics.json", 'w') as file:
+                json.dump(summary, file, indent=2)
+            with open(f"{base_name}.prom", 'w') as file:
+                file.write(prometheus)
+
+            if TRACE_PROMETHEUS_PATH:
+                with open(f"{TRACE_PROMETHEUS_PATH}.tmp", 'w') as file:
+                    file.write(prometheus)
+                os.replace(f"{TRACE_PROMETHEUS_PATH}.tmp", TRACE_PROMETHEUS_PATH)
+        except OSError as e:
+            logging.error(f"Error writing run metrics: {e}")
+
+        return summary
+
+
+def current_spans():
+    """
+    Returns the spans open on the current thread, to bind them on another thread.
+    """
+    return list(getattr(local, 'stack', ()))
+
+
+@contextmanager
+def bind(spans):
+    """
+    Makes the given spans the enclosing spans of the current thread, e.g. inside a thread pool task.
+    """
+    previous = getattr(local, 'stack', None)
+    local.stack = list(spans)
+    try:
+        yield
+    finally:
+        local.stack = previous
+
+
+def wrap(function):
+    """
+    Wraps a function submitted to a thread pool so it runs inside the spans open on the submitting thread.
+    """
+    spans = current_spans()
+
+    def wrapped(*args, **kwargs):
+        with bind(spans):
+            return function(*args, **kwargs)
+
+    return wrapped
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Opens a span of the tracer of the innermost span of the current thread, or does nothing outside a traced run.
+    """
+    stack = getattr(local, 'stack', None)
+    if not stack:
+        yield None
+        return
+    with stack[-1].tracer.span(name, **attributes) as child:
+        yield child
+
+
+def record_http(response_bytes, requests=1):
+    """
+    Records HTTP requests and the bytes they fetched in the spans of the current thread.
+    """
+    stack = getattr(local, 'stack', None)
+    if stack:
+        stack[-1].tracer.add(http_requests=requests, http_bytes=response_bytes)
+
+
+def record_llm_call(throttled=False, retried=False):
+    """
+    Records an LLM call attempt in the spans of the current thread, and whether it was rate limited and retried.
+    """
+    stack = getattr(local, 'stack', None)
+    if stack:
+        stack[-1].tracer.add(llm_calls=1, llm_throttles=int(throttled), llm_retries=int(retried))
+
+
+def record_tokens(prompt_tokens, completion_tokens, model=None):
+    """
+    Records LLM token usage, and its estimated cost, in the spans of the current thread.
+
+    Parameters:
+        prompt_tokens (int): The prompt tokens used.
+        completion_tokens (int): The completion tokens used.
+        model (str): The model used, when it is not the model of the tracer.
+    """
+    stack = getattr(local, 'stack', None)
+    if stack:
+        tracer = stack[-1].tracer
+        prompt_price, completion_price = (tracer.prompt_price, tracer.completion_price) if model is None else model_prices(model)
+        cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+        tracer.add(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost=cost)
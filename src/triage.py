@@ -0,0 +1,316 @@
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Configurable triage: extra gitignore-style rules (comma-separated) and the repository file holding more of them
+TRIAGE_RULES = [rule.strip() for rule in os.getenv('TRIAGE_RULES', '').split(',') if rule.strip()]
+TRIAGE_RULES_FILE = os.getenv('TRIAGE_RULES_FILE', '.reviewignore')
+TRIAGE_MAX_FILE_SIZE = int(os.getenv('TRIAGE_MAX_FILE_SIZE', os.getenv('MAX_FILE_SIZE', 1000000)))  # 1 MB
+
+# Content sniffing on the first bytes of a file
+SNIFF_BYTES = 8000  # Same window git uses to tell binary files apart
+MINIFIED_LINE_LENGTH = int(os.getenv('TRIAGE_MINIFIED_LINE_LENGTH', 500))  # Average line length of minified code
+# Markers of generated code, only looked for in comment lines
+GENERATED_MARKER = re.compile(
+    rb'^[ \t]*(?:#|//|/\*|\*|--|<!--|;).*(?:@generated\b|DO NOT EDIT|(?:auto-?generated|automatically generated) (?:file|code|by))',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Files never worth a review, by reason
+DEFAULT_RULES = {
+    'lock file': [
+        '*.lock', 'package-lock.json', 'npm-shrinkwrap.json', 'pnpm-lock.yaml', 'go.sum', 'Pipfile.lock',
+    ],
+    'vendored': [
+        'node_modules/', 'vendor/', 'bower_components/', 'third_party/', '.venv/', 'venv/', 'site-packages/',
+    ],
+    'generated': [
+        '*.min.js', '*.min.css', '*.map', '*.pb.go', '*_pb2.py', '*_pb2_grpc.py', '*.generated.*',
+        # Only the output folders at the root: src/build/ or cmd/dist/ often hold sources (build scripts, Go packages)
+        '/dist/', '/build/', '__pycache__/', '*.snap',
+    ],
+    'binary': [
+        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.bmp', '*.ico', '*.webp', '*.tif', '*.tiff', '*.psd',
+        '*.mp3', '*.mp4', '*.wav', '*.ogg', '*.mov', '*.avi', '*.webm',
+        '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+        '*.zip', '*.gz', '*.tgz', '*.bz2', '*.xz', '*.7z', '*.rar', '*.jar', '*.war', '*.whl',
+        '*.pdf', '*.doc', '*.docx', '*.xls', '*.xlsx', '*.ppt', '*.pptx',
+        '*.exe', '*.dll', '*.so', '*.dylib', '*.a', '*.o', '*.pyc', '*.class', '*.wasm', '*.bin',
+        '*.db', '*.sqlite', '*.sqlite3', '*.pkl', '*.npy', '*.h5',
+    ],
+}
+
+
+def translate(pattern, recursive=True):
+    """
+    Translates a gitignore-style pattern into a regular expression over repository-relative paths.
+
+    A pattern without a slash matches a name at any depth, a leading or middle slash anchors it to the root,
+    a trailing slash only matches folders, * and ? stay within a folder and ** spans folders.
+
+    Parameters:
+        pattern (str): The pattern, without the leading ! of a negation.
+        recursive (bool): Also match every path below a matching folder, as .gitignore does (.gitattributes does not).
+
+    Returns:
+        str: The regular expression, to be used with fullmatch.
+    """
+    directory_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    regex = ''
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith('**/', index):
+            regex += '(?:.*/)?'
+            index += 3
+        elif pattern.startswith('**', index):
+            regex += '.*'
+            index += 2
+        elif pattern[index] == '*':
+            regex += '[^/]*'
+            index += 1
+        elif pattern[index] == '?':
+            regex += '[^/]'
+            index += 1
+        elif pattern[index] == '[' and ']' in pattern[index + 2:]:
+            end = pattern.index(']', index + 2)
+            characters = pattern[index + 1:end]
+            if characters.startswith('!'):
+                characters = '^' + characters[1:]
+            regex += '[' + characters.replace('\\', '\\\\') + ']'
+            index = end + 1
+        elif pattern[index] == '\\' and index + 1 < len(pattern):
+            regex += re.escape(pattern[index + 1])
+            index += 2
+        else:
+            regex += re.escape(pattern[index])
+            index += 1
+
+    prefix = '' if anchored else '(?:.*/)?'
+    if directory_only:
+        # A folder pattern matches the files below the folder, never a file of the same name
+        return f"{prefix}{regex}/.*" if recursive else r'(?!)'
+    return f"{prefix}{regex}(?:/.*)?" if recursive else f"{prefix}{regex}"
+
+
+class PathMatcher:
+    """
+    Compiled gitignore-style rules: the last matching rule wins and a leading ! re-includes a path.
+    """
+
+    def __init__(self, patterns, ignore_case=False):
+        """
+        Compiles the rules.
+
+        Parameters:
+            patterns (list): Lines in .gitignore syntax. Blank lines and # comments are ignored.
+            ignore_case (bool): Match regardless of case, e.g. for file extensions.
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        self.rules = []
+        for line in patterns:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate or line.startswith('\\!') or line.startswith('\\#'):
+                line = line[1:]
+            self.rules.append((re.compile(translate(line), flags), not negate))
+
+        # Without negations the order does not matter: a single alternation answers in one pass
+        self.combined = None
+        if self.rules and all(ignore for _, ignore in self.rules):
+            self.combined = re.compile('|'.join(f"(?:{regex.pattern})" for regex, _ in self.rules), flags)
+
+    def match(self, path):
+        """
+        Matches a path against the rules.
+
+        Parameters:
+            path (str): The repository-relative file path.
+
+        Returns:
+            bool: True when the path is excluded, False when a negation re-includes it, None when no rule matches.
+        """
+        if self.combined is not None:
+            return True if self.combined.fullmatch(path) else None
+
+        for regex, ignore in reversed(self.rules):
+            if regex.fullmatch(path):
+                return ignore
+        return None
+
+
+class GitAttributes:
+    """
+    The linguist attributes of a repository .gitattributes file (linguist-generated and linguist-vendored).
+    """
+
+    ATTRIBUTES = ('linguist-generated', 'linguist-vendored')
+
+    def __init__(self, text=""):
+        """
+        Parses the attribute lines.
+
+        Parameters:
+            text (str): The contents of .gitattributes.
+        """
+        self.rules = {attribute: [] for attribute in self.ATTRIBUTES}
+        for line in text.splitlines():
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+
+            regex = re.compile(translate(parts[0], recursive=False))
+            for part in parts[1:]:
+                name, _, value = part.partition('=')
+                if name.lstrip('-!') not in self.rules:
+                    continue
+                if name.startswith('!'):
+                    state = None
+                elif name.startswith('-'):
+                    state = False
+                else:
+                    state = value.lower() not in ('false', '0')
+                self.rules[name.lstrip('-!')].append((regex, state))
+
+    def value(self, path, attribute):
+        """
+        Returns the state of an attribute for a path, following the last matching line.
+
+        Returns:
+            bool: True when set, False when explicitly unset, None when unspecified.
+        """
+        for regex, state in reversed(self.rules[attribute]):
+            if regex.fullmatch(path):
+                return state
+        return None
+
+
+def is_binary(data):
+    """
+    Tells binary content apart the way git does: a NUL byte within the first SNIFF_BYTES bytes.
+    """
+    return b'\0' in bytes(data[:SNIFF_BYTES])
+
+
+def sniff(data):
+    """
+    Tells from the first bytes of a file whether it is worth a review.
+
+    Parameters:
+        data (bytes): The content of the file, or at least its first SNIFF_BYTES bytes.
+
+    Returns:
+        str: The reason to skip the file (binary, generated or minified), or None.
+    """
+    head = bytes(data[:SNIFF_BYTES])
+    if is_binary(head):
+        return 'binary'
+    if GENERATED_MARKER.search(head[:1024]):
+        return 'generated'
+    if len(head) / (head.count(b'\n') + 1) > MINIFIED_LINE_LENGTH:
+        return 'minified'
+    return None
+
+
+def skip_message(reason):
+    """
+    Returns the "Skipped:" message of a file dropped for the given reason.
+    """
+    return f"Skipped: {reason.capitalize()} file."
+
+
+class Triage:
+    """
+    Drops generated, vendored, binary and lock files before their contents are fetched or reviewed.
+    """
+
+    def __init__(self, rules=(), gitattributes="", max_file_size=TRIAGE_MAX_FILE_SIZE):
+        """
+        Compiles the triage rules of a repository.
+
+        Parameters:
+            rules (list): Extra gitignore-style rules, e.g. the lines of the repository .reviewignore.
+                They win over the default rules and can re-include files with a leading !.
+            gitattributes (str): The contents of the repository .gitattributes.
+            max_file_size (int): Files over this size are dropped, 0 disables the limit.
+        """
+        self.rules = PathMatcher([*TRIAGE_RULES, *rules])
+        self.defaults = {reason: PathMatcher(patterns, ignore_case=True) for reason, patterns in DEFAULT_RULES.items()}
+        self.attributes = GitAttributes(gitattributes)
+        self.max_file_size = max_file_size
+
+    def reason(self, path, size=None):
+        """
+        Returns why a file is dropped, from its path and size alone.
+
+        Parameters:
+            path (str): The repository-relative file path.
+            size (int): The size of the file in bytes, if known.
+
+        Returns:
+            str: The reason, or None when the file is kept.
+        """
+        if size is not None:
+            if size == 0:
+                return 'empty'
+            if self.max_file_size and size > self.max_file_size:
+                return 'too large'
+
+        generated = self.attributes.value(path, 'linguist-generated')
+        vendored = self.attributes.value(path, 'linguist-vendored')
+        if generated:
+            return 'generated'
+        if vendored:
+            return 'vendored'
+
+        verdict = self.rules.match(path)
+        if verdict is not None:
+            return 'ignored' if verdict else None
+
+        # An explicit -linguist-generated or -linguist-vendored keeps the file whatever the default rules say
+        if generated is False or vendored is False:
+            return None
+
+        for reason, matcher in self.defaults.items():
+            if matcher.match(path):
+                return reason
+        return None
+
+    def filter(self, paths, sizes=None, snapshot=None):
+        """
+        Splits the paths into the files to review and the dropped ones.
+
+        Parameters:
+            paths (list): The resolved file paths.
+            sizes (dict): The size of each file by path, from the tree entries.
+            snapshot (RepoSnapshot): When given, the first bytes of each file are sniffed too, at no API cost.
+
+        Returns:
+            tuple: The kept paths, in order, and the reason of every dropped path.
+        """
+        sizes = sizes or {}
+        kept = []
+        skipped = {}
+
+        for path in paths:
+            reason = self.reason(path, sizes.get(path))
+            if reason is None and snapshot is not None:
+                try:
+                    reason = sniff(snapshot.read_bytes(path)[:SNIFF_BYTES])
+                except KeyError:
+                    pass
+            if reason is None:
+                kept.append(path)
+            else:
+                skipped[path] = reason
+
+        if skipped:
+            logger.info(f"Triage dropped {len(skipped)} of {len(paths)} files")
+        return kept, skipped
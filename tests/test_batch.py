@@ -0,0 +1,30 @@
+from batch import parse_args, read_jobs, run_job
+
+
+def test_reads_jobs(tmp_path):
+    jobs_file = tmp_path / 'jobs.txt'
+    jobs_file.write_text("# repositories\nhttps://github.com/o/a src/\n\nhttps://github.com/o/b  # default directory\n")
+    assert read_jobs(str(jobs_file), default_directory='src/main.py') == [
+        ('https://github.com/o/a', 'src/'),
+        ('https://github.com/o/b', 'src/main.py'),
+    ]
+
+
+def test_optional_modes_are_off_unless_asked_for():
+    args = parse_args(['jobs.txt'])
+    assert not (args.inject_content or args.chunked or args.dedup or args.triage or args.static_analysis or args.diff_output)
+    args = parse_args(['jobs.txt', '--inject', '--chunked', '--dedup', '--triage', '--static-analysis', '--diff-output'])
+    assert args.inject_content and args.chunked and args.dedup and args.triage and args.static_analysis and args.diff_output
+
+
+def test_reviews_a_local_folder_statically(tmp_path, monkeypatch):
+    repo = tmp_path / 'project'
+    repo.mkdir()
+    (repo / 'a.py').write_text("import os\n\ndef f(x):\n    return eval(x)\n")
+    monkeypatch.chdir(tmp_path)
+
+    summary = run_job(str(repo), '', {'static_only': True, 'max_concurrency': 2})
+    assert summary['error'] is None
+    assert summary['files'] == summary['reviewed'] == 1
+    with open(summary['report']) as report:
+        assert "[eval]" in report.read()
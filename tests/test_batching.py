@@ -0,0 +1,24 @@
+from batching import estimate_tokens, estimate_tokens_from_size, pack_files
+
+
+def test_estimates_tokens():
+    assert 0 < estimate_tokens("def f(x):\n    return x + 1\n") < 20
+    assert estimate_tokens_from_size(400) == 101
+
+
+def test_packs_small_files_within_the_budget():
+    batches = pack_files({'a.py': 40, 'b.py': 30, 'c.py': 50, 'd.py': 20}, budget=100, small_file_tokens=60, max_files=8)
+    assert batches == [['a.py', 'c.py'], ['b.py', 'd.py']]
+
+
+def test_large_and_lone_files_are_not_batched():
+    assert pack_files({'big.py': 500, 'a.py': 10}, budget=1000, small_file_tokens=100) == []
+
+
+def test_a_zero_budget_disables_batching():
+    assert pack_files({'a.py': 1, 'b.py': 1}, budget=0) == []
+
+
+def test_caps_the_files_per_batch():
+    batches = pack_files({f"{index}.py": 1 for index in range(5)}, budget=100, small_file_tokens=10, max_files=2)
+    assert [len(batch) for batch in batches] == [2, 2]
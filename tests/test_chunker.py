@@ -0,0 +1,45 @@
+from chunker import split_into_chunks
+
+
+def make_module(function_count, body_lines=8):
+    lines = ['"""Helpers."""', 'import os', 'from json import dumps', '']
+    for index in range(function_count):
+        lines.append('@decorator' if index % 2 else '')
+        lines.append(f"def function_{index}(x):")
+        lines.extend(f"    x = x + {line}" for line in range(body_lines))
+        lines.append("    return x")
+    return '\n'.join(lines)
+
+
+def test_chunks_cover_the_whole_file_in_order():
+    content = make_module(20)
+    _, chunks = split_into_chunks('a.py', content, max_lines=40)
+
+    assert chunks[0].start == 1 and chunks[-1].end == len(content.split('\n'))
+    assert all(previous.end + 1 == chunk.start for previous, chunk in zip(chunks, chunks[1:]))
+    assert all(chunk.end - chunk.start + 1 <= 40 for chunk in chunks)
+    assert '\n'.join(chunk.text for chunk in chunks) == content
+
+
+def test_python_chunks_never_split_a_definition():
+    _, chunks = split_into_chunks('a.py', make_module(20), max_lines=40)
+    for chunk in chunks[1:]:
+        assert chunk.text.lstrip('\n').startswith(('def ', '@decorator'))
+
+
+def test_python_header_has_the_imports_and_docstring():
+    header, _ = split_into_chunks('a.py', make_module(20), max_lines=40)
+    assert header == "# Helpers.\nimport os\nfrom json import dumps"
+
+
+def test_a_long_definition_is_split_into_windows():
+    _, chunks = split_into_chunks('a.py', make_module(1, body_lines=100), max_lines=40)
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(1, 5), (6, 45), (46, 85), (86, 107)]
+    assert all(chunk.end - chunk.start + 1 <= 40 for chunk in chunks)
+
+
+def test_other_languages_use_line_windows():
+    content = "import x from 'x';\n" + '\n'.join(f"let a{index} = {index};" for index in range(99))
+    header, chunks = split_into_chunks('a.js', content, max_lines=30)
+    assert header == "import x from 'x';"
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(1, 30), (31, 60), (61, 90), (91, 100)]
@@ -0,0 +1,45 @@
+from dedup import DedupIndex, minhash, settings_key, similarity
+from review_crew import ReviewCrew
+
+SETTINGS = 'settings'
+ORIGINAL = '\n'.join(f"def handler_{index}(request):\n    return render(request, 'page_{index}.html')" for index in range(12))
+EDITED = ORIGINAL.replace("'page_11.html'", "'page_eleven.html'")
+REVIEW = "## Project Name\nr\n\n## Path\na.py\n\n## Explain This\nViews.\n\n## Code Review\nFine."
+
+
+def index(tmp_path):
+    dedup = DedupIndex(path=str(tmp_path / 'dedup.sqlite3'))
+    dedup.add('o', 'r', 'a.py', ORIGINAL, REVIEW, SETTINGS)
+    return dedup
+
+
+def test_similar_files_have_similar_signatures():
+    assert similarity(minhash(ORIGINAL), minhash(EDITED)) >= 0.85
+    assert minhash("x = 1") is None
+
+
+def test_finds_a_near_duplicate_in_another_file(tmp_path):
+    match = index(tmp_path).find(EDITED, SETTINGS, owner='o', repo='r', path='b.py')
+    assert match['path'] == 'a.py'
+    assert match['result'] == REVIEW
+
+
+def test_only_reviews_made_with_the_same_settings_match(tmp_path):
+    assert index(tmp_path).find(EDITED, 'other settings', owner='o', repo='r', path='b.py') is None
+
+
+def test_an_earlier_version_of_the_same_file_is_not_a_match(tmp_path):
+    dedup = index(tmp_path)
+    assert dedup.find(EDITED, SETTINGS, owner='o', repo='r', path='a.py') is None
+    assert dedup.find(EDITED, SETTINGS, owner='o', repo='other', path='a.py') is not None
+
+
+def test_an_edited_file_is_reviewed_again(tmp_path):
+    dedup = DedupIndex(path=str(tmp_path / 'dedup.sqlite3'))
+    review_crew = ReviewCrew('o', 'r', 'a.py', 'report.md', inject_content=True, store=object(), dedup=dedup)
+    settings = settings_key(review_crew.prompt_version(), review_crew.model)
+    dedup.add('o', 'r', 'a.py', ORIGINAL, REVIEW, settings)
+
+    assert review_crew.near_duplicate('a.py', EDITED) is None
+    reused = review_crew.near_duplicate('b.py', EDITED)
+    assert reused is not None and '## Path\nb.py' in reused
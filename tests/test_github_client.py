@@ -0,0 +1,49 @@
+import time
+from email.utils import formatdate
+import requests
+import github_client
+from github_client import GitHubClient
+
+
+def make_response(status_code=200, headers=None, content=b''):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = content
+    return response
+
+
+def test_retry_after_in_seconds():
+    assert GitHubClient(token=None).retry_delay(make_response(429, {'Retry-After': '7'}), 0) == 7.0
+
+
+def test_retry_after_as_an_http_date():
+    response = make_response(429, {'Retry-After': formatdate(time.time() + 30, usegmt=True)})
+    assert 20 < GitHubClient(token=None).retry_delay(response, 0) <= 30
+
+
+def test_retry_after_in_the_past_or_invalid():
+    client = GitHubClient(token=None)
+    assert client.retry_delay(make_response(429, {'Retry-After': formatdate(time.time() - 30, usegmt=True)}), 0) == 0.0
+    assert client.retry_delay(make_response(403, {'Retry-After': 'soon'}), 0) is None
+    assert client.retry_delay(make_response(500, {'Retry-After': '7'}), 0) is None
+
+
+def test_etag_cache_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(github_client, 'GITHUB_ETAG_CACHE_BYTES', 10)
+    client = GitHubClient(token=None)
+    for key in 'abc':
+        client.cache_response(key, make_response(content=b'x' * 4))
+
+    assert list(client.etags) == ['b', 'c']
+    assert client.etag_bytes == 8
+
+    client.cache_response('big', make_response(content=b'x' * 11))
+    assert 'big' not in client.etags
+
+
+def test_etag_cache_replaces_a_response():
+    client = GitHubClient(token=None)
+    client.cache_response('a', make_response(content=b'x' * 4))
+    client.cache_response('a', make_response(content=b'x' * 2))
+    assert client.etag_bytes == 2
@@ -0,0 +1,54 @@
+import github_helper
+from github_helper import get_tree_entries, render_file_tree
+
+
+class FakeClient:
+    """
+    Serves canned Git Trees responses: the root listing is truncated, its subtrees are not.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def get_json(self, path, params=None):
+        self.requests.append((path, params))
+        sha = path.rsplit('/', 1)[-1]
+        if path.endswith('/commits/HEAD'):
+            return {'sha': 'head'}
+        if sha == 'head' and params:
+            return {'truncated': True, 'tree': []}
+        if sha == 'head':
+            return {'truncated': False, 'tree': [
+                {'path': 'src', 'type': 'tree', 'sha': 'src'},
+                {'path': 'assets', 'type': 'tree', 'sha': 'assets'},
+                {'path': 'README.md', 'type': 'blob', 'sha': 'readme', 'size': 5},
+            ]}
+        if sha == 'src':
+            return {'truncated': False, 'tree': [
+                {'path': 'a.py', 'type': 'blob', 'sha': 'a', 'size': 1},
+                {'path': 'lib', 'type': 'tree', 'sha': 'lib'},
+                {'path': 'lib/b.py', 'type': 'blob', 'sha': 'b', 'size': 2},
+            ]}
+        raise AssertionError(f"Unexpected request {path}")
+
+
+def test_splits_a_truncated_tree_into_subtree_requests(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(github_helper, 'get_client', lambda: client)
+
+    sha, entries = get_tree_entries('o', 'r')
+    assert sha == 'head'
+    assert [item['path'] for item in entries] == ['README.md', 'assets', 'src', 'src/a.py', 'src/lib', 'src/lib/b.py']
+    # Ignored folders are listed but never fetched
+    assert not any(path.endswith('/assets') for path, _ in client.requests)
+
+
+def test_renders_the_tree():
+    entries = [
+        {'path': 'README.md', 'type': 'blob'},
+        {'path': 'assets/logo.js', 'type': 'blob'},
+        {'path': 'src/a.py', 'type': 'blob'},
+        {'path': 'src/lib/b.py', 'type': 'blob'},
+    ]
+    assert render_file_tree(entries) == "- README.md\n- src\n  - a.py\n  - lib\n    - b.py\n"
+    assert render_file_tree(entries, path='src', max_depth=0) == "- a.py\n"
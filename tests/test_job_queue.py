@@ -0,0 +1,71 @@
+import socket
+from job_queue import JobQueue
+
+PATHS = ['a.py', 'b.py', 'c.py']
+
+
+def make_queue(tmp_path, **options):
+    return JobQueue(path=str(tmp_path / 'jobs.sqlite3'), **options)
+
+
+def test_claims_items_in_order(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id, resumed = queue.open_job('o', 'r', 'sha', '', PATHS)
+    assert resumed == 0
+    assert [queue.claim(job_id) for _ in PATHS] == PATHS
+    assert queue.claim(job_id) is None
+    assert queue.remaining(job_id) == 3
+
+
+def test_resumes_an_unfinished_job(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id, _ = queue.open_job('o', 'r', 'sha', '', PATHS, settings='review')
+    queue.complete(job_id, queue.claim(job_id), 'review of a')
+
+    resumed_id, resumed = make_queue(tmp_path).open_job('o', 'r', 'sha', '', PATHS, settings='review')
+    assert (resumed_id, resumed) == (job_id, 1)
+    assert queue.finished(job_id, PATHS) == {'a.py': 'review of a'}
+
+
+def test_does_not_resume_a_job_made_with_other_settings(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id, _ = queue.open_job('o', 'r', 'sha', '', PATHS, settings='static-only')
+    queue.complete(job_id, queue.claim(job_id), 'static report of a')
+
+    other_id, resumed = queue.open_job('o', 'r', 'sha', '', PATHS, settings='review')
+    assert other_id != job_id and resumed == 0
+    assert queue.finished(other_id, PATHS) == {}
+
+
+def test_does_not_resume_a_finished_job(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id, _ = queue.open_job('o', 'r', 'sha', '', ['a.py'])
+    queue.complete(job_id, queue.claim(job_id), 'review')
+    queue.close_job(job_id)
+    assert queue.open_job('o', 'r', 'sha', '', ['a.py'])[0] != job_id
+
+
+def test_retries_a_failed_item_until_it_runs_out_of_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2, backoff=0)
+    job_id, _ = queue.open_job('o', 'r', 'sha', '', ['a.py'])
+    assert queue.fail(job_id, queue.claim(job_id), 'boom')
+    assert not queue.fail(job_id, queue.claim(job_id), 'boom')
+    assert queue.finished(job_id, ['a.py']) == {'a.py': None}
+    assert queue.remaining(job_id) == 0
+
+
+def test_reclaims_an_item_whose_lease_expired(tmp_path):
+    queue = make_queue(tmp_path, lease_seconds=0)
+    job_id, _ = queue.open_job('o', 'r', 'sha', '', ['a.py'])
+    assert queue.claim(job_id, worker='gone') == 'a.py'
+    assert queue.claim(job_id) == 'a.py'
+
+
+def test_resume_reclaims_the_items_of_a_dead_worker(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id, _ = queue.open_job('o', 'r', 'sha', '', ['a.py'])
+    queue.claim(job_id, worker=f"{socket.gethostname()}:999999999")
+    assert queue.claim(job_id) is None
+
+    queue.open_job('o', 'r', 'sha', '', ['a.py'])
+    assert queue.claim(job_id) == 'a.py'
@@ -0,0 +1,12 @@
+from llm_client import create_llm, get_http_client
+
+
+def test_agents_share_one_http_client(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    first, second = create_llm(model='gpt-4o-mini'), create_llm(model='gpt-4o')
+
+    assert get_http_client() is get_http_client()
+    assert first is not second
+    assert first.http_client is second.http_client is get_http_client()
+    # Retries are left to the LLM controller
+    assert first.max_retries == 0
@@ -0,0 +1,157 @@
+import time
+import httpx
+import pytest
+from llm_controller import LLMController, CircuitOpenError, classify, THROTTLED, FAILED, ERROR
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+def controller(**kwargs):
+    settings = dict(initial=4, minimum=1, maximum=8, max_retries=2, backoff=0, backoff_max=0,
+                    breaker_threshold=3, breaker_cooldown=60, breaker_cooldown_max=300, breaker_max_trips=3)
+    settings.update(kwargs)
+    return LLMController(**settings)
+
+
+def test_classify():
+    assert classify(StatusError(429, {'retry-after': '7'})) == (THROTTLED, 7.0)
+    assert classify(StatusError(503)) == (FAILED, None)
+    assert classify(StatusError(400)) == (ERROR, None)
+    assert classify(httpx.ConnectError("refused")) == (FAILED, None)
+    assert classify(ValueError("bad prompt")) == (ERROR, None)
+
+
+def test_classify_wrapped_errors():
+    try:
+        try:
+            raise StatusError(429, {'retry-after-ms': '1500'})
+        except StatusError as e:
+            raise RuntimeError("crew failed") from e
+    except RuntimeError as e:
+        assert classify(e) == (THROTTLED, 1.5)
+
+
+def test_additive_increase():
+    llm = controller()
+    for _ in range(5):
+        started, probe = llm.acquire()
+        llm.release(started, probe, None)
+    # Every call adds 1 / limit: about one slot per round trip
+    assert llm.stats()['limit'] == 5
+
+
+def test_multiplicative_decrease_once_per_round_trip():
+    llm = controller(initial=8, breaker_threshold=10)
+    calls = [llm.acquire() for _ in range(3)]
+    for started, probe in calls:
+        llm.release(started, probe, FAILED)
+    # The calls in flight saw the same congestion, the limit is only halved once
+    assert llm.stats()['limit'] == 4
+
+    started, probe = llm.acquire()
+    llm.release(started, probe, THROTTLED)
+    assert llm.stats()['limit'] == 2
+
+
+def test_slow_calls_decrease_the_limit():
+    llm = controller(initial=8)
+    started, probe = llm.acquire()
+    llm.release(started, probe, None, tokens=1000)
+    started, probe = llm.acquire()
+    llm.release(started - 10, probe, None, tokens=1000)
+    assert llm.stats()['limit'] < 8
+
+
+def test_retry_after_holds_new_calls():
+    llm = controller()
+    started, probe = llm.acquire()
+    llm.release(started, probe, THROTTLED, delay=0.2)
+
+    begin = time.monotonic()
+    llm.acquire()
+    assert time.monotonic() - begin >= 0.15
+
+
+def test_breaker_trips_and_closes_after_a_probe():
+    llm = controller(breaker_threshold=2, breaker_cooldown=0.05)
+    for _ in range(2):
+        started, probe = llm.acquire()
+        llm.release(started, probe, FAILED)
+    assert llm.stats()['breaker'] == 'open'
+
+    started, probe = llm.acquire()
+    assert probe
+    llm.release(started, probe, None)
+    assert llm.stats()['breaker'] == 'closed'
+    assert llm.trips == 0
+
+
+def test_failed_probe_doubles_the_cooldown():
+    llm = controller(breaker_threshold=1, breaker_cooldown=0.05)
+    started, probe = llm.acquire()
+    llm.release(started, probe, FAILED)
+    started, probe = llm.acquire()
+    assert probe
+    llm.release(started, probe, FAILED)
+    assert llm.trips == 2
+    assert llm.open_until - time.monotonic() > 0.05
+
+
+def test_calls_fail_fast_after_max_trips():
+    llm = controller(breaker_threshold=1, breaker_max_trips=1)
+    started, probe = llm.acquire()
+    llm.release(started, probe, FAILED)
+    with pytest.raises(CircuitOpenError):
+        llm.acquire()
+
+
+def test_call_retries_failures():
+    llm = controller()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise StatusError(502)
+        return 'ok'
+
+    assert llm.call(flaky) == 'ok'
+    assert len(attempts) == 3
+    assert llm.stats()['in_flight'] == 0
+
+
+def test_call_does_not_retry_errors():
+    llm = controller()
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        llm.call(broken)
+    assert len(attempts) == 1
+
+
+def test_call_gives_up_after_max_retries():
+    llm = controller(max_retries=1)
+    attempts = []
+
+    def down():
+        attempts.append(1)
+        raise StatusError(500)
+
+    with pytest.raises(StatusError):
+        llm.call(down)
+    assert len(attempts) == 2
+    assert llm.stats()['in_flight'] == 0
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import pytest
+from local_source import LocalSource, git_blob_sha
+
+
+def git(root, *args):
+    return subprocess.run(['git', '-C', str(root), *args], capture_output=True, check=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / 'repo'
+    (root / 'src').mkdir(parents=True)
+    (root / 'src' / 'app.py').write_text("print('app')\n")
+    (root / 'README.md').write_text("# Readme\n")
+    (root / 'empty.txt').write_text("")
+    git(root, 'init', '-q')
+    git(root, '-c', 'user.name=t', '-c', 'user.email=t@t', 'add', '.')
+    git(root, '-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q', '-m', 'init')
+    return root
+
+
+def blobs(source):
+    return {entry['path']: entry['sha'] for entry in source.entries() if entry['type'] == 'blob'}
+
+
+def test_blob_shas_match_git(repo):
+    source = LocalSource(str(repo)).open()
+    for path, blob_sha in blobs(source).items():
+        assert blob_sha == git(repo, 'rev-parse', f"HEAD:{path}")
+    assert source.sha == git(repo, 'rev-parse', 'HEAD')
+    assert 'src' in {entry['path'] for entry in source.entries() if entry['type'] == 'tree'}
+
+
+def test_edited_and_untracked_files_are_hashed(repo):
+    (repo / 'src' / 'app.py').write_text("print('edited')\n")
+    (repo / 'new.py').write_text("x = 1\n")
+    source = LocalSource(str(repo)).open()
+
+    assert blobs(source)['src/app.py'] == git_blob_sha(b"print('edited')\n")
+    assert blobs(source)['new.py'] == git_blob_sha(b"x = 1\n")
+    # A dirty working tree is not pinned to HEAD
+    assert source.sha != git(repo, 'rev-parse', 'HEAD')
+
+
+def test_ref_serves_the_committed_files(repo):
+    (repo / 'src' / 'app.py').write_text("print('edited')\n")
+    source = LocalSource(str(repo), ref='HEAD').open()
+
+    assert bytes(source.read_bytes('src/app.py')) == b"print('app')\n"
+    assert source.sha == git(repo, 'rev-parse', 'HEAD')
+
+
+def test_unknown_ref_is_rejected(repo):
+    with pytest.raises(ValueError):
+        LocalSource(str(repo), ref='missing').open()
+
+
+def test_plain_folder_is_walked(tmp_path):
+    (tmp_path / 'pkg').mkdir()
+    (tmp_path / 'pkg' / 'mod.py').write_text("y = 2\n")
+    (tmp_path / 'node_modules').mkdir()
+    (tmp_path / 'node_modules' / 'dep.js').write_text("z\n")
+    source = LocalSource(str(tmp_path)).open()
+
+    assert blobs(source) == {'pkg/mod.py': git_blob_sha(b"y = 2\n")}
+    assert bytes(source.read_bytes('pkg/mod.py')) == b"y = 2\n"
+    source.close()
+
+
+def test_read_bytes(repo):
+    source = LocalSource(str(repo)).open()
+    assert bytes(source.read_bytes('README.md')) == b"# Readme\n"
+    assert bytes(source.read_bytes('empty.txt')) == b""
+    with pytest.raises(KeyError):
+        source.read_bytes('missing.py')
+
+
+def test_missing_folder(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        LocalSource(os.path.join(str(tmp_path), 'missing')).open()
@@ -0,0 +1,37 @@
+from markdown_sections import extract_code, replace_section, split_by_path_headings, split_sections
+
+REVIEW = """## Project Name
+r
+
+## Path
+a.py
+
+## Updated Code
+```python
+## not a heading
+x = 1
+```
+
+## Code Review
+Fine."""
+
+
+def test_splits_sections_outside_code_blocks():
+    sections = split_sections(REVIEW)
+    assert list(sections) == ['Project Name', 'Path', 'Updated Code', 'Code Review']
+    assert extract_code(sections['Updated Code']) == "## not a heading\nx = 1"
+
+
+def test_replaces_or_appends_a_section():
+    replaced = replace_section(REVIEW, 'Path', 'b.py')
+    assert split_sections(replaced)['Path'] == 'b.py'
+    assert split_sections(replaced)['Code Review'] == 'Fine.'
+    assert split_sections(replace_section(REVIEW, 'Review Model', 'gpt-4o'))['Review Model'] == 'gpt-4o'
+
+
+def test_splits_a_batch_review_by_path():
+    markdown = "Intro\n# a.py\nReview of a.\n```\n# b.py\n```\n# b.py\nReview of b.\n# c.py\nNot in the batch."
+    assert split_by_path_headings(markdown, ['a.py', 'b.py']) == {
+        'a.py': "Review of a.\n```\n# b.py\n```",
+        'b.py': "Review of b.\n# c.py\nNot in the batch.",
+    }
@@ -0,0 +1,50 @@
+from model_router import ModelRouter, route_section
+
+
+def analysis(lines=0, max_complexity=0, finding_count=0):
+    return {'metrics': {'lines': lines, 'max_complexity': max_complexity}, 'finding_count': finding_count}
+
+
+def router(**kwargs):
+    return ModelRouter(fast_model='fast', strong_model='strong', threshold=30, strong_paths=[], fast_paths=[], **kwargs)
+
+
+def test_sensitive_paths_go_to_the_strong_model():
+    decision = router().route('app/Auth/login.py', size=10)
+    assert (decision['model'], decision['tier'], decision['score']) == ('strong', 'strong', None)
+    assert router().route('migrations/0001_init.py')['tier'] == 'strong'
+
+
+def test_low_risk_files_go_to_the_fast_model():
+    decision = router().route('docs/guide.md', size=10 ** 6)
+    assert (decision['model'], decision['reason']) == ('fast', "low-risk file type")
+
+
+def test_extra_patterns():
+    custom = ModelRouter(fast_model='fast', strong_model='strong', threshold=30, strong_paths=['core/'], fast_paths=['tests/'])
+    assert custom.route('core/util.py')['tier'] == 'strong'
+    assert custom.route('tests/test_util.py', analysis=analysis(lines=1000, max_complexity=50))['tier'] == 'fast'
+
+
+def test_score_routes_by_threshold():
+    assert router().route('small.py', analysis=analysis(lines=50))['tier'] == 'fast'
+
+    decision = router().route('big.py', analysis=analysis(lines=200, max_complexity=9, finding_count=2))
+    # lines 20 + complexity (9 - 5) * 3 + findings 2 * 2
+    assert (decision['tier'], decision['score']) == ('strong', 36)
+    assert decision['reason'] == "score 36 >= 30 (lines 20 + complexity 12 + findings 4)"
+
+
+def test_score_is_capped():
+    score, _ = router().score('huge.py', analysis=analysis(lines=10 ** 6, max_complexity=1000, finding_count=1000))
+    assert score == 90
+
+
+def test_size_and_language_without_analysis():
+    score, breakdown = router().score('main.c', size=4000)
+    assert (score, breakdown) == (20, "lines 10 + language 10")
+    assert router().score('empty.py') == (0, "no risk signal")
+
+
+def test_route_section():
+    assert route_section(router().route('README.md')) == "fast (fast tier: low-risk file type)"
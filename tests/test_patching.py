@@ -0,0 +1,80 @@
+import pytest
+from patching import PatchError, apply_diff, is_diff, parse_diff, patch_file
+
+ORIGINAL = "a\nb\nc\nd\n"
+
+
+def test_is_diff():
+    assert is_diff("@@ -1 +1 @@\n-a\n+b")
+    assert not is_diff("def f():\n    return 1\n")
+
+
+def test_replaces_lines():
+    assert apply_diff(ORIGINAL, "@@ -2,2 +2,2 @@\n b\n-c\n+C\n d") == "a\nb\nC\nd\n"
+
+
+def test_pure_insertion_goes_after_the_line():
+    assert apply_diff(ORIGINAL, "@@ -4,0 +5 @@\n+e") == "a\nb\nc\nd\ne\n"
+    assert apply_diff(ORIGINAL, "@@ -2,0 +3 @@\n+x") == "a\nb\nx\nc\nd\n"
+
+
+def test_pure_insertion_at_the_top():
+    assert apply_diff(ORIGINAL, "@@ -0,0 +1 @@\n+top") == "top\na\nb\nc\nd\n"
+
+
+def test_insertion_after_an_earlier_hunk():
+    diff = "@@ -1 +1,2 @@\n a\n+a2\n@@ -3,0 +5 @@\n+c2"
+    assert apply_diff(ORIGINAL, diff) == "a\na2\nb\nc\nc2\nd\n"
+
+
+def test_removed_sql_comment_is_not_a_file_header():
+    original = "SELECT 1;\n-- old comment\nSELECT 2;\n"
+    diff = "--- a/query.sql\n+++ b/query.sql\n@@ -1,3 +1,3 @@\n SELECT 1;\n--- old comment\n+-- new comment\n SELECT 2;"
+    assert apply_diff(original, diff) == "SELECT 1;\n-- new comment\nSELECT 2;\n"
+
+
+def test_ignores_file_headers_before_the_first_hunk():
+    diff = "--- a/f.txt\n+++ b/f.txt\n@@ -1 +1 @@\n-a\n+A"
+    assert apply_diff(ORIGINAL, diff) == "A\nb\nc\nd\n"
+
+
+def test_matches_ignoring_whitespace():
+    assert apply_diff("x  =  1\ny\n", "@@ -1 +1 @@\n-x = 1\n+x = 2") == "x = 2\ny\n"
+
+
+def test_wrong_line_numbers_use_the_closest_match():
+    original = "a\nb\na\nb\n"
+    assert apply_diff(original, "@@ -3,2 +3,2 @@\n a\n-b\n+B") == "a\nb\na\nB\n"
+    assert apply_diff(original, "@@ -40,2 +40,2 @@\n a\n-b\n+B") == "a\nb\na\nB\n"
+
+
+def test_keeps_a_missing_trailing_newline():
+    assert apply_diff("a\nb", "@@ -2 +2 @@\n-b\n+B") == "a\nB"
+
+
+def test_blank_context_lines_without_a_space():
+    assert apply_diff("a\n\nb\n", "@@ -1,3 +1,3 @@\n a\n\n-b\n+B") == "a\n\nB\n"
+
+
+def test_hunk_that_does_not_match():
+    with pytest.raises(PatchError):
+        apply_diff(ORIGINAL, "@@ -1 +1 @@\n-z\n+Z")
+
+
+def test_diff_without_hunk():
+    with pytest.raises(PatchError):
+        parse_diff("just text")
+
+
+def test_invalid_hunk_line():
+    with pytest.raises(PatchError):
+        parse_diff("@@ -1 +1 @@\n-a\n*b")
+
+
+def test_patch_that_breaks_python():
+    with pytest.raises(PatchError):
+        patch_file("m.py", "x = 1\n", "@@ -1 +1 @@\n-x = 1\n+x = (")
+
+
+def test_broken_original_is_not_validated():
+    assert patch_file("m.py", "x = (\n", "@@ -1 +1 @@\n-x = (\n+x = ((") == "x = ((\n"
@@ -0,0 +1,61 @@
+from path_resolver import PathIndex, parse_paths
+
+ENTRIES = [
+    {'path': 'src', 'type': 'tree'},
+    {'path': 'src/agents.py', 'type': 'blob'},
+    {'path': 'src/main.py', 'type': 'blob'},
+    {'path': 'src/utils', 'type': 'tree'},
+    {'path': 'src/utils/io.py', 'type': 'blob'},
+    {'path': 'tests', 'type': 'tree'},
+    {'path': 'tests/main.py', 'type': 'blob'},
+    {'path': 'node_modules', 'type': 'tree'},
+    {'path': 'node_modules/x.js', 'type': 'blob'},
+    {'path': 'README.md', 'type': 'blob'},
+]
+
+
+def make_index():
+    return PathIndex(ENTRIES, ignore_dirs={'node_modules'})
+
+
+def test_empty_query_is_every_file():
+    assert make_index().resolve('') == ['README.md', 'src/agents.py', 'src/main.py', 'src/utils/io.py', 'tests/main.py']
+
+
+def test_exact_file_and_folder():
+    index = make_index()
+    assert index.resolve('./src/agents.py') == ['src/agents.py']
+    assert index.resolve('src/') == ['src/agents.py', 'src/main.py', 'src/utils/io.py']
+
+
+def test_unambiguous_bare_names():
+    index = make_index()
+    assert index.resolve('agents.py') == ['src/agents.py']
+    assert index.resolve('utils') == ['src/utils/io.py']
+    assert index.resolve('utils/io.py') == ['src/utils/io.py']
+
+
+def test_ambiguous_or_unknown_names_resolve_to_nothing():
+    index = make_index()
+    assert index.resolve('main.py') == []
+    assert index.resolve('missing.py') == []
+
+
+def test_globs():
+    index = make_index()
+    assert index.resolve('*.py') == ['src/agents.py', 'src/main.py', 'src/utils/io.py', 'tests/main.py']
+    assert index.resolve('src/*.py') == ['src/agents.py', 'src/main.py']
+
+
+def test_ignored_folders_are_left_out():
+    assert make_index().resolve('node_modules') == []
+
+
+def test_parse_paths():
+    assert parse_paths("Here you go: ['src/a.py', 'b.py'] done") == ['src/a.py', 'b.py']
+    assert parse_paths("no list") == []
+    assert parse_paths("[not python]") == []
+
+
+def test_globs_with_a_folder_stay_within_it():
+    assert make_index().resolve('src/**/*.py') == ['src/agents.py', 'src/main.py', 'src/utils/io.py']
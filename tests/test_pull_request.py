@@ -0,0 +1,88 @@
+import subprocess
+import pytest
+from pull_request import FileChange, parse_pull_request, parse_git_diff, local_changes
+
+
+def git(root, *args):
+    return subprocess.run(['git', '-C', str(root), '-c', 'user.name=t', '-c', 'user.email=t@t', *args], capture_output=True, check=True)
+
+
+@pytest.mark.parametrize('spec, number', [('42', 42), ('#42', 42), ('https://github.com/o/r/pull/42', 42), ('https://github.com/o/r/pull/42/', 42)])
+def test_parse_pull_request_number(spec, number):
+    assert parse_pull_request(spec).number == number
+
+
+def test_parse_ref_pairs():
+    spec = parse_pull_request('main...feature')
+    assert (spec.base, spec.head, spec.merge_base, spec.label) == ('main', 'feature', True, 'main...feature')
+
+    spec = parse_pull_request('main..')
+    assert (spec.base, spec.head, spec.merge_base, spec.label) == ('main', None, False, 'main..')
+
+
+@pytest.mark.parametrize('spec', ['main', '...feature', ''])
+def test_parse_rejects_other_specs(spec):
+    with pytest.raises(ValueError):
+        parse_pull_request(spec)
+
+
+PATCH = "@@ -1,4 +1,4 @@\n a\n-b\n+B\n c\n d\n@@ -10,2 +10,3 @@\n j\n+k\n l"
+
+
+def test_file_change_lines():
+    change = FileChange('f.py', patch=PATCH)
+    assert change.added == {2, 11}
+    assert change.removed == {2: ['b']}
+
+
+def test_windows_merge_overlapping_context():
+    change = FileChange('f.py', patch=PATCH)
+    assert change.windows(20, context=2) == [(1, 4), (9, 13)]
+    assert change.windows(20, context=5) == [(1, 16)]
+
+
+def test_render_marks_added_and_removed_lines():
+    contents = '\n'.join('aBcdefghijkl') + '\n'
+    rendered = FileChange('f.py', patch=PATCH).render(contents, context=1)
+    assert rendered.split('\n   ...\n') == [
+        "     1   a\n       - b\n     2 + B\n     3   c",
+        "    10   j\n    11 + k\n    12   l",
+    ]
+
+
+def test_render_nothing_changed():
+    assert FileChange('f.py', patch=None).render("a\n") == ""
+
+
+def test_parse_git_diff_statuses():
+    text = (
+        "diff --git a/new.py b/new.py\nnew file mode 100644\n--- /dev/null\n+++ b/new.py\n@@ -0,0 +1 @@\n+x\n"
+        "diff --git a/old.py b/moved.py\nsimilarity index 100%\nrename from old.py\nrename to moved.py\n"
+        "diff --git a/img.png b/img.png\nBinary files a/img.png and b/img.png differ\n"
+    )
+    changes = parse_git_diff(text)
+    assert (changes['new.py'].status, changes['new.py'].added) == ('added', {1})
+    assert (changes['moved.py'].status, changes['moved.py'].description) == ('renamed', 'renamed from old.py')
+    assert changes['img.png'].patch is None
+
+
+def test_local_changes_are_relative_to_the_folder(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'a.py').write_text("a = 1\n")
+    (tmp_path / 'top.py').write_text("t = 1\n")
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'init')
+    (tmp_path / 'sub' / 'a.py').write_text("a = 2\n")
+    (tmp_path / 'top.py').write_text("t = 2\n")
+
+    changes = local_changes(str(tmp_path / 'sub'), parse_pull_request('HEAD..'))
+    assert list(changes) == ['a.py']
+    assert changes['a.py'].added == {1}
+
+
+def test_local_changes_need_refs(tmp_path):
+    with pytest.raises(ValueError):
+        local_changes(str(tmp_path), parse_pull_request('42'))
+    with pytest.raises(ValueError):
+        local_changes(str(tmp_path), parse_pull_request('main..feature'))
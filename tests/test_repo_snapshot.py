@@ -0,0 +1,40 @@
+import io
+import os
+import tarfile
+from local_source import git_blob_sha
+from repo_snapshot import RepoSnapshot
+
+HELLO_SHA = 'ce013625030ba8dba906f756967f9e9ca394464a'  # git hash-object of "hello\n"
+
+
+def make_snapshot(tmp_path, files):
+    snapshot = RepoSnapshot('o', 'r', 'sha', directory=str(tmp_path))
+    os.makedirs(os.path.dirname(snapshot.tar_path))
+    with tarfile.open(snapshot.tar_path, 'w') as archive:
+        for path, data in files.items():
+            member = tarfile.TarInfo(f"o-r-sha/{path}")
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    return snapshot.open()
+
+
+def test_git_blob_sha():
+    assert git_blob_sha(b"hello\n") == HELLO_SHA
+
+
+def test_entries_have_the_git_blob_shas(tmp_path):
+    snapshot = make_snapshot(tmp_path, {'src/a.py': b"hello\n", 'b.txt': b""})
+    blobs = {item['path']: item for item in snapshot.entries() if item['type'] == 'blob'}
+
+    assert blobs['src/a.py']['sha'] == HELLO_SHA
+    assert blobs['src/a.py']['size'] == 6
+    assert blobs['b.txt']['sha'] == git_blob_sha(b"")
+    snapshot.close()
+
+
+def test_reads_files_and_closes(tmp_path):
+    snapshot = make_snapshot(tmp_path, {'a.py': b"hello\n"})
+    assert bytes(snapshot.read_bytes('a.py')) == b"hello\n"
+
+    snapshot.close()
+    assert snapshot.mmap is None and snapshot.entries() == []
@@ -0,0 +1,45 @@
+from review_cache import ReviewCache, hash_text
+from review_crew import ReviewCrew
+
+REVIEW = "## Project Name\nother\n\n## Path\nlib/a.py\n\n## Code Review\nFine."
+
+
+def test_keys_depend_on_the_content_prompts_and_model():
+    key = ReviewCache.make_key('blob', 'prompts', {'model': 'gpt-4o'})
+    assert key == ReviewCache.make_key('blob', 'prompts', {'model': 'gpt-4o'})
+    assert key != ReviewCache.make_key('other blob', 'prompts', {'model': 'gpt-4o'})
+    assert key != ReviewCache.make_key('blob', 'other prompts', {'model': 'gpt-4o'})
+    assert key != ReviewCache.make_key('blob', 'prompts', {'model': 'gpt-4o-mini'})
+
+
+def test_hash_text_separates_its_parts():
+    assert hash_text('ab', 'c') != hash_text('a', 'bc')
+
+
+def test_stores_and_expires_reviews(tmp_path):
+    cache = ReviewCache(path=str(tmp_path / 'reviews.sqlite3'))
+    cache.put('key', 'o', 'r', 'a.py', REVIEW)
+    assert cache.get('key') == REVIEW
+    assert cache.get('missing') is None
+
+    expired = ReviewCache(path=str(tmp_path / 'reviews.sqlite3'), max_age_days=-1)
+    assert expired.get('key') is None
+
+
+def test_evicts_the_least_recently_used_reviews(tmp_path):
+    cache = ReviewCache(path=str(tmp_path / 'reviews.sqlite3'), max_bytes=2 * len(REVIEW))
+    cache.put('a', 'o', 'r', 'a.py', REVIEW)
+    cache.put('b', 'o', 'r', 'b.py', REVIEW)
+    cache.get('a')
+    cache.put('c', 'o', 'r', 'c.py', REVIEW)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == REVIEW and cache.get('c') == REVIEW
+
+
+def test_a_hit_names_the_reviewed_file(tmp_path):
+    cache = ReviewCache(path=str(tmp_path / 'reviews.sqlite3'))
+    review_crew = ReviewCrew('o', 'r', 'src/a.py', 'report.md', blob_sha='blob', cache=cache, store=object())
+    cache.put(review_crew.cache_key(), 'o', 'other', 'lib/a.py', REVIEW)
+
+    assert review_crew.cached_result() == "## Project Name\nr\n\n## Path\nsrc/a.py\n\n## Code Review\nFine."
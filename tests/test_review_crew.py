@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+from review_crew import DuplicateGroup, ReviewCrew
+from tools import LINE_LIMIT_MESSAGE, MAX_LINE_COUNT
+
+
+def test_reads_the_contents_the_run_already_read():
+    contents = {'a.py': "x = 1\n", 'big.py': "x = 1\n" * MAX_LINE_COUNT}
+    review_crew = ReviewCrew('o', 'r', 'a.py', 'report.md', inject_content=True, store=object(), contents=contents)
+
+    assert review_crew.read_file('a.py') == "x = 1\n"
+    assert review_crew.read_file('big.py') == LINE_LIMIT_MESSAGE
+    assert review_crew.read_file('big.py', enforce_line_limit=False) == contents['big.py']
+
+
+class FakeCrew:
+    def __init__(self, path, result='review'):
+        self.path = path
+        self.result = result
+        self.previous_result = None
+        self.error = None
+        self.deduplicated = False
+        self.calls = 0
+
+    def cached_result(self):
+        return None
+
+    def review_file(self):
+        self.calls += 1
+        return self.result
+
+    def duplicate_result(self, canonical_path):
+        return f"see {canonical_path}"
+
+
+def test_duplicates_link_to_the_canonical_review():
+    canonical = FakeCrew('a.py')
+    group = DuplicateGroup(canonical)
+    duplicates = [FakeCrew('b.py'), FakeCrew('c.py')]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(group.result, duplicates + [canonical]))
+
+    assert results == ["see a.py", "see a.py", 'review']
+    assert canonical.calls == 1
+
+
+def test_a_failed_canonical_review_is_only_retried_by_its_own_crew():
+    canonical = FakeCrew('a.py', result=None)
+    group = DuplicateGroup(canonical)
+
+    assert group.result(FakeCrew('b.py')) is None
+    assert group.result(FakeCrew('c.py')) is None
+    assert canonical.calls == 1
+    assert group.result(canonical) is None
+    assert canonical.calls == 2
+
+
+def test_the_review_mode_is_part_of_the_prompt_version():
+    agent_crew = ReviewCrew('o', 'r', 'a.py', 'report.md', store=object())
+    injected_crew = ReviewCrew('o', 'r', 'a.py', 'report.md', inject_content=True, store=object())
+    diff_crew = ReviewCrew('o', 'r', 'a.py', 'report.md', inject_content=True, diff_output=True, store=object())
+    assert len({agent_crew.prompt_version(), injected_crew.prompt_version(), diff_crew.prompt_version()}) == 3
@@ -0,0 +1,38 @@
+import os
+import json
+from review_manifest import ReviewManifest
+from review_store import ReviewStore
+
+
+def write_report(name, files):
+    store = ReviewStore('o', 'r')
+    for path, blob_sha in files.items():
+        store.append(report=name, path=path, blob_sha=blob_sha, result=f"## Path\n{path}\n\n## Code Review\nReview of {path}.")
+    store.write_report(name)
+    ReviewManifest(owner='o', repo='r').save(output=name, commit_sha='sha', files=files)
+
+
+def test_latest_is_the_most_recent_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_report('2024_01_01_00_00_00.md', {'a.py': 'old'})
+    write_report('2024_01_02_00_00_00.md', {'a.py': 'new'})
+    assert ReviewManifest(owner='o', repo='r').latest()['files'] == {'a.py': 'new'}
+
+
+def test_the_metrics_of_a_run_are_not_its_manifest(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_report('2024_01_01_00_00_00.md', {'a.py': 'blob'})
+    with open(os.path.join('o', 'r', '2024_01_01_00_00_00.metrics.json'), 'w') as file:
+        json.dump({'report': '2024_01_01_00_00_00.md', 'files': {'a.py': {'seconds': 1.0}}}, file)
+
+    assert ReviewManifest(owner='o', repo='r').latest()['files'] == {'a.py': 'blob'}
+
+
+def test_carries_the_reviews_of_unchanged_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_report('2024_01_01_00_00_00.md', {'a.py': 'blob a', 'b.py': 'blob b'})
+
+    commit_sha, carried = ReviewManifest(owner='o', repo='r').carried_results({'a.py': 'blob a', 'b.py': 'changed'}, ['a.py', 'b.py'])
+    assert commit_sha == 'sha'
+    assert list(carried) == ['a.py']
+    assert 'Review of a.py.' in carried['a.py']
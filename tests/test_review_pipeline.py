@@ -0,0 +1,102 @@
+import os
+import time
+from job_queue import JobQueue
+from review_manifest import ReviewManifest
+from review_pipeline import ReviewPipeline
+
+
+class FakeJobQueue:
+    def __init__(self):
+        self.closed = []
+
+    def close_job(self, job_id):
+        self.closed.append(job_id)
+
+
+def make_pipeline(tmp_path, monkeypatch, **options):
+    monkeypatch.chdir(tmp_path)
+    pipeline = ReviewPipeline('o', 'r', **options)
+    pipeline.job_queue = FakeJobQueue()
+    pipeline.job_id = 1
+    pipeline.commit_sha = 'sha'
+    return pipeline
+
+
+def test_a_completed_run_closes_its_job_and_saves_its_manifest(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch)
+    pipeline.finish([], {'a.py': 'blob'}, completed=True)
+
+    assert pipeline.job_queue.closed == [1]
+    assert os.path.exists(os.path.join('o', 'r', pipeline.output))
+    assert ReviewManifest(owner='o', repo='r').latest()['files'] == {'a.py': 'blob'}
+
+
+def test_an_abandoned_run_writes_its_report_and_keeps_its_job_open(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch)
+    pipeline.finish([], {}, completed=False)
+
+    assert pipeline.job_queue.closed == []
+    assert os.path.exists(os.path.join('o', 'r', pipeline.output))
+
+
+def test_a_static_only_report_is_not_an_incremental_base(tmp_path, monkeypatch):
+    pipeline = make_pipeline(tmp_path, monkeypatch, static_only=True)
+    pipeline.finish([], {'a.py': 'blob'}, completed=True)
+
+    assert ReviewManifest(owner='o', repo='r').latest() is None
+
+
+def test_report_names_are_unique(tmp_path, monkeypatch):
+    assert make_pipeline(tmp_path, monkeypatch).output != make_pipeline(tmp_path, monkeypatch).output
+
+
+class SlowCrew:
+    def __init__(self, path, delay, results=('review',)):
+        self.path = path
+        self.delay = delay
+        self.results = list(results)
+        self.route = None
+        self.blob_sha = f"blob of {path}"
+        self.error = None
+        self.batch = None
+        self.published = None
+
+    def review(self):
+        time.sleep(self.delay)
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+    def publish(self, result):
+        self.published = result
+
+
+def start_run(tmp_path, monkeypatch, crews, max_concurrency=4):
+    pipeline = make_pipeline(tmp_path, monkeypatch, max_concurrency=max_concurrency)
+    pipeline.job_queue = JobQueue(path=str(tmp_path / 'jobs.sqlite3'), max_attempts=2, backoff=0)
+    pipeline.job_id, _ = pipeline.job_queue.open_job('o', 'r', 'sha', '', [crew.path for crew in crews])
+    return pipeline.run(crews)
+
+
+def test_reviews_files_concurrently_and_yields_them_in_order(tmp_path, monkeypatch):
+    crews = [SlowCrew('a.py', 0.3), SlowCrew('b.py', 0.1), SlowCrew('c.py', 0.2), SlowCrew('d.py', 0.1)]
+
+    started = time.time()
+    yielded = [(crew.path, result) for crew, result in start_run(tmp_path, monkeypatch, crews)]
+
+    assert yielded == [(crew.path, 'review') for crew in crews]
+    assert time.time() - started < 0.6
+    assert all(crew.published == 'review' for crew in crews)
+
+
+def test_retries_a_failed_review(tmp_path, monkeypatch):
+    crews = [SlowCrew('a.py', 0, results=(None, 'second try')), SlowCrew('b.py', 0, results=(None,))]
+    assert [result for _, result in start_run(tmp_path, monkeypatch, crews)] == ['second try', None]
+
+
+def test_an_abandoned_run_returns_at_once(tmp_path, monkeypatch):
+    crews = [SlowCrew('a.py', 0), SlowCrew('b.py', 1.0)]
+    run = start_run(tmp_path, monkeypatch, crews, max_concurrency=1)
+    assert next(run)[1] == 'review'
+
+    started = time.time()
+    run.close()
+    assert time.time() - started < 0.5
@@ -0,0 +1,95 @@
+import os
+import json
+from review_store import ReviewStore, REVIEW_INDEX_FILE, REVIEW_STORE_FILE
+
+
+def review(path, text):
+    return f"## Path\n{path}\n\n## Code Review\n{text}"
+
+
+def test_report_records_are_read_in_publish_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ReviewStore('o', 'r')
+    store.append(report='one.md', path='b.py', blob_sha='1', result=review('b.py', 'B'))
+    store.append(report='two.md', path='c.py', blob_sha='2', result=review('c.py', 'C'))
+    store.append(report='one.md', path='a.py', blob_sha='3', result=review('a.py', 'A'))
+
+    assert [record['path'] for record in store.report_records('one.md')] == ['b.py', 'a.py']
+    assert store.report_results('two.md') == {'c.py': review('c.py', 'C')}
+    assert list(store.report_records('missing.md')) == []
+
+
+def test_index_lines_point_at_their_records(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ReviewStore('o', 'r')
+    store.append(report='one.md', path='a.py', blob_sha='1', result=review('a.py', 'A'))
+    store.append(report='one.md', path='b.py', blob_sha='2', result=review('b.py', 'B'))
+
+    with open(os.path.join('o', 'r', REVIEW_INDEX_FILE)) as index, open(os.path.join('o', 'r', REVIEW_STORE_FILE), 'rb') as records:
+        for line in index:
+            offset, length, report, path = json.loads(line)
+            records.seek(offset)
+            record = json.loads(records.read(length))
+            assert (record['report'], record['path']) == (report, path)
+
+
+def test_latest_returns_the_newest_review_of_a_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ReviewStore('o', 'r')
+    store.append(report='one.md', path='a.py', blob_sha='old', result=review('a.py', 'Old'))
+    store.append(report='two.md', path='a.py', blob_sha='new', result=review('a.py', 'New'))
+
+    record = store.latest('a.py')
+    assert (record['blob_sha'], record['report']) == ('new', 'two.md')
+    assert record['sections']['Code Review'] == 'New'
+    assert store.latest('b.py') is None
+
+
+def test_another_instance_sees_new_appends(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reader = ReviewStore('o', 'r')
+    assert reader.latest('a.py') is None
+
+    ReviewStore('o', 'r').append(report='one.md', path='a.py', blob_sha='1', result=review('a.py', 'A'))
+    assert reader.latest('a.py')['blob_sha'] == '1'
+
+
+def test_records_missing_from_the_index_are_recovered(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ReviewStore('o', 'r')
+    store.append(report='one.md', path='a.py', blob_sha='1', result=review('a.py', 'A'))
+    store.append(report='one.md', path='b.py', blob_sha='2', result=review('b.py', 'B'))
+
+    # Simulates a crash between the record and its index line
+    index_path = os.path.join('o', 'r', REVIEW_INDEX_FILE)
+    with open(index_path) as file:
+        first = file.readline()
+    with open(index_path, 'w') as file:
+        file.write(first)
+
+    store = ReviewStore('o', 'r')
+    assert [record['path'] for record in store.report_records('one.md')] == ['a.py', 'b.py']
+    assert store.latest('b.py')['blob_sha'] == '2'
+
+
+def test_partial_lines_are_left_for_the_next_refresh(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ReviewStore('o', 'r')
+    store.append(report='one.md', path='a.py', blob_sha='1', result=review('a.py', 'A'))
+    with open(os.path.join('o', 'r', REVIEW_STORE_FILE), 'ab') as file:
+        file.write(b'{"path": "b.py"')
+
+    assert store.report_results('one.md') == {'a.py': review('a.py', 'A')}
+
+
+def test_write_report_renders_every_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = ReviewStore('o', 'r')
+    store.append(report='one.md', path='a.py', blob_sha='1', result=review('a.py', 'A'))
+    store.append(report='one.md', path='b.py', blob_sha='2', result=review('b.py', 'B'))
+    store.write_report('one.md')
+
+    with open(os.path.join('o', 'r', 'one.md')) as file:
+        text = file.read()
+    assert text.index('# a.py') < text.index('# b.py')
+    assert not os.path.exists(os.path.join('o', 'r', 'one.md.tmp'))
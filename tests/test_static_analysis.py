@@ -0,0 +1,25 @@
+from static_analysis import analyze_file, format_findings, is_supported, static_report
+
+SOURCE = "import os\ndef f(x):\n    return eval(x)\n"
+
+
+def test_finds_issues_in_python_files():
+    analysis = analyze_file('a.py', SOURCE)
+    assert analysis['supported']
+    assert [item['rule'] for item in analysis['findings']] == ['unused-import', 'eval']
+    assert format_findings(analysis, start=2) == "- Line 3 [eval] `eval` runs arbitrary code"
+
+
+def test_report_of_an_unsupported_file():
+    assert not is_supported('README.md')
+    assert "no static analyzer for .md files" in static_report('r', 'README.md', None)
+
+
+def test_report_of_an_unreadable_file():
+    assert "could not be read" in static_report('r', 'a.py', None)
+
+
+def test_report_lists_metrics_and_findings():
+    report = static_report('r', 'a.py', analyze_file('a.py', SOURCE))
+    assert report.startswith("## Project Name\nr\n\n## Path\na.py\n\n## Code Review\n### Static Analysis\n")
+    assert "- Line 1 [unused-import]" in report
@@ -0,0 +1,55 @@
+import threading
+from agents import TokenStream
+from stream_to_expander import StreamToExpander
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.renders = []
+
+    def code(self, text, language=None):
+        self.renders.append(text)
+
+
+class FakeExpander:
+    def __init__(self):
+        self.placeholder = FakePlaceholder()
+
+    def empty(self):
+        return self.placeholder
+
+
+def test_keeps_the_last_lines_and_renders_on_an_interval():
+    expander = FakeExpander()
+    stream = StreamToExpander(expander, max_lines=3, flush_interval=60)
+    stream.write("\x1b[32mone\x1b[0m\n")
+    for line in ("two\n", "thr", "ee\nfour\n", "five"):
+        stream.write(line)
+    assert expander.placeholder.renders == ["one"]
+
+    stream.flush()
+    assert expander.placeholder.renders[-1] == "three\nfour\nfive"
+
+
+def test_writes_from_worker_threads_are_rendered_by_the_script_thread():
+    expander = FakeExpander()
+    stream = StreamToExpander(expander, flush_interval=0)
+    worker = threading.Thread(target=stream.write, args=("from a worker\n",))
+    worker.start()
+    worker.join()
+    assert expander.placeholder.renders == []
+
+    stream.flush()
+    assert expander.placeholder.renders[-1] == "from a worker"
+
+
+def test_token_stream_shows_the_final_answer_only():
+    tokens = TokenStream()
+    tokens.start()
+    for token in ("Thought: reviewing", "\nFinal Answer:", " ## Path\na.py"):
+        tokens.append(token)
+    assert tokens.text() == "## Path\na.py"
+
+    tokens.start()
+    tokens.append("Thinking")
+    assert tokens.text() == "Thinking"
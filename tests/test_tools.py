@@ -0,0 +1,61 @@
+import base64
+import tools
+from tools import LINE_LIMIT_MESSAGE, MAX_LINE_COUNT, fetch_file_contents, read_snapshot_contents
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeClient:
+    def __init__(self, content):
+        self.content = content
+        self.requests = []
+
+    def get(self, path, params=None):
+        self.requests.append((path, params))
+        return FakeResponse({'size': len(self.content), 'content': base64.b64encode(self.content).decode('ascii')})
+
+
+class FakeSnapshot:
+    def __init__(self, files):
+        self.files = files
+
+    def read_bytes(self, path):
+        return memoryview(self.files[path])
+
+
+def fetch(monkeypatch, content, **options):
+    client = FakeClient(content)
+    monkeypatch.setattr(tools, 'get_client', lambda: client)
+    return fetch_file_contents('src/a.py', 'o', 'r', **options), client
+
+
+def test_fetches_the_file_at_the_given_commit(monkeypatch):
+    contents, client = fetch(monkeypatch, b"x = 1\n", ref='sha')
+    assert contents == "x = 1\n"
+    assert client.requests == [('repos/o/r/contents/src/a.py', {'ref': 'sha'})]
+
+
+def test_skips_binary_and_oversized_files(monkeypatch):
+    assert fetch(monkeypatch, b"\x00\x01")[0] == "Skipped: Binary file."
+    monkeypatch.setattr(tools, 'MAX_FILE_SIZE', 3)
+    assert fetch(monkeypatch, b"x = 1\n")[0].startswith("Skipped: File size")
+
+
+def test_line_limit(monkeypatch):
+    content = b"x = 1\n" * MAX_LINE_COUNT
+    assert fetch(monkeypatch, content)[0] == LINE_LIMIT_MESSAGE
+    assert fetch(monkeypatch, content, enforce_line_limit=False)[0] == content.decode()
+
+
+def test_reads_from_a_snapshot_without_any_request(monkeypatch):
+    monkeypatch.setattr(tools, 'get_client', lambda: None)
+    snapshot = FakeSnapshot({'src/a.py': b"x = 1\n"})
+    assert fetch_file_contents('src/a.py', 'o', 'r', snapshot=snapshot) == "x = 1\n"
+    assert fetch_file_contents('missing.py', 'o', 'r', snapshot=snapshot).startswith("Error: File not found")
+    assert read_snapshot_contents(FakeSnapshot({'a.py': b"x\n" * MAX_LINE_COUNT}), 'a.py') == LINE_LIMIT_MESSAGE
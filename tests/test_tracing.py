@@ -0,0 +1,68 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from tracing import Tracer, span, wrap, record_http, record_llm_call, record_tokens, model_prices
+
+
+def test_counters_add_up_in_enclosing_spans():
+    tracer = Tracer('o', 'r', model='gpt-4o')
+    with tracer.span('run'):
+        record_http(100)
+        with span('review', path='a.py'):
+            record_http(50)
+            record_llm_call(throttled=True, retried=True)
+            record_tokens(1000, 1000)
+
+    stages = tracer.summary()['stages']
+    assert (stages['run']['http_requests'], stages['run']['http_bytes']) == (2, 150)
+    assert (stages['review']['http_requests'], stages['review']['http_bytes']) == (1, 50)
+    assert stages['run']['llm_throttles'] == stages['review']['llm_retries'] == 1
+    assert stages['review']['cost'] == 0.02
+
+
+def test_recording_outside_a_run_does_nothing():
+    with span('review') as child:
+        assert child is None
+        record_http(10)
+
+
+def test_wrapped_tasks_record_in_the_submitting_spans():
+    tracer = Tracer('o', 'r')
+    with tracer.span('run'):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(wrap(lambda _: record_http(1)), range(4)))
+
+    assert tracer.summary()['stages']['run']['http_requests'] == 4
+
+
+def test_files_are_sorted_slowest_first():
+    tracer = Tracer('o', 'r')
+    with tracer.span('run'):
+        with span('review', path='fast.py') as fast:
+            pass
+        with span('review', path='slow.py') as slow:
+            pass
+    fast.seconds, slow.seconds = 0.1, 2.0
+
+    assert [item['path'] for item in tracer.summary()['files']] == ['slow.py', 'fast.py']
+
+
+def test_model_prices(monkeypatch):
+    assert model_prices('gpt-4o-mini-2024-07-18') == (0.00015, 0.0006)
+    assert model_prices('unknown') == (0.0, 0.0)
+    monkeypatch.setenv('LLM_PRICE_PROMPT_PER_1K', '1')
+    assert model_prices('unknown') == (1.0, 0.0)
+
+
+def test_write_metrics_next_to_the_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tracer = Tracer('o', 'r')
+    with tracer.span('run'):
+        with span('review', path='a.py'):
+            record_http(10)
+    tracer.write('2024_01_01_00_00_00.md')
+
+    with open(os.path.join('o', 'r', '2024_01_01_00_00_00.metrics.json')) as file:
+        assert json.load(file)['files'][0]['path'] == 'a.py'
+    with open(os.path.join('o', 'r', '2024_01_01_00_00_00.prom')) as file:
+        assert 'reviewer_stage_http_bytes{owner="o",repo="r",stage="review"} 10' in file.read()
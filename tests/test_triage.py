@@ -0,0 +1,81 @@
+from triage import PathMatcher, Triage, sniff, translate
+
+
+def test_patterns_without_a_slash_match_at_any_depth():
+    matcher = PathMatcher(['*.min.js', '__pycache__/'])
+    assert matcher.match('app.min.js')
+    assert matcher.match('static/js/app.min.js')
+    assert matcher.match('src/__pycache__/a.pyc')
+    assert matcher.match('src/app.js') is None
+
+
+def test_build_and_dist_rules_are_anchored_to_the_root():
+    triage = Triage()
+    assert triage.reason('build/bundle.js') == 'generated'
+    assert triage.reason('dist/index.js') == 'generated'
+    assert triage.reason('src/build/main.go') is None
+    assert triage.reason('cmd/dist/main.go') is None
+
+
+def test_directory_patterns_do_not_match_files_of_the_same_name():
+    matcher = PathMatcher(['vendor/'])
+    assert matcher.match('vendor/lib.go')
+    assert matcher.match('vendor') is None
+
+
+def test_double_star_spans_folders():
+    matcher = PathMatcher(['docs/**/*.md'])
+    assert matcher.match('docs/a.md')
+    assert matcher.match('docs/guide/setup/a.md')
+    assert matcher.match('src/docs/a.md') is None
+
+
+def test_the_last_matching_rule_wins():
+    matcher = PathMatcher(['*.lock', '!poetry.lock'])
+    assert matcher.match('yarn.lock') is True
+    assert matcher.match('poetry.lock') is False
+
+
+def test_default_reasons():
+    triage = Triage()
+    assert triage.reason('package-lock.json') == 'lock file'
+    assert triage.reason('node_modules/react/index.js') == 'vendored'
+    assert triage.reason('api/service.pb.go') == 'generated'
+    assert triage.reason('logo.PNG') == 'binary'
+    assert triage.reason('src/app.py') is None
+
+
+def test_sizes():
+    triage = Triage(max_file_size=100)
+    assert triage.reason('a.py', size=0) == 'empty'
+    assert triage.reason('a.py', size=101) == 'too large'
+    assert triage.reason('a.py', size=100) is None
+
+
+def test_repository_rules_win_over_the_defaults():
+    triage = Triage(rules=['docs/', '!dist/keep.js'])
+    assert triage.reason('docs/index.md') == 'ignored'
+    assert triage.reason('dist/keep.js') is None
+
+
+def test_gitattributes():
+    triage = Triage(gitattributes="gen/* linguist-generated\nvendor/** -linguist-vendored\n")
+    assert triage.reason('gen/models.py') == 'generated'
+    assert triage.reason('vendor/lib/a.go') is None
+
+
+def test_sniffs_the_contents():
+    assert sniff(b"\x89PNG\0\0") == 'binary'
+    assert sniff(b"// Code generated by protoc-gen-go. DO NOT EDIT.\npackage x\n") == 'generated'
+    assert sniff(b"var a=1;" * 200) == 'minified'
+    assert sniff(b"def f():\n    return 1\n") is None
+
+
+def test_filter_keeps_the_order():
+    kept, skipped = Triage().filter(['a.py', 'yarn.lock', 'b.py'], sizes={'b.py': 0})
+    assert kept == ['a.py']
+    assert skipped == {'yarn.lock': 'lock file', 'b.py': 'empty'}
+
+
+def test_translate_escapes_special_characters():
+    assert translate('a+b.txt') == r'(?:.*/)?a\+b\.txt(?:/.*)?'